@@ -6,9 +6,11 @@
 
 import matplotlib.pyplot as plt
 import matplotlib
+import numpy as np
 from datetime import datetime
 from config import *
-from game import load_game_data_xzh
+from storage import load_game_summary_xzh
+from columnar import load_history_columns_xzh
 
 # 设置中文字体（防止中文显示为方块）
 matplotlib.rcParams['font.sans-serif'] = ['SimHei', 'DejaVu Sans']
@@ -18,10 +20,10 @@ matplotlib.rcParams['axes.unicode_minus'] = False
 def generate_player_report_xzh():
     """生成玩家能力报告图表"""
     try:
-        # 加载游戏数据
-        games = load_game_data_xzh()
+        # 加载游戏数据（列式缓存，只解析上次之后新增的记录）
+        games = load_history_columns_xzh()
 
-        if not games:
+        if not len(games):
             print("没有游戏数据，无法生成报告")
             return
 
@@ -61,17 +63,17 @@ def plot_score_trend_xzh(ax, games):
     """
     绘制分数趋势图
     :param ax: matplotlib axes对象
-    :param games: 游戏数据列表
+    :param games: 游戏历史列式缓存（HistoryColumns_xzh）
     """
-    scores = [game['score'] for game in games]
-    game_numbers = list(range(1, len(scores) + 1))
+    scores = games['score']
+    game_numbers = np.arange(1, len(scores) + 1)
 
     ax.plot(game_numbers, scores, marker='o', linestyle='-', linewidth=2,
             markersize=6, color='#2E86DE', label='Score')
 
     # 添加平均线
-    if scores:
-        avg_score = sum(scores) / len(scores)
+    if len(scores):
+        avg_score = scores.mean()
         ax.axhline(y=avg_score, color='red', linestyle='--',
                    label=f'Average: {avg_score:.0f}')
 
@@ -86,17 +88,17 @@ def plot_hit_rate_trend_xzh(ax, games):
     """
     绘制命中率趋势图
     :param ax: matplotlib axes对象
-    :param games: 游戏数据列表
+    :param games: 游戏历史列式缓存（HistoryColumns_xzh）
     """
-    hit_rates = [game['hit_rate'] * 100 for game in games]
-    game_numbers = list(range(1, len(hit_rates) + 1))
+    hit_rates = games['hit_rate'] * 100
+    game_numbers = np.arange(1, len(hit_rates) + 1)
 
     ax.plot(game_numbers, hit_rates, marker='s', linestyle='-', linewidth=2,
             markersize=6, color='#10AC84', label='Hit Rate')
 
     # 添加平均线
-    if hit_rates:
-        avg_hit_rate = sum(hit_rates) / len(hit_rates)
+    if len(hit_rates):
+        avg_hit_rate = hit_rates.mean()
         ax.axhline(y=avg_hit_rate, color='orange', linestyle='--',
                    label=f'Average: {avg_hit_rate:.1f}%')
 
@@ -112,11 +114,11 @@ def plot_duration_distribution_xzh(ax, games):
     """
     绘制游戏时长分布图
     :param ax: matplotlib axes对象
-    :param games: 游戏数据列表
+    :param games: 游戏历史列式缓存（HistoryColumns_xzh）
     """
-    durations = [game['duration'] / 60 for game in games]  # 转换为分钟
+    durations = games['duration'] / 60  # 转换为分钟
 
-    if durations:
+    if len(durations):
         ax.hist(durations, bins=10, color='#A55EEA', alpha=0.7, edgecolor='black')
         ax.set_xlabel('Duration (minutes)', fontsize=12)
         ax.set_ylabel('Frequency', fontsize=12)
@@ -124,7 +126,7 @@ def plot_duration_distribution_xzh(ax, games):
         ax.grid(True, alpha=0.3, axis='y')
 
         # 添加统计信息
-        avg_duration = sum(durations) / len(durations)
+        avg_duration = durations.mean()
         ax.axvline(x=avg_duration, color='red', linestyle='--',
                    label=f'Average: {avg_duration:.1f} min')
         ax.legend()
@@ -136,25 +138,27 @@ def plot_mode_comparison_xzh(ax, games):
     """
     绘制模式对比图
     :param ax: matplotlib axes对象
-    :param games: 游戏数据列表
+    :param games: 游戏历史列式缓存（HistoryColumns_xzh）
     """
     # 统计各模式数据
-    classic_games = [g for g in games if g['mode'] == MODE_CLASSIC_XZH]
-    challenge_games = [g for g in games if g['mode'] == MODE_CHALLENGE_XZH]
+    classic_games = games.mode_mask_xzh(MODE_CLASSIC_XZH)
+    challenge_games = games.mode_mask_xzh(MODE_CHALLENGE_XZH)
+    scores = games['score']
+    hit_rates = games['hit_rate']
 
     modes = []
     avg_scores = []
     avg_hit_rates = []
 
-    if classic_games:
+    if classic_games.any():
         modes.append('Classic')
-        avg_scores.append(sum(g['score'] for g in classic_games) / len(classic_games))
-        avg_hit_rates.append(sum(g['hit_rate'] for g in classic_games) / len(classic_games) * 100)
+        avg_scores.append(scores[classic_games].mean())
+        avg_hit_rates.append(hit_rates[classic_games].mean() * 100)
 
-    if challenge_games:
+    if challenge_games.any():
         modes.append('Challenge')
-        avg_scores.append(sum(g['score'] for g in challenge_games) / len(challenge_games))
-        avg_hit_rates.append(sum(g['hit_rate'] for g in challenge_games) / len(challenge_games) * 100)
+        avg_scores.append(scores[challenge_games].mean())
+        avg_hit_rates.append(hit_rates[challenge_games].mean() * 100)
 
     if modes:
         x = range(len(modes))
@@ -187,11 +191,11 @@ def plot_mode_comparison_xzh(ax, games):
 
 
 def print_statistics_xzh():
-    """打印游戏统计信息"""
+    """打印游戏统计信息（汇总和最近记录来自列式缓存或SQLite查询，不需要解析全部记录）"""
     try:
-        games = load_game_data_xzh()
+        summary, recent_games = load_game_summary_xzh(5)
 
-        if not games:
+        if not summary["games"]:
             print("没有游戏数据")
             return
 
@@ -200,11 +204,11 @@ def print_statistics_xzh():
         print("="*50)
 
         # 总体统计
-        total_games = len(games)
-        total_score = sum(g['score'] for g in games)
+        total_games = summary["games"]
+        total_score = summary["total_score"]
         avg_score = total_score / total_games if total_games > 0 else 0
-        max_score = max(g['score'] for g in games) if games else 0
-        wins = sum(1 for g in games if g.get('won', False))
+        max_score = summary["max_score"]
+        wins = summary["wins"]
 
         print(f"\n总游戏局数: {total_games}")
         print(f"总得分: {total_score}")
@@ -213,12 +217,12 @@ def print_statistics_xzh():
         print(f"胜利次数: {wins} ({wins/total_games*100:.1f}%)" if total_games > 0 else "胜利次数: 0")
 
         # 命中率统计
-        avg_hit_rate = sum(g['hit_rate'] for g in games) / total_games if total_games > 0 else 0
+        avg_hit_rate = summary["avg_hit_rate"]
         print(f"平均命中率: {avg_hit_rate*100:.2f}%")
 
         # 模式统计
-        classic_count = sum(1 for g in games if g['mode'] == MODE_CLASSIC_XZH)
-        challenge_count = sum(1 for g in games if g['mode'] == MODE_CHALLENGE_XZH)
+        classic_count = summary["modes"].get(MODE_CLASSIC_XZH, {}).get("games", 0)
+        challenge_count = summary["modes"].get(MODE_CHALLENGE_XZH, {}).get("games", 0)
         print(f"\n经典模式: {classic_count} 局")
         print(f"挑战模式: {challenge_count} 局")
 
@@ -226,7 +230,6 @@ def print_statistics_xzh():
         if total_games > 0:
             print("\n最近5局记录:")
             print("-" * 50)
-            recent_games = games[-5:]
             for i, game in enumerate(reversed(recent_games), 1):
                 status = "胜利" if game.get('won', False) else "失败"
                 print(f"{i}. [{game['mode']}] 分数: {game['score']}, "
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+自动玩家模块
+可调节技能水平的脚本玩家：根据（延迟感知的）球位置控制挡板，用于无界面对局和难度调优
+"""
+
+import random
+from collections import deque
+from config import *
+from simulation import GameCore_xzh, INPUT_LEFT_XZH, INPUT_RIGHT_XZH, INPUT_LAUNCH_XZH
+
+
+def predict_landing_xzh(x, y, dx, dy, radius, target_y):
+    """
+    忽略砖块，预测球心下落到target_y高度时的X坐标（考虑左右墙和顶墙反弹）
+    :param x: 球心X坐标
+    :param y: 球心Y坐标
+    :param dx: X方向速度
+    :param dy: Y方向速度
+    :param radius: 球半径
+    :param target_y: 目标高度（球心）
+    :return: 预测的X坐标
+    """
+    if dy == 0:
+        return x
+    if dy > 0:
+        ticks = (target_y - y) / dy
+    else:
+        # 先飞到顶墙再落下
+        ticks = ((y - radius) + (target_y - radius)) / -dy
+
+    # 把左右墙之间的往返展开成直线后再折回
+    span = SCREEN_WIDTH - 2 * radius
+    position = (x - radius + dx * ticks) % (2 * span)
+    if position > span:
+        position = 2 * span - position
+    return position + radius
+
+
+class AutoPlayer_xzh:
+    """
+    自动玩家
+    技能越低，反应延迟越长、瞄准误差越大；技能足够高时会预判落点而不是追着球跑
+    """
+
+    def __init__(self, skill=1.0, seed=None):
+        """
+        初始化自动玩家
+        :param skill: 技能水平（0到1）
+        :param seed: 随机种子（只影响瞄准误差，与游戏的随机数流相互独立）
+        """
+        self.skill = min(max(skill, 0.0), 1.0)
+        self.rng = random.Random(seed)
+        self.reaction_ticks = round((1 - self.skill) * AUTOPLAY_MAX_REACTION_TICKS_XZH)
+        self.aim_error = (1 - self.skill) * AUTOPLAY_MAX_AIM_ERROR_XZH
+        self.predict = self.skill >= AUTOPLAY_PREDICT_SKILL_XZH
+        self.observations = deque(maxlen=self.reaction_ticks + 1)  # 最近几帧看到的球状态
+        self.aim_offset = 0.0
+        self.falling = False
+
+    def get_inputs_xzh(self, game):
+        """
+        根据当前游戏状态决定本帧输入
+        :param game: GameCore_xzh对象
+        :return: 输入位掩码
+        """
+        ball = game.ball
+        paddle = game.paddle
+        if not ball.active:
+            self.observations.clear()
+            return INPUT_LAUNCH_XZH
+
+        # 反应延迟：按reaction_ticks帧之前看到的球状态行动
+        self.observations.append((ball.x, ball.y, ball.dx, ball.dy))
+        x, y, dx, dy = self.observations[0]
+
+        # 每次球开始下落时重新选择击球点：有意的偏移加上瞄准误差
+        falling = dy > 0
+        if falling and not self.falling:
+            steer = self.rng.uniform(-AUTOPLAY_STEER_RANGE_XZH, AUTOPLAY_STEER_RANGE_XZH)
+            self.aim_offset = (steer + self.rng.gauss(0, self.aim_error)) * paddle.width
+        self.falling = falling
+
+        if self.predict:
+            target = predict_landing_xzh(x, y, dx, dy, ball.radius, paddle.y - ball.radius)
+        else:
+            target = x
+        target += self.aim_offset
+
+        # 死区为一帧的移动距离，防止在目标附近来回抖动
+        center = paddle.x + paddle.width / 2
+        if target < center - paddle.speed:
+            return INPUT_LEFT_XZH
+        if target > center + paddle.speed:
+            return INPUT_RIGHT_XZH
+        return 0
+
+
+def play_game_xzh(mode=MODE_CLASSIC_XZH, skill=1.0, seed=0, difficulty=None,
+                  max_ticks=TOURNAMENT_MAX_TICKS_XZH):
+    """
+    让自动玩家无界面地玩一局
+    :param mode: 游戏模式
+    :param skill: 玩家技能水平（0到1）
+    :param seed: 随机种子（同时决定游戏和玩家的随机数流）
+    :param difficulty: 覆盖难度参数的字典
+    :param max_ticks: 最多模拟的帧数
+    :return: 游戏数据字典（duration按模拟时间计算，未结束的局算到最后一帧）
+    """
+    game = GameCore_xzh(mode, seed=seed, difficulty=difficulty)
+    player = AutoPlayer_xzh(skill, seed=f"autoplay-{seed}")
+    while game.tick < max_ticks:
+        if game.step_xzh(player.get_inputs_xzh(game)):
+            break
+
+    game_data = game.get_game_data_xzh()
+    if game.start_time is not None and game.end_time is None:
+        game_data["duration"] = game.get_time_xzh() - game.start_time
+    game_data["ticks"] = game.tick
+    game_data["finished"] = game.game_over or game.game_won
+    return game_data
+
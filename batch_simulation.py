@@ -0,0 +1,344 @@
+# -*- coding: utf-8 -*-
+"""
+批量模拟模块
+用NumPy数组同时保存N局游戏的状态，每一步对所有游戏做向量化的碰撞计算，
+规则与simulation.py中的GameCore_xzh（离散碰撞模式）逐帧一致，用于难度参数调优
+"""
+
+import math
+import random
+import numpy as np
+from config import *
+from simulation import DIFFICULTY_DEFAULTS_XZH, INPUT_LEFT_XZH, INPUT_RIGHT_XZH, INPUT_LAUNCH_XZH
+
+
+class BatchSimulator_xzh:
+    """批量游戏模拟器 - N局游戏的状态保存在并行数组中"""
+
+    def __init__(self, num_games, mode=MODE_CLASSIC_XZH, seeds=None, difficulty=None):
+        """
+        初始化批量模拟器
+        :param num_games: 同时模拟的游戏局数
+        :param mode: 游戏模式
+        :param seeds: 每局游戏的随机种子（默认为0到num_games-1），与GameCore_xzh的种子含义相同
+        :param difficulty: 覆盖难度参数的字典（键见DIFFICULTY_DEFAULTS_XZH），
+                           值为所有游戏共用的数值或长度为num_games的数组（每局一组参数，用于参数扫描）
+        """
+        self.num_games = num_games
+        self.mode = mode
+        self.seeds = list(seeds) if seeds is not None else list(range(num_games))
+        if len(self.seeds) != num_games:
+            raise ValueError("种子数量与游戏局数不一致")
+
+        # 难度参数：参数名 -> 每局游戏的取值数组
+        difficulty = difficulty or {}
+        unknown = set(difficulty) - set(DIFFICULTY_DEFAULTS_XZH)
+        if unknown:
+            raise ValueError(f"未知的难度参数: {', '.join(sorted(unknown))}")
+        self.difficulty = {}
+        for name, default in DIFFICULTY_DEFAULTS_XZH.items():
+            values = np.asarray(difficulty.get(name, default))
+            if values.ndim > 1 or (values.ndim == 1 and len(values) != num_games):
+                raise ValueError(f"难度参数 {name} 的数量与游戏局数不一致")
+            self.difficulty[name] = np.array(np.broadcast_to(values, (num_games,)))
+        # 发射角度只在发射时抽取，逐局使用与标量核心相同的随机数流
+        self.rngs = [random.Random(seed) for seed in self.seeds]
+
+        # 砖块布局（所有游戏相同）
+        self.rows = BRICK_ROWS_XZH if mode == MODE_CLASSIC_XZH else CHALLENGE_BRICK_ROWS_XZH
+        self.cols = BRICK_COLS_XZH
+        self.num_bricks = self.rows * self.cols
+        self.cell_width = BRICK_WIDTH_XZH + BRICK_PADDING_XZH
+        self.cell_height = BRICK_HEIGHT_XZH + BRICK_PADDING_XZH
+
+        n = num_games
+        initial_speed = BALL_SPEED_DEFAULT_XZH
+        if mode == MODE_CHALLENGE_XZH:
+            initial_speed *= CHALLENGE_SPEED_MULTIPLIER_XZH
+        self.radius = BALL_RADIUS_XZH
+        self.paddle_y = SCREEN_HEIGHT - 50
+
+        # 挡板
+        self.paddle_x = np.full(n, (SCREEN_WIDTH - PADDLE_WIDTH_DEFAULT_XZH) / 2)
+        self.paddle_width = np.full(n, float(PADDLE_WIDTH_DEFAULT_XZH))
+        self.paddle_speed = np.full(n, float(PADDLE_SPEED_XZH))
+
+        # 球
+        self.ball_x = self.paddle_x + self.paddle_width / 2
+        self.ball_y = np.full(n, float(self.paddle_y - BALL_RADIUS_XZH - 5))
+        self.ball_dx = np.zeros(n)
+        self.ball_dy = np.zeros(n)
+        self.ball_speed = np.full(n, float(initial_speed))
+        self.ball_active = np.zeros(n, dtype=bool)
+
+        # 砖块可见性位图（每局一行）和剩余数
+        self.visible = np.ones((n, self.num_bricks), dtype=bool)
+        self.remaining = np.full(n, self.num_bricks, dtype=np.int64)
+
+        # 游戏状态和统计
+        self.game_started = np.zeros(n, dtype=bool)
+        self.game_over = np.zeros(n, dtype=bool)
+        self.game_won = np.zeros(n, dtype=bool)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.lives = np.full(n, INITIAL_LIVES_XZH if mode == MODE_CLASSIC_XZH else CHALLENGE_LIVES_XZH,
+                             dtype=np.int64)
+        self.level = np.ones(n, dtype=np.int64)
+        self.bricks_hit = np.zeros(n, dtype=np.int64)
+        self.bricks_missed = np.zeros(n, dtype=np.int64)
+        self.total_bricks_hit = np.zeros(n, dtype=np.int64)
+        self.total_bricks_missed = np.zeros(n, dtype=np.int64)
+        self.last_check_hit_count = np.zeros(n, dtype=np.int64)
+        self.start_tick = np.full(n, -1, dtype=np.int64)
+        self.end_tick = np.full(n, -1, dtype=np.int64)
+        self.tick = 0
+
+    def launch_xzh(self, games):
+        """
+        发射指定游戏中的球（角度与标量核心使用相同的随机数流）
+        :param games: 游戏索引数组
+        """
+        for i in games.tolist():
+            angle_rad = math.radians(self.rngs[i].uniform(-60, 60))
+            self.ball_dx[i] = self.ball_speed[i] * math.sin(angle_rad)
+            self.ball_dy[i] = -self.ball_speed[i] * math.cos(angle_rad)
+        self.ball_active[games] = True
+
+    def reset_balls_xzh(self, mask):
+        """
+        把指定游戏的球放回挡板上方
+        :param mask: 布尔掩码
+        """
+        self.ball_x[mask] = self.paddle_x[mask] + self.paddle_width[mask] / 2
+        self.ball_y[mask] = self.paddle_y - self.radius - 5
+        self.ball_dx[mask] = 0
+        self.ball_dy[mask] = 0
+        self.ball_active[mask] = False
+
+    def apply_inputs_xzh(self, inputs):
+        """
+        应用所有游戏的输入（与GameCore_xzh.apply_inputs_xzh一致）
+        :param inputs: 每局游戏的输入位掩码数组
+        """
+        launch = ((inputs & INPUT_LAUNCH_XZH) != 0) & ~self.ball_active
+        if launch.any():
+            first = launch & ~self.game_started
+            self.game_started[first] = True
+            self.start_tick[first] = self.tick
+            self.launch_xzh(np.flatnonzero(launch))
+
+        left = (inputs & INPUT_LEFT_XZH) != 0
+        if left.any():
+            self.paddle_x[left] -= self.paddle_speed[left]
+            np.maximum(self.paddle_x, 0, out=self.paddle_x, where=left)
+            follow = left & ~self.ball_active
+            self.ball_x[follow] = self.paddle_x[follow] + self.paddle_width[follow] / 2
+
+        right = (inputs & INPUT_RIGHT_XZH) != 0
+        if right.any():
+            self.paddle_x[right] += self.paddle_speed[right]
+            over = right & (self.paddle_x + self.paddle_width > SCREEN_WIDTH)
+            self.paddle_x[over] = SCREEN_WIDTH - self.paddle_width[over]
+            follow = right & ~self.ball_active
+            self.ball_x[follow] = self.paddle_x[follow] + self.paddle_width[follow] / 2
+
+    def step_xzh(self, inputs):
+        """
+        所有游戏推进一个模拟帧
+        :param inputs: 每局游戏的输入位掩码数组（或对所有游戏相同的整数）
+        :return: 每局游戏是否已结束的布尔数组
+        """
+        inputs = np.broadcast_to(np.asarray(inputs, dtype=np.int64), (self.num_games,))
+        self.apply_inputs_xzh(inputs)
+        self.update_xzh()
+        self.tick += 1
+        return self.game_over | self.game_won
+
+    def update_xzh(self):
+        """更新所有进行中的游戏（与GameCore_xzh.update_xzh一致）"""
+        live = self.game_started & ~self.game_over & ~self.game_won
+        if not live.any():
+            return
+        radius = self.radius
+
+        # 移动球
+        moving = live & self.ball_active
+        self.ball_x[moving] += self.ball_dx[moving]
+        self.ball_y[moving] += self.ball_dy[moving]
+
+        # 球与墙壁碰撞（bounce_wall_xzh）
+        x = self.ball_x
+        side = live & ((x - radius <= 0) | (x + radius >= SCREEN_WIDTH))
+        self.ball_dx[side] = -self.ball_dx[side]
+        self.ball_x[side & (x - radius < 0)] = radius
+        self.ball_x[side & (x + radius > SCREEN_WIDTH)] = SCREEN_WIDTH - radius
+        top = live & (self.ball_y - radius <= 0)
+        self.ball_dy[top] = -self.ball_dy[top]
+        self.ball_y[top] = radius
+
+        # 球的外接矩形（按pygame.Rect规则截断为整数）
+        ball_left = np.trunc(self.ball_x - radius).astype(np.int64)
+        ball_top = np.trunc(self.ball_y - radius).astype(np.int64)
+        size = radius * 2
+
+        # 球与挡板碰撞（bounce_paddle_xzh）
+        paddle_left = np.trunc(self.paddle_x).astype(np.int64)
+        paddle_width = np.trunc(self.paddle_width).astype(np.int64)
+        paddle_hit = (live & self.ball_active & (self.ball_dy > 0)
+                      & (ball_left < paddle_left + paddle_width) & (ball_top < self.paddle_y + PADDLE_HEIGHT_XZH)
+                      & (ball_left + size > paddle_left) & (ball_top + size > self.paddle_y))
+        if paddle_hit.any():
+            hit_pos = (self.ball_x[paddle_hit] - self.paddle_x[paddle_hit]) / self.paddle_width[paddle_hit]
+            angle_rad = np.radians((hit_pos - 0.5) * 120)
+            # 标量核心的dx ** 2走libm的pow，与NumPy的平方偶尔相差1ULP；挡板反弹很少，逐个按Python浮点计算
+            speed = np.array([math.sqrt(dx ** 2 + dy ** 2) for dx, dy in
+                              zip(self.ball_dx[paddle_hit].tolist(), self.ball_dy[paddle_hit].tolist())])
+            self.ball_dx[paddle_hit] = speed * np.sin(angle_rad)
+            self.ball_dy[paddle_hit] = -speed * np.cos(angle_rad)
+            self.ball_y[paddle_hit] = self.paddle_y - radius
+            self.bricks_missed[paddle_hit] += 1
+            self.total_bricks_missed[paddle_hit] += 1
+
+        # 球与砖块碰撞（check_brick_collision_xzh + calculate_bounce_xzh）
+        self.check_brick_collision_xzh(live & self.ball_active)
+
+        # 检查球是否掉落
+        missed = live & (self.ball_y - radius > SCREEN_HEIGHT)
+        if missed.any():
+            self.lives[missed] -= 1
+            dead = missed & (self.lives <= 0)
+            self.game_over[dead] = True
+            self.end_tick[dead] = self.tick
+            self.reset_balls_xzh(missed & ~dead)
+
+        # 检查是否获胜或重新生成砖块
+        cleared = live & (self.remaining == 0)
+        if cleared.any():
+            if self.mode == MODE_CHALLENGE_XZH:
+                self.visible[cleared] = True
+                self.remaining[cleared] = self.num_bricks
+                self.level[cleared] += 1
+                relaunch = cleared & self.ball_active
+                self.reset_balls_xzh(relaunch)
+                self.launch_xzh(np.flatnonzero(relaunch))
+            else:
+                self.game_won[cleared] = True
+                self.end_tick[cleared] = self.tick
+
+        # 智能难度调整
+        self.adjust_difficulty_xzh(live)
+
+    def check_brick_collision_xzh(self, mask):
+        """
+        批量检查球与砖块的碰撞：每局游戏只检查球外接矩形覆盖的（最多2x2个）网格格子，
+        按砖块顺序取第一个重叠的可见砖块
+        :param mask: 需要检查的游戏布尔掩码
+        """
+        games = np.flatnonzero(mask)
+        if games.size == 0:
+            return
+        radius = self.radius
+        size = radius * 2
+        ball_x = self.ball_x[games]
+        ball_y = self.ball_y[games]
+        left = np.trunc(ball_x - radius).astype(np.int64)
+        top = np.trunc(ball_y - radius).astype(np.int64)
+
+        col_start = (left - BRICK_OFFSET_LEFT_XZH) // self.cell_width
+        col_end = (left + size - 1 - BRICK_OFFSET_LEFT_XZH) // self.cell_width
+        row_start = (top - BRICK_OFFSET_TOP_XZH) // self.cell_height
+        row_end = (top + size - 1 - BRICK_OFFSET_TOP_XZH) // self.cell_height
+
+        # 候选格子按 (行, 列) 升序排列，即砖块列表顺序
+        found = np.full(games.size, -1, dtype=np.int64)
+        for rows, cols in ((row_start, col_start), (row_start, col_end), (row_end, col_start), (row_end, col_end)):
+            valid = (found < 0) & (rows >= 0) & (rows < self.rows) & (cols >= 0) & (cols < self.cols)
+            index = np.where(valid, rows * self.cols + cols, 0)
+            brick_left = BRICK_OFFSET_LEFT_XZH + cols * self.cell_width
+            brick_top = BRICK_OFFSET_TOP_XZH + rows * self.cell_height
+            hit = (valid & self.visible[games, index]
+                   & (left < brick_left + BRICK_WIDTH_XZH) & (top < brick_top + BRICK_HEIGHT_XZH)
+                   & (left + size > brick_left) & (top + size > brick_top))
+            found[hit] = index[hit]
+
+        hit = found >= 0
+        if not hit.any():
+            return
+        games = games[hit]
+        index = found[hit]
+        self.visible[games, index] = False
+        self.remaining[games] -= 1
+        self.score[games] += POINTS_PER_BRICK_XZH
+        self.bricks_hit[games] += 1
+        self.total_bricks_hit[games] += 1
+
+        # 根据球心到砖块各边的最近距离确定反弹方向
+        brick_left = BRICK_OFFSET_LEFT_XZH + (index % self.cols) * self.cell_width
+        brick_top = BRICK_OFFSET_TOP_XZH + (index // self.cols) * self.cell_height
+        ball_x = self.ball_x[games]
+        ball_y = self.ball_y[games]
+        left_dist = np.abs(ball_x - brick_left)
+        right_dist = np.abs(ball_x - (brick_left + BRICK_WIDTH_XZH))
+        top_dist = np.abs(ball_y - brick_top)
+        bottom_dist = np.abs(ball_y - (brick_top + BRICK_HEIGHT_XZH))
+        min_dist = np.minimum(np.minimum(left_dist, right_dist), np.minimum(top_dist, bottom_dist))
+        flip_x = (min_dist == left_dist) | (min_dist == right_dist)
+        self.ball_dx[games[flip_x]] *= -1
+        self.ball_dy[games[~flip_x]] *= -1
+
+    def adjust_difficulty_xzh(self, live):
+        """
+        批量智能难度调整（与GameCore_xzh.adjust_difficulty_xzh一致，每局使用自己的难度参数）
+        :param live: 进行中游戏的布尔掩码
+        """
+        difficulty = self.difficulty
+        check = live & (self.total_bricks_hit - self.last_check_hit_count >= difficulty["check_interval"])
+        if not check.any():
+            return
+
+        attempts = self.bricks_hit + self.bricks_missed
+        rate = np.divide(self.bricks_hit, attempts, out=np.zeros(self.num_games), where=attempts > 0)
+        harder = check & (attempts > 0) & (rate > difficulty["hit_rate_threshold"])
+        if harder.any():
+            old_width = self.paddle_width.copy()
+            self.paddle_width[harder] = np.clip(self.paddle_width[harder] - difficulty["width_adjustment"][harder],
+                                                PADDLE_WIDTH_MIN_XZH, PADDLE_WIDTH_MAX_XZH)
+            faster = harder & (self.paddle_width < old_width)
+            self.paddle_speed[faster] = np.minimum(self.paddle_speed[faster] + difficulty["speed_adjustment"][faster],
+                                                   PADDLE_SPEED_MAX_XZH)
+
+        self.last_check_hit_count[check] = self.total_bricks_hit[check]
+        self.bricks_hit[check] = 0
+        self.bricks_missed[check] = 0
+
+    def tracking_inputs_xzh(self, dead_zone=10):
+        """
+        简单的跟球策略：挡板中心追随球的X坐标，并始终按下发射键
+        :param dead_zone: 死区像素，球在挡板中心附近时不移动
+        :return: 输入位掩码数组
+        """
+        center = self.paddle_x + self.paddle_width / 2
+        inputs = np.full(self.num_games, INPUT_LAUNCH_XZH, dtype=np.int64)
+        inputs[self.ball_x < center - dead_zone] |= INPUT_LEFT_XZH
+        inputs[self.ball_x > center + dead_zone] |= INPUT_RIGHT_XZH
+        return inputs
+
+    def get_results_xzh(self):
+        """
+        获取所有游戏的结果
+        :return: 字段名 -> 数组的字典，duration按模拟帧数和FPS换算为秒
+        """
+        end = np.where(self.end_tick >= 0, self.end_tick, self.tick)
+        duration = np.where(self.start_tick >= 0, (end - self.start_tick) / FPS, 0.0)
+        attempts = self.total_bricks_hit + self.total_bricks_missed
+        hit_rate = np.divide(self.total_bricks_hit, attempts, out=np.zeros(self.num_games), where=attempts > 0)
+        return {
+            "score": self.score.copy(),
+            "level": self.level.copy(),
+            "duration": duration,
+            "hit_rate": hit_rate,
+            "bricks_hit": self.total_bricks_hit.copy(),
+            "lives_remaining": self.lives.copy(),
+            "won": self.game_won.copy(),
+            "finished": self.game_over | self.game_won,
+        }
+
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""
+自动玩家演示和基准：不同技能水平各玩几局，打印成绩和每局的模拟耗时
+运行: python benchmarks/bench_autoplay.py
+"""
+
+import os
+import sys
+import time
+
+ROOT_XZH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_XZH)
+
+from config import *
+from autoplay import play_game_xzh
+
+
+def main_xzh(games=5):
+    """
+    运行演示
+    :param games: 每种技能和模式的局数
+    """
+    for skill in (0.0, 0.3, 0.6, 0.9, 1.0):
+        for mode in (MODE_CLASSIC_XZH, MODE_CHALLENGE_XZH):
+            start = time.perf_counter()
+            results = [play_game_xzh(mode, skill, seed) for seed in range(games)]
+            elapsed = (time.perf_counter() - start) / games
+            average = sum(result["score"] for result in results) / games
+            wins = sum(result["won"] for result in results)
+            levels = max(result["level"] for result in results)
+            print(f"技能 {skill:.1f} {mode:>9}: 平均得分 {average:7.1f}, 获胜 {wins}/{games}, "
+                  f"最高关卡 {levels}, 每局 {elapsed * 1000:.0f} 毫秒")
+
+
+if __name__ == "__main__":
+    main_xzh()
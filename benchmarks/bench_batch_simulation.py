@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+"""
+批量模拟器吞吐量基准：4096局同时模拟2000帧
+运行: python benchmarks/bench_batch_simulation.py
+"""
+
+import os
+import sys
+import time
+
+ROOT_XZH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_XZH)
+
+from config import *
+from batch_simulation import BatchSimulator_xzh
+
+
+def main_xzh(num_games=4096, ticks=2000):
+    """
+    运行基准
+    :param num_games: 同时模拟的局数
+    :param ticks: 模拟帧数
+    """
+    simulator = BatchSimulator_xzh(num_games, MODE_CHALLENGE_XZH)
+    start = time.perf_counter()
+    for _ in range(ticks):
+        simulator.step_xzh(simulator.tracking_inputs_xzh())
+    elapsed = time.perf_counter() - start
+    print(f"{num_games}局 x {ticks}帧: {elapsed:.2f} 秒, {num_games * ticks / elapsed:,.0f} 局帧/秒")
+
+
+if __name__ == "__main__":
+    main_xzh()
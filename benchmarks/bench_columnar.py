@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+列式缓存性能基准：对比直接解析JSONL、首次建立列式缓存和打开缓存后增量刷新的耗时
+运行: python benchmarks/bench_columnar.py
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT_XZH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_XZH)
+
+from config import *
+from storage import JsonlStore_xzh
+from columnar import HistoryColumns_xzh
+
+SAMPLE_XZH = {"mode": MODE_CLASSIC_XZH, "score": 240, "level": 1, "duration": 49.1, "hit_rate": 0.88,
+              "bricks_hit": 24, "lives_remaining": 1, "timestamp": "2025-12-14 23:42:46", "won": False}
+
+
+def main_xzh(games=100000):
+    """
+    运行基准
+    :param games: 历史局数
+    """
+    modes = (MODE_CLASSIC_XZH, MODE_CHALLENGE_XZH)
+    with tempfile.TemporaryDirectory() as directory:
+        store = JsonlStore_xzh(os.path.join(directory, "games.jsonl"))
+        with open(store.path, 'wb') as f:
+            for index in range(games):
+                record = dict(SAMPLE_XZH, score=index % 997, mode=modes[index % 3 == 0], won=index % 7 == 0)
+                f.write(json.dumps(record, separators=(',', ':')).encode('utf-8') + b"\n")
+
+        start = time.perf_counter()
+        records = store.load_xzh()
+        print(f"解析JSONL: {len(records)} 局 {(time.perf_counter() - start) * 1000:.0f} 毫秒")
+
+        cache_dir = os.path.join(directory, "columns")
+        start = time.perf_counter()
+        HistoryColumns_xzh(cache_dir).refresh_xzh(store)
+        print(f"首次建立列式缓存: {(time.perf_counter() - start) * 1000:.0f} 毫秒")
+
+        for _ in range(3):
+            store.append_xzh(dict(SAMPLE_XZH, score=5000, mode=MODE_CHALLENGE_XZH, won=True))
+        start = time.perf_counter()
+        history = HistoryColumns_xzh(cache_dir)
+        added = history.refresh_xzh(store)
+        average = history["score"].mean()
+        elapsed = time.perf_counter() - start
+        print(f"打开缓存并增量刷新 {added} 局: {elapsed * 1000:.2f} 毫秒, 共 {len(history)} 局, 平均分 {average:.2f}")
+
+
+if __name__ == "__main__":
+    main_xzh()
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+训练环境吞吐量基准：单环境、进程内向量化环境和多进程向量化环境
+运行: python benchmarks/bench_environment.py
+"""
+
+import os
+import sys
+import time
+import numpy as np
+
+ROOT_XZH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_XZH)
+
+from environment import ACTIONS_XZH, BreakoutEnv_xzh, VectorEnv_xzh, SubprocVectorEnv_xzh
+
+
+def benchmark_xzh(env, steps, num_envs=1):
+    """
+    测量环境吞吐量
+    :param env: 单个环境或向量化环境
+    :param steps: 调用step的次数
+    :param num_envs: 每次step推进的环境数
+    :return: 每秒环境步数
+    """
+    rng = np.random.default_rng(0)
+    env.reset(seed=0)
+    start = time.perf_counter()
+    for _ in range(steps):
+        if num_envs == 1:
+            _, _, done, _ = env.step(int(rng.integers(len(ACTIONS_XZH))))
+            if done:
+                env.reset()
+        else:
+            env.step(rng.integers(len(ACTIONS_XZH), size=num_envs))
+    return steps * num_envs / (time.perf_counter() - start)
+
+
+def main_xzh():
+    """运行基准"""
+    for observation_type in ("vector", "frame"):
+        single = BreakoutEnv_xzh(obs_type=observation_type)
+        print(f"[{observation_type}] 单环境: {benchmark_xzh(single, 5000):,.0f} 步/秒")
+
+        vector = VectorEnv_xzh(16, obs_type=observation_type)
+        print(f"[{observation_type}] 进程内16个环境: {benchmark_xzh(vector, 500, 16):,.0f} 步/秒")
+
+        with SubprocVectorEnv_xzh(16, num_workers=4, obs_type=observation_type) as subproc:
+            print(f"[{observation_type}] 4个进程16个环境: {benchmark_xzh(subproc, 500, 16):,.0f} 步/秒")
+
+
+if __name__ == "__main__":
+    main_xzh()
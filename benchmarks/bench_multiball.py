@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""
+多球模式性能基准：保持大量球在场上，统计每帧模拟耗时
+运行: python benchmarks/bench_multiball.py
+"""
+
+import os
+import random
+import sys
+import time
+
+ROOT_XZH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_XZH)
+sys.path.insert(0, os.path.join(ROOT_XZH, "tests"))
+
+from config import *
+from simulation import GameCore_xzh, INPUT_LAUNCH_XZH
+from sim_helpers import tracking_inputs_xzh
+
+
+def bench_multiball_xzh(ball_counts=(1, 16, 64), steps=3000):
+    """
+    测量不同球数下每帧的模拟耗时
+    :param ball_counts: 要测量的球数
+    :param steps: 每种球数模拟的帧数
+    """
+    for ball_count in ball_counts:
+        game = GameCore_xzh(MODE_CHALLENGE_XZH, seed=1, multiball=True)
+        game.step_xzh(INPUT_LAUNCH_XZH)
+        bench_rng = random.Random(1)
+        elapsed = 0.0
+        for step in range(steps):
+            while len(game.balls) < ball_count:
+                game.spawn_balls_xzh(game.ball)
+            start = time.perf_counter()
+            done = game.step_xzh(tracking_inputs_xzh(game, bench_rng))
+            elapsed += time.perf_counter() - start
+            if done:
+                game = GameCore_xzh(MODE_CHALLENGE_XZH, seed=step, multiball=True)
+                game.step_xzh(INPUT_LAUNCH_XZH)
+        print(f"{ball_count} 个球: 每帧模拟 {elapsed / steps * 1000:.3f} 毫秒")
+
+
+if __name__ == "__main__":
+    bench_multiball_xzh()
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+存储性能基准：追加耗时与历史长度无关，两种后端的汇总统计耗时对比
+运行: python benchmarks/bench_storage.py
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT_XZH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_XZH)
+
+from config import *
+from storage import JsonlStore_xzh, SqliteStore_xzh
+
+SAMPLE_XZH = {"mode": MODE_CLASSIC_XZH, "score": 240, "level": 1, "duration": 49.1, "hit_rate": 0.88,
+              "bricks_hit": 24, "lives_remaining": 1, "timestamp": "2025-12-14 23:42:46", "won": False}
+
+
+def main_xzh():
+    """运行基准"""
+    with tempfile.TemporaryDirectory() as directory:
+        # 分别测量少量和大量历史记录时的保存耗时
+        store = JsonlStore_xzh(os.path.join(directory, "games.jsonl"))
+        for history in (10, 100000):
+            with open(store.path, 'wb') as f:
+                f.write((json.dumps(SAMPLE_XZH, separators=(',', ':')) + "\n").encode('utf-8') * history)
+            start = time.perf_counter()
+            for _ in range(100):
+                store.append_xzh(SAMPLE_XZH)
+            elapsed = (time.perf_counter() - start) / 100
+            print(f"历史 {history:>6} 局: 每次保存 {elapsed * 1000:.3f} 毫秒")
+
+        # 两种后端保存相同的记录，对比汇总统计和最近记录的耗时
+        modes = (MODE_CLASSIC_XZH, MODE_CHALLENGE_XZH)
+        records = [dict(SAMPLE_XZH, score=index % 997, mode=modes[index % 2]) for index in range(100000)]
+        jsonl_store = JsonlStore_xzh(os.path.join(directory, "games2.jsonl"))
+        jsonl_store.append_many_xzh(records)
+        sqlite_store = SqliteStore_xzh(os.path.join(directory, "games.db"))
+        sqlite_store.append_many_xzh(records)
+        for backend in (jsonl_store, sqlite_store):
+            start = time.perf_counter()
+            summary = backend.summarize_xzh()
+            recent_games = backend.recent_xzh(5)
+            elapsed = time.perf_counter() - start
+            print(f"{type(backend).__name__}: 汇总 {summary['games']} 局用时 {elapsed * 1000:.1f} 毫秒, "
+                  f"最高分 {summary['max_score']}, 最近一局得分 {recent_games[-1]['score']}")
+
+
+if __name__ == "__main__":
+    main_xzh()
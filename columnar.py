@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+"""
+游戏历史列式缓存模块
+把历史记录中分析需要的字段按列保存为定长二进制文件，用内存映射打开，分析代码直接读取NumPy数组；
+新记录追加到存储后只解析新增部分并追加到各列末尾，打开统计界面不再依赖JSON解析速度
+"""
+
+import copy
+import json
+import math
+import os
+from datetime import datetime, timezone
+import numpy as np
+from config import *
+from storage import get_store_xzh, flush_pending_saves_xzh, history_cache_xzh, write_file_atomic_xzh
+
+# 列名 -> 数据类型（文件为小端序的定长数组，每列一个文件）
+COLUMN_DTYPES_XZH = {
+    "score": np.dtype("<i8"),
+    "hit_rate": np.dtype("<f8"),
+    "duration": np.dtype("<f8"),
+    "bricks_hit": np.dtype("<i4"),
+    "lives_remaining": np.dtype("<i4"),
+    "level": np.dtype("<i4"),
+    "won": np.dtype("u1"),
+    "mode": np.dtype("u1"),  # 模式编号，对应HistoryColumns_xzh.modes中的位置
+    "timestamp": np.dtype("<f8"),  # 记录时间按UTC换算的秒数，无法解析时为nan
+}
+COLUMN_META_FILE_XZH = "meta.json"
+COLUMN_CACHE_VERSION_XZH = 2
+
+
+def parse_timestamp_xzh(text):
+    """
+    把记录中的时间字符串转换为秒数
+    记录中的时间没有时区，按UTC换算，不受本机时区和夏令时影响，可以原样还原
+    :param text: "%Y-%m-%d %H:%M:%S" 格式的字符串
+    :return: 秒数（缺失或格式不对时为nan）
+    """
+    # 格式固定，按位置切分比strptime快得多
+    try:
+        return datetime(int(text[0:4]), int(text[5:7]), int(text[8:10]),
+                        int(text[11:13]), int(text[14:16]), int(text[17:19]), tzinfo=timezone.utc).timestamp()
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def format_timestamp_xzh(value):
+    """
+    把parse_timestamp_xzh得到的秒数转换回记录中的时间字符串
+    :param value: 秒数（nan表示原记录没有可解析的时间）
+    :return: "%Y-%m-%d %H:%M:%S" 格式的字符串（nan时为空字符串）
+    """
+    if math.isnan(value):
+        return ""
+    return datetime.fromtimestamp(value, timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+class HistoryColumns_xzh:
+    """
+    游戏历史的列式缓存
+    元数据文件记录已缓存的局数、数据源读到的位置和数据源指纹；列文件只会在末尾追加或整体替换，
+    已映射的数组在刷新后仍然有效
+    """
+
+    def __init__(self, directory=COLUMN_CACHE_DIR_XZH):
+        """
+        打开缓存目录（不存在时在第一次刷新时创建）
+        :param directory: 缓存目录
+        """
+        self.directory = directory
+        self.count = 0  # 已缓存的局数
+        self.source = None  # 数据源标识（后端类型和路径）
+        self.position = 0  # 数据源中已读到的位置（JSONL为字节偏移，SQLite为主键）
+        self.fingerprint = None  # 数据源在position之前内容的指纹（见store.fingerprint_xzh）
+        self.modes = []  # 模式编号 -> 模式名
+        self.arrays = {}  # 列名 -> 内存映射数组
+
+        meta_path = os.path.join(directory, COLUMN_META_FILE_XZH)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get("version") == COLUMN_CACHE_VERSION_XZH:
+                self.count = meta["count"]
+                self.source = meta["source"]
+                self.position = meta["position"]
+                self.fingerprint = meta["fingerprint"]
+                self.modes = meta["modes"]
+        except (FileNotFoundError, ValueError, KeyError):
+            pass
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, name):
+        """
+        获取一列（只读的内存映射数组）
+        :param name: 列名（见COLUMN_DTYPES_XZH）
+        :return: 长度为len(self)的NumPy数组
+        """
+        array = self.arrays.get(name)
+        if array is None:
+            dtype = COLUMN_DTYPES_XZH[name]
+            if self.count == 0:
+                array = np.empty(0, dtype=dtype)
+            else:
+                array = np.memmap(self.column_path_xzh(name), dtype=dtype, mode='r', shape=(self.count,))
+            self.arrays[name] = array
+        return array
+
+    def copy_xzh(self):
+        """
+        当前内容的副本（共用列文件；之后在原对象上追加的记录不影响副本的长度）
+        :return: HistoryColumns_xzh对象
+        """
+        view = copy.copy(self)
+        view.modes = list(self.modes)
+        view.arrays = dict(self.arrays)
+        return view
+
+    def column_path_xzh(self, name):
+        """列文件路径"""
+        return os.path.join(self.directory, f"{name}.bin")
+
+    def mode_mask_xzh(self, mode):
+        """
+        某个模式的对局掩码
+        :param mode: 模式名
+        :return: 布尔数组（没有该模式的记录时全为False）
+        """
+        if mode not in self.modes:
+            return np.zeros(self.count, dtype=bool)
+        return self["mode"] == self.modes.index(mode)
+
+    def summarize_xzh(self):
+        """
+        用列数组计算汇总统计，不解析任何记录
+        :return: 汇总字典，格式与storage.JsonlStore_xzh.summarize_xzh相同
+        """
+        summary = {"games": self.count, "total_score": 0, "max_score": 0, "wins": 0, "avg_hit_rate": 0.0,
+                   "modes": {}}
+        if not self.count:
+            return summary
+        scores = self["score"]
+        hit_rates = self["hit_rate"]
+        codes = self["mode"]
+        summary["total_score"] = int(scores.sum())
+        summary["max_score"] = max(int(scores.max()), 0)
+        summary["wins"] = int(np.count_nonzero(self["won"]))
+        summary["avg_hit_rate"] = float(hit_rates.mean())
+
+        # 按模式编号分组求和
+        games = np.bincount(codes, minlength=len(self.modes))
+        score_sums = np.bincount(codes, weights=scores, minlength=len(self.modes))
+        hit_rate_sums = np.bincount(codes, weights=hit_rates, minlength=len(self.modes))
+        for code, mode in enumerate(self.modes):
+            if games[code]:
+                summary["modes"][mode] = {"games": int(games[code]),
+                                          "avg_score": float(score_sums[code] / games[code]),
+                                          "avg_hit_rate": float(hit_rate_sums[code] / games[code])}
+        return summary
+
+    def recent_xzh(self, count):
+        """
+        从列数组还原最近若干局的记录
+        结果有损：只包含列式缓存中的字段，回放路径等其他字段不在其中，需要时用store.recent_xzh读取原始记录
+        :param count: 局数
+        :return: 游戏数据列表（按保存顺序，最新的在最后）
+        """
+        start = max(self.count - count, 0) if count > 0 else self.count
+        columns = {name: self[name][start:].tolist() for name in COLUMN_DTYPES_XZH}
+        return [{"mode": self.modes[columns["mode"][i]],
+                 "score": columns["score"][i],
+                 "level": columns["level"][i],
+                 "duration": columns["duration"][i],
+                 "hit_rate": columns["hit_rate"][i],
+                 "bricks_hit": columns["bricks_hit"][i],
+                 "lives_remaining": columns["lives_remaining"][i],
+                 "timestamp": format_timestamp_xzh(columns["timestamp"][i]),
+                 "won": bool(columns["won"][i])}
+                for i in range(self.count - start)]
+
+    def to_columns_xzh(self, records):
+        """
+        把记录转换为各列的数组（遇到新模式时加入模式表）
+        :param records: 游戏数据字典列表
+        :return: 列名 -> NumPy数组
+        """
+        codes = {mode: code for code, mode in enumerate(self.modes)}
+        mode_codes = []
+        for record in records:
+            code = codes.get(record['mode'])
+            if code is None:
+                code = codes[record['mode']] = len(self.modes)
+                self.modes.append(record['mode'])
+            mode_codes.append(code)
+
+        values = {
+            "score": [record['score'] for record in records],
+            "hit_rate": [record['hit_rate'] for record in records],
+            "duration": [record.get('duration', 0) for record in records],
+            "bricks_hit": [record.get('bricks_hit', 0) for record in records],
+            "lives_remaining": [record.get('lives_remaining', 0) for record in records],
+            "level": [record.get('level', 1) for record in records],
+            "won": [bool(record.get('won', False)) for record in records],
+            "mode": mode_codes,
+            "timestamp": [parse_timestamp_xzh(record.get('timestamp')) for record in records],
+        }
+        return {name: np.asarray(values[name], dtype=dtype) for name, dtype in COLUMN_DTYPES_XZH.items()}
+
+    def write_meta_xzh(self):
+        """原子地写入元数据"""
+        meta = {"version": COLUMN_CACHE_VERSION_XZH, "count": self.count, "source": self.source,
+                "position": self.position, "fingerprint": self.fingerprint, "modes": self.modes}
+        write_file_atomic_xzh(os.path.join(self.directory, COLUMN_META_FILE_XZH),
+                              json.dumps(meta, ensure_ascii=False).encode('utf-8'))
+
+    def rebuild_xzh(self, store, source):
+        """
+        从头重建缓存：列文件原子地整体替换，不影响已映射的旧数组
+        :param store: 存储对象
+        :param source: 数据源标识
+        """
+        self.modes = []
+        records, self.position = store.read_from_xzh(0)
+        columns = self.to_columns_xzh(records)
+        for name, array in columns.items():
+            write_file_atomic_xzh(self.column_path_xzh(name), array.tobytes())
+        self.count = len(records)
+        self.source = source
+        self.fingerprint = store.fingerprint_xzh(self.position)
+        self.arrays = {}  # 局数变化后重新映射
+        self.write_meta_xzh()
+
+    def append_xzh(self, records, position, fingerprint):
+        """
+        把新记录追加到各列末尾
+        列文件写在第count个元素之后（上次追加后崩溃留下的多余数据会被覆盖），元数据最后更新
+        :param records: 新增的游戏数据字典列表
+        :param position: 数据源中新的读取位置
+        :param fingerprint: 数据源在新位置的指纹
+        """
+        columns = self.to_columns_xzh(records)
+        for name, array in columns.items():
+            with open(self.column_path_xzh(name), 'r+b') as f:
+                f.seek(self.count * array.itemsize)
+                f.write(array.tobytes())
+        self.count += len(records)
+        self.position = position
+        self.fingerprint = fingerprint
+        self.arrays = {}
+        self.write_meta_xzh()
+
+    def refresh_xzh(self, store=None):
+        """
+        与存储同步：只读取上次之后新增的记录
+        数据源变化、被截断或已读部分的内容指纹不一致（文件被替换或改写）时重建
+        :param store: 存储对象（默认get_store_xzh()，先等待后台保存写完）
+        :return: 新增的局数
+        """
+        if store is None:
+            flush_pending_saves_xzh()
+            store = get_store_xzh()
+        source = f"{type(store).__name__}:{os.path.abspath(store.path)}"
+        os.makedirs(self.directory, exist_ok=True)
+
+        # 列文件缺失或比元数据记录的短时无法增量刷新
+        missing = any(not os.path.exists(self.column_path_xzh(name))
+                      or os.path.getsize(self.column_path_xzh(name)) < self.count * dtype.itemsize
+                      for name, dtype in COLUMN_DTYPES_XZH.items())
+        result = None
+        if source == self.source and not missing and store.fingerprint_xzh(self.position) == self.fingerprint:
+            result = store.read_from_xzh(self.position)
+        before = self.count
+        if result is None:
+            self.rebuild_xzh(store, source)
+            added = self.count
+        else:
+            records, position = result
+            if records:
+                self.append_xzh(records, position, store.fingerprint_xzh(position))
+            elif position != self.position:
+                # 只跳过了损坏的行
+                self.position = position
+                self.fingerprint = store.fingerprint_xzh(position)
+                self.write_meta_xzh()
+            added = self.count - before
+        return added
+
+
+def load_history_columns_xzh(store=None):
+    """
+    通过进程内的历史缓存打开列式缓存（存储未变时不读取存储，变化时只解析新增的记录）
+    :param store: 存储对象（默认get_store_xzh()，先等待后台保存写完）
+    :return: HistoryColumns_xzh对象
+    """
+    if store is None:
+        flush_pending_saves_xzh()
+        store = get_store_xzh()
+    return history_cache_xzh.load_columns_xzh(store)
+
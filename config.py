@@ -7,7 +7,24 @@
 # 屏幕设置
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
-FPS = 60
+FPS = 60  # 物理模拟频率（每秒模拟帧数）
+RENDER_FPS_XZH = 120  # 渲染帧率上限（0表示不限制），与物理模拟频率无关
+MAX_CATCHUP_TICKS_XZH = 5  # 每渲染一帧最多追赶的模拟帧数（机器过慢时游戏放慢而不是卡死）
+INTERPOLATION_SNAP_DISTANCE_XZH = 100  # 一帧内移动超过该距离视为瞬移（如球重置），不做插值
+
+# 加速模式设置（测试和演示用，游戏中按T切换）
+TURBO_OFF_XZH = 0  # 正常速度
+TURBO_FRAMES_XZH = 1  # 每渲染一帧执行TURBO_TICKS_PER_FRAME_XZH个模拟帧，不限制帧率
+TURBO_HEADLESS_XZH = 2  # 完全不渲染，按任意键恢复正常速度
+TURBO_TICKS_PER_FRAME_XZH = 120  # 加速模式下每批执行的模拟帧数
+TURBO_REPORT_INTERVAL_XZH = 1.0  # 加速模式统计模拟速度的间隔（秒）
+AUTOPLAY_SKILL_XZH = 1.0  # 游戏中按P接管的自动玩家技能水平
+
+# 渲染设置
+DIRTY_RECT_MODE_XZH = False  # 脏矩形渲染：只刷新发生变化的区域（低配机器建议开启）
+TEXT_CACHE_SIZE_XZH = 64  # 文字渲染缓存的最大条目数
+PADDLE_SPRITE_CACHE_SIZE_XZH = 4  # 挡板精灵缓存保留的宽度数量（旧宽度会被淘汰）
+SHOW_DEBUG_STATS_XZH = False  # 显示调试统计（本关对象分配数、粒子数），游戏中按F3切换
 
 # 颜色定义 (R, G, B)
 COLOR_BLACK_XZH = (0, 0, 0)
@@ -55,6 +72,22 @@ BRICK_COLORS_XZH = [
     COLOR_CYAN_XZH
 ]
 
+# 粒子效果设置
+PARTICLE_CAPACITY_XZH = 2048  # 粒子池容量（预分配）
+PARTICLES_PER_BRICK_XZH = 15  # 每块砖块破碎时生成的粒子数
+PARTICLE_LIFE_XZH = 30  # 粒子生命周期（帧）
+PARTICLE_SPRITE_CACHE_SIZE_XZH = 1024  # 粒子精灵缓存的最大条目数（颜色 × 透明度 × 整数尺寸）
+
+# 物理模拟设置
+SWEPT_COLLISION_XZH = False  # 连续（扫掠）碰撞检测：允许更大的时间步长和更高的球速
+MAX_BOUNCES_PER_STEP_XZH = 8  # 连续碰撞模式下每个时间步最多处理的反弹次数
+
+# 多球模式设置
+MULTIBALL_MODE_XZH = False  # 多球模式：每击碎一定数量的砖块分裂出新球，所有球批量做碰撞检测
+MULTIBALL_TRIGGER_HITS_XZH = 10  # 每击碎多少块砖块触发一次分裂
+MULTIBALL_SPLIT_COUNT_XZH = 3  # 每次分裂新增的球数
+MULTIBALL_MAX_BALLS_XZH = 64  # 同时存在的球数上限
+
 # 游戏设置
 INITIAL_LIVES_XZH = 3
 POINTS_PER_BRICK_XZH = 10
@@ -65,6 +98,30 @@ HIT_RATE_THRESHOLD_HIGH_XZH = 0.50  # 命中率高于50%增加难度
 PADDLE_WIDTH_ADJUSTMENT_XZH = 3  # 挡板宽度调整幅度（每次缩短3像素）
 PADDLE_SPEED_ADJUSTMENT_XZH = 0.3  # 挡板速度调整幅度（每次增加0.3）
 
+# 自动玩家与难度调优设置
+AUTOPLAY_MAX_REACTION_TICKS_XZH = 12  # 技能为0时的反应延迟（帧）
+AUTOPLAY_MAX_AIM_ERROR_XZH = 0.6  # 技能为0时的瞄准误差（挡板宽度的比例，标准差）
+AUTOPLAY_PREDICT_SKILL_XZH = 0.5  # 技能达到该值时预判落点（否则只追随球）
+AUTOPLAY_STEER_RANGE_XZH = 0.3  # 有意偏离挡板中心击球的最大幅度（挡板宽度的比例），避免球陷入垂直往返
+TOURNAMENT_MAX_TICKS_XZH = 18000  # 每局最多模拟的帧数（挑战模式没有终点）
+TOURNAMENT_SKILLS_XZH = [0.3, 0.6, 0.9]  # 默认参与调优的玩家技能
+TOURNAMENT_GRID_XZH = {  # 默认扫描的难度参数网格
+    "check_interval": [3, 5],
+    "hit_rate_threshold": [0.4, 0.5, 0.6],
+    "width_adjustment": [3, 6],
+    "speed_adjustment": [0.3],
+}
+
+# 训练环境设置
+ENV_FRAME_SKIP_XZH = 4  # 每个环境步重复执行动作的模拟帧数
+ENV_MAX_TICKS_XZH = 18000  # 每个回合最多模拟的帧数（超过后截断）
+ENV_LIFE_PENALTY_XZH = 1.0  # 丢失一条生命的惩罚（击碎一块砖块奖励1）
+ENV_FRAME_SCALE_XZH = 8  # 画面观测的缩小倍数（800x600 -> 100x75）
+
+# 回放设置
+SNAPSHOT_INTERVAL_TICKS_XZH = 600  # 录制回放时每隔多少帧保存一次状态快照（10秒；跳转时最多向前模拟这么多帧）
+REPLAY_SEEK_SECONDS_XZH = 10  # 播放回放时按左右方向键跳转的秒数
+
 # 游戏模式
 MODE_CLASSIC_XZH = "classic"  # 经典模式
 MODE_CHALLENGE_XZH = "challenge"  # 挑战模式
@@ -75,8 +132,18 @@ CHALLENGE_BRICK_ROWS_XZH = 8  # 挑战模式砖块行数
 CHALLENGE_SPEED_MULTIPLIER_XZH = 1.5  # 挑战模式速度倍率
 
 # 数据文件路径
-DATA_FILE_PATH_XZH = "data.json"
+DATA_FILE_PATH_XZH = "data.json"  # 旧版游戏数据文件（首次运行时迁移到历史记录文件）
+HISTORY_FILE_PATH_XZH = "games.jsonl"  # 游戏历史记录（只追加，每局一行）
+HISTORY_DB_PATH_XZH = "games.db"  # SQLite游戏历史数据库（使用sqlite后端时）
+COLUMN_CACHE_DIR_XZH = "history_columns"  # 分析用的列式缓存目录（可随时删除，下次使用时重建）
+RECENT_READ_BLOCK_XZH = 64 * 1024  # 读取最近记录时从文件末尾向前每次读取的字节数
+FINGERPRINT_BLOCK_XZH = 4096  # 列式缓存校验数据源时读取的开头和结尾字节数
+SAVE_QUEUE_SIZE_XZH = 64  # 后台保存队列的最大长度（队列满时保存调用等待）
+SAVE_BATCH_SIZE_XZH = 32  # 后台保存每次提交的最大记录数
+STORAGE_BACKEND_XZH = "jsonl"  # 游戏记录存储后端："jsonl"（只追加文件）或 "sqlite"（带索引，适合大量共享记录）
 REPORT_IMAGE_PATH_XZH = "player_report.png"
+TOURNAMENT_RESULT_PATH_XZH = "tournament_results.json"
+REPLAY_DIR_XZH = "replays"  # 回放文件目录
 
 # 字体设置
 FONT_SIZE_LARGE_XZH = 48
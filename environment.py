@@ -0,0 +1,355 @@
+# -*- coding: utf-8 -*-
+"""
+训练环境模块
+在无界面的游戏规则核心上提供类似Gym的 reset/step 接口，以及在同一进程内或多个工作进程中
+同步推进多个环境的向量化封装（工作进程通过共享内存写入观测）
+"""
+
+import random
+from multiprocessing import Pipe, Process
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
+from config import *
+from simulation import GameCore_xzh, INPUT_LEFT_XZH, INPUT_RIGHT_XZH, INPUT_LAUNCH_XZH
+
+# 离散动作 -> 输入位掩码
+ACTIONS_XZH = (
+    0,  # 不动
+    INPUT_LEFT_XZH,  # 左移
+    INPUT_RIGHT_XZH,  # 右移
+    INPUT_LAUNCH_XZH,  # 发射
+)
+
+OBS_STATE_SIZE_XZH = 9  # 状态向量中砖块以外的部分（球、挡板、生命值）
+
+
+class BreakoutEnv_xzh:
+    """
+    单个训练环境
+    观测为状态向量（float32：球、挡板、生命值和每块砖块是否可见）或缩小后的灰度画面（uint8）；
+    奖励为击碎的砖块数减去丢失生命的惩罚
+    """
+
+    def __init__(self, mode=MODE_CLASSIC_XZH, obs_type="vector", frame_skip=ENV_FRAME_SKIP_XZH,
+                 max_ticks=ENV_MAX_TICKS_XZH, seed=None):
+        """
+        初始化环境
+        :param mode: 游戏模式
+        :param obs_type: 观测类型，"vector"（状态向量）或 "frame"（缩小画面）
+        :param frame_skip: 每步重复执行动作的模拟帧数
+        :param max_ticks: 每个回合最多模拟的帧数
+        :param seed: 未指定种子的reset使用的随机种子序列的初始种子
+        """
+        if obs_type not in ("vector", "frame"):
+            raise ValueError(f"未知的观测类型: {obs_type}")
+        self.mode = mode
+        self.obs_type = obs_type
+        self.frame_skip = frame_skip
+        self.max_ticks = max_ticks
+        self.seed_rng = random.Random(seed)
+        self.game = None
+
+        rows = BRICK_ROWS_XZH if mode == MODE_CLASSIC_XZH else CHALLENGE_BRICK_ROWS_XZH
+        self.num_bricks = rows * BRICK_COLS_XZH
+        self.initial_lives = INITIAL_LIVES_XZH if mode == MODE_CLASSIC_XZH else CHALLENGE_LIVES_XZH
+        self.num_actions = len(ACTIONS_XZH)
+        if obs_type == "vector":
+            self.observation_shape = (OBS_STATE_SIZE_XZH + self.num_bricks,)
+            self.observation_dtype = np.float32
+        else:
+            self.observation_shape = (SCREEN_HEIGHT // ENV_FRAME_SCALE_XZH, SCREEN_WIDTH // ENV_FRAME_SCALE_XZH)
+            self.observation_dtype = np.uint8
+
+    def reset(self, seed=None):
+        """
+        开始新回合
+        :param seed: 游戏随机种子（为None时从环境的种子序列中抽取）
+        :return: 初始观测
+        """
+        if seed is not None:
+            self.seed_rng = random.Random(seed)
+        else:
+            seed = self.seed_rng.getrandbits(32)
+        self.game = GameCore_xzh(self.mode, seed=seed)
+        return self.observe_xzh()
+
+    def step(self, action):
+        """
+        执行一个动作（重复frame_skip个模拟帧）
+        :param action: 动作编号（见ACTIONS_XZH）
+        :return: (观测, 奖励, 是否结束, 信息字典)
+        """
+        game = self.game
+        inputs = ACTIONS_XZH[action]
+        score = game.score
+        lives = game.lives
+        finished = False
+        for _ in range(self.frame_skip):
+            if game.step_xzh(inputs):
+                finished = True
+                break
+
+        reward = (game.score - score) / POINTS_PER_BRICK_XZH - (lives - game.lives) * ENV_LIFE_PENALTY_XZH
+        truncated = not finished and game.tick >= self.max_ticks
+        info = {
+            "score": game.score,
+            "level": game.level,
+            "lives": game.lives,
+            "tick": game.tick,
+            "won": game.game_won,
+            "truncated": truncated,
+        }
+        return self.observe_xzh(), reward, finished or truncated, info
+
+    def observe_xzh(self, out=None):
+        """
+        生成当前观测
+        :param out: 写入观测的数组（为None时新建），向量化环境用它直接写入共享缓冲区
+        :return: 观测数组
+        """
+        if out is None:
+            out = np.zeros(self.observation_shape, dtype=self.observation_dtype)
+        if self.obs_type == "vector":
+            self.observe_vector_xzh(out)
+        else:
+            self.observe_frame_xzh(out)
+        return out
+
+    def observe_vector_xzh(self, out):
+        """
+        写入状态向量（坐标和速度都归一化到约-1到1）
+        :param out: 目标数组
+        """
+        ball = self.game.ball
+        paddle = self.game.paddle
+        out[0] = ball.x / SCREEN_WIDTH
+        out[1] = ball.y / SCREEN_HEIGHT
+        out[2] = ball.dx / BALL_SPEED_MAX_XZH
+        out[3] = ball.dy / BALL_SPEED_MAX_XZH
+        out[4] = ball.active
+        out[5] = paddle.x / SCREEN_WIDTH
+        out[6] = paddle.width / SCREEN_WIDTH
+        out[7] = paddle.speed / PADDLE_SPEED_MAX_XZH
+        out[8] = self.game.lives / self.initial_lives
+        out[OBS_STATE_SIZE_XZH:] = np.frombuffer(self.game.bricks.visible, dtype=np.uint8)
+
+    def observe_frame_xzh(self, out):
+        """
+        写入缩小的灰度画面：砖块128，挡板和球255
+        :param out: 目标数组
+        """
+        scale = ENV_FRAME_SCALE_XZH
+        out.fill(0)
+        bricks = self.game.bricks
+        for index in range(len(bricks)):
+            if bricks.visible[index]:
+                x, y, width, height = bricks.get_bounds_xzh(index)
+                out[y // scale:(y + height) // scale, x // scale:(x + width) // scale] = 128
+        paddle = self.game.paddle
+        out[int(paddle.y) // scale:int(paddle.y + paddle.height) // scale + 1,
+            int(paddle.x) // scale:int(paddle.x + paddle.width) // scale + 1] = 255
+        ball = self.game.ball
+        row = int(ball.y) // scale
+        col = int(ball.x) // scale
+        if 0 <= row < out.shape[0] and 0 <= col < out.shape[1]:
+            out[row, col] = 255
+
+
+class VectorEnv_xzh:
+    """
+    同一进程内的向量化环境
+    所有环境同步推进，回合结束的环境自动重置（结束时的观测放在信息字典的terminal_observation中）
+    """
+
+    def __init__(self, num_envs, **env_kwargs):
+        """
+        初始化向量化环境
+        :param num_envs: 环境数量
+        :param env_kwargs: 传给BreakoutEnv_xzh的参数
+        """
+        self.num_envs = num_envs
+        self.envs = [BreakoutEnv_xzh(**env_kwargs) for _ in range(num_envs)]
+        env = self.envs[0]
+        self.observations = np.zeros((num_envs,) + env.observation_shape, dtype=env.observation_dtype)
+
+    def reset(self, seed=None):
+        """
+        重置所有环境
+        :param seed: 起始种子，第i个环境使用seed+i（为None时各自随机）
+        :return: 观测数组（下次调用时会被覆盖）
+        """
+        for index, env in enumerate(self.envs):
+            env.reset(None if seed is None else seed + index)
+            env.observe_xzh(self.observations[index])
+        return self.observations
+
+    def step(self, actions):
+        """
+        所有环境各执行一个动作
+        :param actions: 每个环境的动作编号
+        :return: (观测数组, 奖励数组, 结束标记数组, 信息字典列表)
+        """
+        rewards = np.zeros(self.num_envs, dtype=np.float32)
+        dones = np.zeros(self.num_envs, dtype=bool)
+        infos = []
+        for index, env in enumerate(self.envs):
+            _, rewards[index], dones[index], info = env_step_into_xzh(env, actions[index], self.observations[index])
+            infos.append(info)
+        return self.observations, rewards, dones, infos
+
+    def close(self):
+        """释放资源（同一进程内无需处理）"""
+
+
+def env_step_into_xzh(env, action, out):
+    """
+    推进一个环境并把观测写入out，回合结束时自动重置
+    :param env: BreakoutEnv_xzh对象
+    :param action: 动作编号
+    :param out: 写入观测的数组
+    :return: (out, 奖励, 是否结束, 信息字典)
+    """
+    _, reward, done, info = env.step(action)
+    if done:
+        info["terminal_observation"] = env.observe_xzh()
+        env.reset()
+    env.observe_xzh(out)
+    return out, reward, done, info
+
+
+def env_worker_xzh(conn, shm_name, shape, dtype, start, count, env_kwargs):
+    """
+    工作进程：推进分到的一段环境，观测直接写入共享内存
+    :param conn: 与主进程通信的管道
+    :param shm_name: 共享内存名称
+    :param shape: 全部观测的形状
+    :param dtype: 观测数据类型
+    :param start: 本进程负责的第一个环境编号
+    :param count: 本进程负责的环境数量
+    :param env_kwargs: 传给BreakoutEnv_xzh的参数
+    """
+    shm = SharedMemory(name=shm_name)
+    observations = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    envs = [BreakoutEnv_xzh(**env_kwargs) for _ in range(count)]
+    try:
+        while True:
+            command, data = conn.recv()
+            if command == "step":
+                rewards = np.zeros(count, dtype=np.float32)
+                dones = np.zeros(count, dtype=bool)
+                infos = []
+                for index, env in enumerate(envs):
+                    _, rewards[index], dones[index], info = env_step_into_xzh(
+                        env, data[index], observations[start + index])
+                    infos.append(info)
+                conn.send((rewards, dones, infos))
+            elif command == "reset":
+                for index, env in enumerate(envs):
+                    env.reset(None if data is None else data + index)
+                    env.observe_xzh(observations[start + index])
+                conn.send(None)
+            elif command == "close":
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        del observations
+        shm.close()
+        conn.close()
+
+
+class SubprocVectorEnv_xzh:
+    """
+    多进程向量化环境
+    环境平均分到多个工作进程，观测写入主进程创建的共享内存，管道中只传递动作、奖励和结束标记
+    """
+
+    def __init__(self, num_envs, num_workers=2, **env_kwargs):
+        """
+        初始化多进程向量化环境
+        :param num_envs: 环境数量
+        :param num_workers: 工作进程数
+        :param env_kwargs: 传给BreakoutEnv_xzh的参数
+        """
+        self.num_envs = num_envs
+        num_workers = max(1, min(num_workers, num_envs))
+        probe = BreakoutEnv_xzh(**env_kwargs)
+        shape = (num_envs,) + probe.observation_shape
+        dtype = probe.observation_dtype
+        self.shm = SharedMemory(create=True, size=int(np.prod(shape)) * np.dtype(dtype).itemsize)
+        self.observations = np.ndarray(shape, dtype=dtype, buffer=self.shm.buf)
+
+        # 按工作进程切分环境
+        self.slices = []
+        self.conns = []
+        self.processes = []
+        per_worker, extra = divmod(num_envs, num_workers)
+        start = 0
+        for worker in range(num_workers):
+            count = per_worker + (1 if worker < extra else 0)
+            parent_conn, child_conn = Pipe()
+            process = Process(target=env_worker_xzh,
+                              args=(child_conn, self.shm.name, shape, dtype, start, count, env_kwargs),
+                              daemon=True)
+            process.start()
+            child_conn.close()
+            self.slices.append((start, count))
+            self.conns.append(parent_conn)
+            self.processes.append(process)
+            start += count
+        self.closed = False
+
+    def reset(self, seed=None):
+        """
+        重置所有环境
+        :param seed: 起始种子，第i个环境使用seed+i（为None时各自随机）
+        :return: 共享的观测数组（下次调用时会被覆盖）
+        """
+        for (start, _), conn in zip(self.slices, self.conns):
+            conn.send(("reset", None if seed is None else seed + start))
+        for conn in self.conns:
+            conn.recv()
+        return self.observations
+
+    def step(self, actions):
+        """
+        所有环境各执行一个动作（各工作进程并行推进）
+        :param actions: 每个环境的动作编号
+        :return: (观测数组, 奖励数组, 结束标记数组, 信息字典列表)
+        """
+        for (start, count), conn in zip(self.slices, self.conns):
+            conn.send(("step", list(actions[start:start + count])))
+        rewards = []
+        dones = []
+        infos = []
+        for conn in self.conns:
+            worker_rewards, worker_dones, worker_infos = conn.recv()
+            rewards.append(worker_rewards)
+            dones.append(worker_dones)
+            infos.extend(worker_infos)
+        return self.observations, np.concatenate(rewards), np.concatenate(dones), infos
+
+    def close(self):
+        """关闭工作进程并释放共享内存"""
+        if self.closed:
+            return
+        self.closed = True
+        for conn in self.conns:
+            try:
+                conn.send(("close", None))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self.processes:
+            process.join(timeout=5)
+        for conn in self.conns:
+            conn.close()
+        del self.observations
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
@@ -1,54 +1,292 @@
 # -*- coding: utf-8 -*-
 """
-游戏核心逻辑模块
-包含游戏的所有核心类和函数
+游戏渲染与运行模块
+在simulation.py的规则核心之上提供窗口、输入处理、绘制和游戏数据存取
 """
 
 import pygame
+import numpy as np
 import random
 import math
 import time
-import json
-from datetime import datetime
+from collections import OrderedDict
 from config import *
+from simulation import (GameCore_xzh, PaddleState_xzh, BallState_xzh, BrickState_xzh,
+                        INPUT_LEFT_XZH, INPUT_RIGHT_XZH, INPUT_LAUNCH_XZH)
+from replay import Replay_xzh, seek_replay_xzh
+from autoplay import AutoPlayer_xzh
 
 
-class Particle_xzh:
-    """粒子效果类 - 用于砖块破碎特效"""
-
-    def __init__(self, x, y, color):
-        self.x = x
-        self.y = y
-        self.vx = random.uniform(-3, 3)
-        self.vy = random.uniform(-5, -1)
-        self.color = color
-        self.life = 30  # 生命周期
-        self.size = random.randint(2, 5)
-
-    def update(self):
-        self.x += self.vx
-        self.y += self.vy
-        self.vy += 0.3  # 重力效果
-        self.life -= 1
-        self.size = max(1, self.size - 0.1)
-
-    def draw(self, screen):
-        alpha = int(255 * (self.life / 30))
-        color = (*self.color, alpha) if len(self.color) == 3 else self.color
-        try:
-            s = pygame.Surface((self.size * 2, self.size * 2), pygame.SRCALPHA)
-            pygame.draw.circle(s, color, (self.size, self.size), int(self.size))
-            screen.blit(s, (int(self.x - self.size), int(self.y - self.size)))
-        except:
-            pygame.draw.circle(screen, self.color[:3], (int(self.x), int(self.y)), int(self.size))
+class LRUCache_xzh:
+    """最近最少使用缓存 - 超出容量时淘汰最久未使用的条目"""
+
+    def __init__(self, maxsize):
+        """
+        初始化缓存
+        :param maxsize: 最大条目数
+        """
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        """
+        读取缓存条目
+        :param key: 键
+        :return: 缓存的值，不存在时返回None
+        """
+        value = self.entries.get(key)
+        if value is not None:
+            self.entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        """
+        写入缓存条目，必要时淘汰最久未使用的条目
+        :param key: 键
+        :param value: 值
+        """
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        """清空缓存"""
+        self.entries.clear()
+
+
+# 面板缓存：(尺寸, 填充色, 边框色, 边框宽度, 圆角) -> 半透明圆角面板Surface
+_panel_cache_xzh = {}
+
+
+def get_panel_surface_xzh(width, height, fill_color, border_color, border_width, border_radius):
+    """
+    获取带边框的半透明圆角面板，同一外观只构建一次
+    :param width: 面板宽度
+    :param height: 面板高度
+    :param fill_color: 填充颜色 (RGBA)
+    :param border_color: 边框颜色 (RGBA)
+    :param border_width: 边框宽度
+    :param border_radius: 圆角半径
+    :return: 带透明通道的Surface
+    """
+    key = (width, height, fill_color, border_color, border_width, border_radius)
+    panel = _panel_cache_xzh.get(key)
+    if panel is None:
+        panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        pygame.draw.rect(panel, fill_color, (0, 0, width, height), border_radius=border_radius)
+        pygame.draw.rect(panel, border_color, (0, 0, width, height), border_width, border_radius=border_radius)
+        _panel_cache_xzh[key] = panel
+    return panel
+
+
+# 粒子精灵缓存：(颜色, 透明度, 整数尺寸) -> 预渲染的Surface（容量有限，长时间游戏不会无限增长）
+_particle_sprite_cache_xzh = LRUCache_xzh(PARTICLE_SPRITE_CACHE_SIZE_XZH)
+
+
+def get_particle_sprite_xzh(color, alpha, size):
+    """
+    获取指定颜色、透明度和尺寸的粒子精灵
+    :param color: 粒子颜色
+    :param alpha: 透明度 (0-255)
+    :param size: 粒子半径（整数像素，调用方先取整）
+    :return: 带透明通道的Surface
+    """
+    key = (color, alpha, size)
+    sprite = _particle_sprite_cache_xzh.get(key)
+    if sprite is None:
+        sprite = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
+        pygame.draw.circle(sprite, (*color[:3], alpha), (size, size), size)
+        _particle_sprite_cache_xzh.put(key, sprite)
+    return sprite
+
+
+class ParticleSystem_xzh:
+    """粒子系统 - 用预分配的连续数组保存所有粒子，用于砖块破碎特效"""
 
-    def is_dead(self):
-        return self.life <= 0
+    def __init__(self, capacity=PARTICLE_CAPACITY_XZH, rng=None):
+        """
+        初始化粒子系统
+        :param capacity: 粒子池容量，超出容量的新粒子将被丢弃
+        :param rng: 随机数生成器（默认使用random模块）
+        """
+        self.capacity = capacity
+        self.rng = rng if rng is not None else random
+        self.count = 0  # 当前存活粒子数，存活粒子始终位于数组前count个位置
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.size = np.zeros(capacity)
+        self.life = np.zeros(capacity, dtype=np.int32)
+        self.color_index = np.zeros(capacity, dtype=np.int32)
+        self.palette = []  # 颜色表，color_index指向其中的颜色
+        self.palette_index = {}
+
+    def __len__(self):
+        return self.count
+
+    def emit_xzh(self, x, y, color, count=PARTICLES_PER_BRICK_XZH):
+        """
+        在指定位置生成一批粒子
+        :param x: X坐标
+        :param y: Y坐标
+        :param color: 粒子颜色
+        :param count: 粒子数量
+        """
+        color = tuple(color)
+        index = self.palette_index.get(color)
+        if index is None:
+            index = len(self.palette)
+            self.palette.append(color)
+            self.palette_index[color] = index
+
+        count = min(count, self.capacity - self.count)
+        for i in range(self.count, self.count + count):
+            self.vx[i] = self.rng.uniform(-3, 3)
+            self.vy[i] = self.rng.uniform(-5, -1)
+            self.size[i] = self.rng.randint(2, 5)
+        end = self.count + count
+        self.x[self.count:end] = x
+        self.y[self.count:end] = y
+        self.life[self.count:end] = PARTICLE_LIFE_XZH
+        self.color_index[self.count:end] = index
+        self.count = end
+
+    def update_xzh(self):
+        """一次向量化更新所有粒子，并用交换删除压缩死亡粒子"""
+        n = self.count
+        if n == 0:
+            return
+
+        self.x[:n] += self.vx[:n]
+        self.y[:n] += self.vy[:n]
+        self.vy[:n] += 0.3  # 重力效果
+        self.life[:n] -= 1
+        np.maximum(self.size[:n] - 0.1, 1, out=self.size[:n])
+
+        dead = np.flatnonzero(self.life[:n] <= 0)
+        if dead.size == 0:
+            return
+
+        # 交换删除：用尾部的存活粒子填补前部的空位
+        new_count = n - dead.size
+        holes = dead[dead < new_count]
+        if holes.size:
+            tail = np.arange(new_count, n)
+            movers = tail[self.life[new_count:n] > 0]
+            for array in (self.x, self.y, self.vx, self.vy, self.size, self.life, self.color_index):
+                array[holes] = array[movers]
+        self.count = new_count
 
+    def draw_xzh(self, screen):
+        """
+        绘制所有粒子（从精灵缓存中取图，一次blits调用完成）
+        :param screen: Pygame屏幕对象
+        """
+        n = self.count
+        if n == 0:
+            return
+
+        palette = self.palette
+        alphas = (255 * (self.life[:n] / PARTICLE_LIFE_XZH)).astype(np.int32).tolist()
+        sizes = np.rint(self.size[:n]).astype(np.int32).tolist()  # 尺寸取整，精灵种类有限
+        xs = self.x[:n].tolist()
+        ys = self.y[:n].tolist()
+        colors = self.color_index[:n].tolist()
+        screen.blits([(get_particle_sprite_xzh(palette[c], a, s), (int(x - s), int(y - s)))
+                      for x, y, s, a, c in zip(xs, ys, sizes, alphas, colors)], False)
 
-class Paddle_xzh:
+    def get_draw_rect_xzh(self):
+        """
+        获取所有粒子覆盖区域的外接矩形
+        :return: pygame.Rect对象，没有粒子时返回None
+        """
+        n = self.count
+        if n == 0:
+            return None
+        left = int(np.min(self.x[:n] - self.size[:n])) - 1
+        top = int(np.min(self.y[:n] - self.size[:n])) - 1
+        right = int(np.max(self.x[:n] + self.size[:n])) + 2
+        bottom = int(np.max(self.y[:n] + self.size[:n])) + 2
+        return pygame.Rect(left, top, right - left, bottom - top)
+
+    def clear_xzh(self):
+        """清除所有粒子"""
+        self.count = 0
+
+
+def get_render_position_xzh(entity, alpha):
+    """
+    在上一模拟帧与当前模拟帧之间插值，得到渲染位置
+    :param entity: 带x/y和prev_x/prev_y属性的对象
+    :param alpha: 插值系数（0为上一帧，1为当前帧）
+    :return: (x, y)
+    """
+    delta_x = entity.x - entity.prev_x
+    delta_y = entity.y - entity.prev_y
+    if alpha >= 1 or math.hypot(delta_x, delta_y) > INTERPOLATION_SNAP_DISTANCE_XZH:
+        return entity.x, entity.y
+    return entity.prev_x + delta_x * alpha, entity.prev_y + delta_y * alpha
+
+
+# 挡板发光效果向外扩展的像素数
+PADDLE_GLOW_SIZE_XZH = 5
+
+# 挡板精灵缓存：(宽度, 高度) -> 预渲染的Surface，只保留最近使用的几种宽度
+_paddle_sprite_cache_xzh = LRUCache_xzh(PADDLE_SPRITE_CACHE_SIZE_XZH)
+
+
+def get_paddle_sprite_xzh(width, height):
+    """
+    获取挡板精灵（发光、渐变主体、高光、边框）
+    挡板宽度会随难度调整而变化，旧宽度的精灵由LRU淘汰，内存占用保持有界
+    :param width: 挡板宽度
+    :param height: 挡板高度
+    :return: 带透明通道的Surface，主体位于(PADDLE_GLOW_SIZE_XZH, PADDLE_GLOW_SIZE_XZH)
+    """
+    key = (width, height)
+    sprite = _paddle_sprite_cache_xzh.get(key)
+    if sprite is not None:
+        return sprite
+
+    glow = PADDLE_GLOW_SIZE_XZH
+    sprite = pygame.Surface((width + glow * 2, height + glow * 2), pygame.SRCALPHA)
+
+    # 绘制发光效果（外围）
+    pygame.draw.rect(sprite, (*COLOR_CYAN_XZH, 30), (0, 0, width + glow * 2, height + glow * 2), border_radius=8)
+
+    # 绘制主体渐变效果
+    for i in range(height):
+        ratio = i / height
+        r = int(COLOR_BLUE_XZH[0] + (100 - COLOR_BLUE_XZH[0]) * ratio)
+        g = int(COLOR_BLUE_XZH[1] + (150 - COLOR_BLUE_XZH[1]) * ratio)
+        b = int(COLOR_BLUE_XZH[2] + (255 - COLOR_BLUE_XZH[2]) * ratio)
+        pygame.draw.rect(sprite, (r, g, b), (glow, glow + i, width, 1))
+
+    # 绘制高光
+    highlight_surf = pygame.Surface((width, height // 3), pygame.SRCALPHA)
+    pygame.draw.rect(highlight_surf, (255, 255, 255, 80), (0, 0, width, height // 3), border_radius=5)
+    sprite.blit(highlight_surf, (glow, glow + 2))
+
+    # 绘制边框
+    pygame.draw.rect(sprite, (100, 200, 255), (glow, glow, width, height), 2, border_radius=5)
+
+    if pygame.display.get_surface() is not None:
+        sprite = sprite.convert_alpha()
+
+    _paddle_sprite_cache_xzh.put(key, sprite)
+    return sprite
+
+
+class Paddle_xzh(PaddleState_xzh):
     """挡板类"""
 
+    __slots__ = ("prev_x", "prev_y")
+
     def __init__(self, x, y, width):
         """
         初始化挡板
@@ -56,50 +294,33 @@ class Paddle_xzh:
         :param y: Y坐标
         :param width: 挡板宽度
         """
-        self.x = x
-        self.y = y
-        self.width = width
-        self.height = PADDLE_HEIGHT_XZH
-        self.speed = PADDLE_SPEED_XZH
-        self.color = PADDLE_COLOR_XZH
-
-    def move_left_xzh(self):
-        """向左移动挡板"""
-        self.x -= self.speed
-        if self.x < 0:
-            self.x = 0
-
-    def move_right_xzh(self):
-        """向右移动挡板"""
-        self.x += self.speed
-        if self.x + self.width > SCREEN_WIDTH:
-            self.x = SCREEN_WIDTH - self.width
+        PaddleState_xzh.__init__(self, x, y, width)
+        self.prev_x = x  # 上一模拟帧的位置（用于渲染插值）
+        self.prev_y = y
 
-    def draw_xzh(self, screen):
+    def save_position_xzh(self):
+        """记录当前位置，作为下一模拟帧插值的起点"""
+        self.prev_x = self.x
+        self.prev_y = self.y
+
+    def draw_xzh(self, screen, alpha=1.0):
         """
-        绘制挡板 - 带渐变和发光效果
+        绘制挡板 - 带渐变和发光效果（使用按宽度缓存的预渲染精灵）
         :param screen: Pygame屏幕对象
+        :param alpha: 渲染插值系数
         """
-        # 绘制发光效果（外围）
-        glow_surf = pygame.Surface((self.width + 10, self.height + 10), pygame.SRCALPHA)
-        pygame.draw.rect(glow_surf, (*COLOR_CYAN_XZH, 30), (0, 0, self.width + 10, self.height + 10), border_radius=8)
-        screen.blit(glow_surf, (self.x - 5, self.y - 5))
-
-        # 绘制主体渐变效果
-        for i in range(self.height):
-            ratio = i / self.height
-            r = int(COLOR_BLUE_XZH[0] + (100 - COLOR_BLUE_XZH[0]) * ratio)
-            g = int(COLOR_BLUE_XZH[1] + (150 - COLOR_BLUE_XZH[1]) * ratio)
-            b = int(COLOR_BLUE_XZH[2] + (255 - COLOR_BLUE_XZH[2]) * ratio)
-            pygame.draw.rect(screen, (r, g, b), (self.x, self.y + i, self.width, 1))
+        x, y = get_render_position_xzh(self, alpha)
+        sprite = get_paddle_sprite_xzh(int(self.width), self.height)
+        screen.blit(sprite, (int(x) - PADDLE_GLOW_SIZE_XZH, int(y) - PADDLE_GLOW_SIZE_XZH))
 
-        # 绘制高光
-        highlight_surf = pygame.Surface((self.width, self.height // 3), pygame.SRCALPHA)
-        pygame.draw.rect(highlight_surf, (255, 255, 255, 80), (0, 0, self.width, self.height // 3), border_radius=5)
-        screen.blit(highlight_surf, (self.x, self.y + 2))
-
-        # 绘制边框
-        pygame.draw.rect(screen, (100, 200, 255), (self.x, self.y, self.width, self.height), 2, border_radius=5)
+    def get_draw_rect_xzh(self, alpha=1.0):
+        """
+        获取挡板绘制时覆盖的区域（包含发光效果）
+        :param alpha: 渲染插值系数
+        :return: pygame.Rect对象
+        """
+        x, y = get_render_position_xzh(self, alpha)
+        return pygame.Rect(int(x) - 6, int(y) - 6, int(self.width) + 12, self.height + 12)
 
     def get_rect_xzh(self):
         """
@@ -108,30 +329,57 @@ class Paddle_xzh:
         """
         return pygame.Rect(self.x, self.y, self.width, self.height)
 
-    def adjust_width_xzh(self, delta):
-        """
-        调整挡板宽度
-        :param delta: 宽度变化量
-        """
-        self.width += delta
-        if self.width < PADDLE_WIDTH_MIN_XZH:
-            self.width = PADDLE_WIDTH_MIN_XZH
-        elif self.width > PADDLE_WIDTH_MAX_XZH:
-            self.width = PADDLE_WIDTH_MAX_XZH
 
-    def adjust_speed_xzh(self, delta):
-        """
-        调整挡板速度
-        :param delta: 速度变化量
-        """
-        self.speed += delta
-        if self.speed > PADDLE_SPEED_MAX_XZH:
-            self.speed = PADDLE_SPEED_MAX_XZH
+# 球光晕向外扩展的像素数
+BALL_GLOW_SIZE_XZH = 6
+
+# 球精灵缓存：半径 -> 预渲染的Surface
+_ball_sprite_cache_xzh = {}
+
+
+def get_ball_sprite_xzh(radius):
+    """
+    获取球精灵（三层光晕、主球体、高光、边框），同一半径只构建一次
+    :param radius: 球半径
+    :return: 带透明通道的Surface，球心位于精灵中心
+    """
+    sprite = _ball_sprite_cache_xzh.get(radius)
+    if sprite is not None:
+        return sprite
+
+    size = radius + BALL_GLOW_SIZE_XZH
+    sprite = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
+
+    # 绘制发光效果（外围光晕）
+    for i in range(3):
+        glow_radius = size - i * 2
+        alpha = 40 - i * 10
+        glow_surf = pygame.Surface((glow_radius * 2, glow_radius * 2), pygame.SRCALPHA)
+        pygame.draw.circle(glow_surf, (*COLOR_CYAN_XZH, alpha), (glow_radius, glow_radius), glow_radius)
+        sprite.blit(glow_surf, (size - glow_radius, size - glow_radius))
+
+    # 绘制主球体
+    pygame.draw.circle(sprite, (200, 200, 255), (size, size), radius)
+
+    # 绘制高光
+    highlight_offset = radius // 3
+    pygame.draw.circle(sprite, (255, 255, 255), (size - highlight_offset, size - highlight_offset), radius // 3)
+
+    # 绘制边框
+    pygame.draw.circle(sprite, (150, 200, 255), (size, size), radius, 2)
+
+    if pygame.display.get_surface() is not None:
+        sprite = sprite.convert_alpha()
 
+    _ball_sprite_cache_xzh[radius] = sprite
+    return sprite
 
-class Ball_xzh:
+
+class Ball_xzh(BallState_xzh):
     """球类"""
 
+    __slots__ = ("prev_x", "prev_y")
+
     def __init__(self, x, y, speed):
         """
         初始化球
@@ -139,191 +387,100 @@ class Ball_xzh:
         :param y: Y坐标
         :param speed: 球速
         """
-        self.x = x
-        self.y = y
-        self.radius = BALL_RADIUS_XZH
-        self.speed = speed
-        self.dx = 0
-        self.dy = 0
-        self.active = False
-        self.color = BALL_COLOR_XZH
-
-    def launch_xzh(self):
-        """发射球"""
-        if not self.active:
-            angle = random.uniform(-60, 60)  # 随机角度（度）
-            angle_rad = math.radians(angle)
-            self.dx = self.speed * math.sin(angle_rad)
-            self.dy = -self.speed * math.cos(angle_rad)
-            self.active = True
-
-    def move_xzh(self):
-        """移动球"""
-        if self.active:
-            self.x += self.dx
-            self.y += self.dy
-
-    def bounce_wall_xzh(self):
-        """处理球与墙壁的碰撞"""
-        # 左右墙壁
-        if self.x - self.radius <= 0 or self.x + self.radius >= SCREEN_WIDTH:
-            self.dx = -self.dx
-            # 修正位置防止穿墙
-            if self.x - self.radius < 0:
-                self.x = self.radius
-            if self.x + self.radius > SCREEN_WIDTH:
-                self.x = SCREEN_WIDTH - self.radius
-
-        # 顶部墙壁
-        if self.y - self.radius <= 0:
-            self.dy = -self.dy
-            self.y = self.radius
-
-    def bounce_paddle_xzh(self, paddle):
-        """
-        处理球与挡板的碰撞
-        :param paddle: Paddle_xzh对象
-        :return: 是否发生碰撞
-        """
-        if not self.active:
-            return False
-
-        ball_rect = pygame.Rect(self.x - self.radius, self.y - self.radius,
-                               self.radius * 2, self.radius * 2)
-        paddle_rect = paddle.get_rect_xzh()
-
-        if ball_rect.colliderect(paddle_rect) and self.dy > 0:
-            # 计算球击中挡板的相对位置
-            hit_pos = (self.x - paddle.x) / paddle.width  # 0到1之间
-            # 根据击中位置调整反弹角度
-            angle = (hit_pos - 0.5) * 120  # -60到60度
-            angle_rad = math.radians(angle)
-
-            speed = math.sqrt(self.dx ** 2 + self.dy ** 2)
-            self.dx = speed * math.sin(angle_rad)
-            self.dy = -speed * math.cos(angle_rad)
-
-            # 修正位置防止粘连
-            self.y = paddle.y - self.radius
-            return True
-        return False
-
-    def check_miss_xzh(self):
-        """
-        检查球是否掉落
-        :return: 是否掉落
-        """
-        return self.y - self.radius > SCREEN_HEIGHT
-
-    def reset_xzh(self, paddle):
-        """
-        重置球的位置
-        :param paddle: Paddle_xzh对象
-        """
-        self.x = paddle.x + paddle.width / 2
-        self.y = paddle.y - self.radius - 5
-        self.dx = 0
-        self.dy = 0
-        self.active = False
+        BallState_xzh.__init__(self, x, y, speed)
+        self.prev_x = x  # 上一模拟帧的位置（用于渲染插值）
+        self.prev_y = y
 
-    def draw_xzh(self, screen):
+    def save_position_xzh(self):
+        """记录当前位置，作为下一模拟帧插值的起点"""
+        self.prev_x = self.x
+        self.prev_y = self.y
+
+    def draw_xzh(self, screen, alpha=1.0):
         """
-        绘制球 - 带发光和渐变效果
+        绘制球 - 带发光和渐变效果（使用预渲染精灵）
         :param screen: Pygame屏幕对象
+        :param alpha: 渲染插值系数
         """
-        # 绘制发光效果（外围光晕）
-        for i in range(3):
-            glow_radius = self.radius + 6 - i * 2
-            alpha = 40 - i * 10
-            glow_surf = pygame.Surface((glow_radius * 2, glow_radius * 2), pygame.SRCALPHA)
-            pygame.draw.circle(glow_surf, (*COLOR_CYAN_XZH, alpha),
-                             (glow_radius, glow_radius), glow_radius)
-            screen.blit(glow_surf, (int(self.x - glow_radius), int(self.y - glow_radius)))
+        x, y = get_render_position_xzh(self, alpha)
+        glow_radius = self.radius + BALL_GLOW_SIZE_XZH
+        screen.blit(get_ball_sprite_xzh(self.radius), (int(x) - glow_radius, int(y) - glow_radius))
 
-        # 绘制主球体（渐变效果）
-        pygame.draw.circle(screen, (200, 200, 255), (int(self.x), int(self.y)), self.radius)
+    def get_draw_rect_xzh(self, alpha=1.0):
+        """
+        获取球绘制时覆盖的区域（包含光晕）
+        :param alpha: 渲染插值系数
+        :return: pygame.Rect对象
+        """
+        x, y = get_render_position_xzh(self, alpha)
+        glow_radius = self.radius + BALL_GLOW_SIZE_XZH
+        return pygame.Rect(int(x) - glow_radius - 1, int(y) - glow_radius - 1,
+                           glow_radius * 2 + 2, glow_radius * 2 + 2)
 
-        # 绘制高光
-        highlight_offset = self.radius // 3
-        pygame.draw.circle(screen, (255, 255, 255),
-                         (int(self.x - highlight_offset), int(self.y - highlight_offset)),
-                         self.radius // 3)
 
-        # 绘制边框
-        pygame.draw.circle(screen, (150, 200, 255), (int(self.x), int(self.y)), self.radius, 2)
+# 砖块精灵缓存：(颜色, 宽度, 高度) -> 预渲染的Surface
+_brick_sprite_cache_xzh = {}
 
-    def adjust_speed_xzh(self, delta):
-        """
-        调整球速
-        :param delta: 速度变化量
-        """
-        current_speed = math.sqrt(self.dx ** 2 + self.dy ** 2)
-        new_speed = current_speed + delta
+# 砖块阴影偏移（精灵尺寸比砖块大出该偏移量）
+BRICK_SHADOW_OFFSET_XZH = 3
 
-        if new_speed < BALL_SPEED_MIN_XZH:
-            new_speed = BALL_SPEED_MIN_XZH
-        elif new_speed > BALL_SPEED_MAX_XZH:
-            new_speed = BALL_SPEED_MAX_XZH
 
-        if current_speed > 0:
-            ratio = new_speed / current_speed
-            self.dx *= ratio
-            self.dy *= ratio
+def get_brick_sprite_xzh(color, width, height):
+    """
+    获取砖块精灵（阴影、渐变主体、高光、边框），同一外观只构建一次
+    :param color: 砖块颜色
+    :param width: 砖块宽度
+    :param height: 砖块高度
+    :return: 带透明通道的Surface，左上角对齐砖块左上角
+    """
+    key = (tuple(color), width, height)
+    sprite = _brick_sprite_cache_xzh.get(key)
+    if sprite is not None:
+        return sprite
 
-        self.speed = new_speed
+    shadow_offset = BRICK_SHADOW_OFFSET_XZH
+    sprite = pygame.Surface((width + shadow_offset, height + shadow_offset), pygame.SRCALPHA)
 
+    # 绘制阴影
+    pygame.draw.rect(sprite, (0, 0, 0, 50), (shadow_offset, shadow_offset, width, height), border_radius=5)
 
-class Brick_xzh:
-    """砖块类"""
+    # 绘制渐变主体（从亮到暗）
+    for i in range(height):
+        ratio = i / height
+        r = int(color[0] * (1 - ratio * 0.3))
+        g = int(color[1] * (1 - ratio * 0.3))
+        b = int(color[2] * (1 - ratio * 0.3))
+        pygame.draw.rect(sprite, (r, g, b), (0, i, width, 1))
 
-    def __init__(self, x, y, width, height, color, points):
-        """
-        初始化砖块
-        :param x: X坐标
-        :param y: Y坐标
-        :param width: 宽度
-        :param height: 高度
-        :param color: 颜色
-        :param points: 分数
-        """
-        self.x = x
-        self.y = y
-        self.width = width
-        self.height = height
-        self.color = color
-        self.points = points
-        self.visible = True
+    # 绘制高光（顶部）
+    highlight_surf = pygame.Surface((width - 10, 8), pygame.SRCALPHA)
+    pygame.draw.rect(highlight_surf, (255, 255, 255, 100), (0, 0, width - 10, 8), border_radius=3)
+    sprite.blit(highlight_surf, (5, 3))
+
+    # 绘制边框
+    darker_color = tuple(max(0, c - 50) for c in color)
+    pygame.draw.rect(sprite, darker_color, (0, 0, width, height), 2, border_radius=5)
+
+    # 已创建显示窗口时转换为显示格式，加快blit
+    if pygame.display.get_surface() is not None:
+        sprite = sprite.convert_alpha()
+
+    _brick_sprite_cache_xzh[key] = sprite
+    return sprite
+
+
+class Brick_xzh(BrickState_xzh):
+    """砖块类（BrickField_xzh中一块砖块的视图）"""
+
+    __slots__ = ()
 
     def draw_xzh(self, screen):
         """
-        绘制砖块 - 带3D立体和光泽效果
+        绘制砖块 - 带3D立体和光泽效果（使用预渲染精灵，一次blit完成）
         :param screen: Pygame屏幕对象
         """
         if self.visible:
-            # 绘制阴影
-            shadow_offset = 3
-            shadow_surf = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
-            pygame.draw.rect(shadow_surf, (0, 0, 0, 50), (0, 0, self.width, self.height), border_radius=5)
-            screen.blit(shadow_surf, (self.x + shadow_offset, self.y + shadow_offset))
-
-            # 绘制渐变主体
-            for i in range(self.height):
-                ratio = i / self.height
-                # 从亮到暗的渐变
-                r = int(self.color[0] * (1 - ratio * 0.3))
-                g = int(self.color[1] * (1 - ratio * 0.3))
-                b = int(self.color[2] * (1 - ratio * 0.3))
-                pygame.draw.rect(screen, (r, g, b), (self.x, self.y + i, self.width, 1))
-
-            # 绘制高光（顶部）
-            highlight_surf = pygame.Surface((self.width - 10, 8), pygame.SRCALPHA)
-            pygame.draw.rect(highlight_surf, (255, 255, 255, 100), (0, 0, self.width - 10, 8), border_radius=3)
-            screen.blit(highlight_surf, (self.x + 5, self.y + 3))
-
-            # 绘制边框
-            darker_color = tuple(max(0, c - 50) for c in self.color)
-            pygame.draw.rect(screen, darker_color,
-                           (self.x, self.y, self.width, self.height), 2, border_radius=5)
+            screen.blit(get_brick_sprite_xzh(self.color, self.width, self.height), (self.x, self.y))
 
     def get_rect_xzh(self):
         """
@@ -332,14 +489,89 @@ class Brick_xzh:
         """
         return pygame.Rect(self.x, self.y, self.width, self.height)
 
+    def get_sprite_rect_xzh(self):
+        """
+        获取砖块精灵覆盖的区域（包含阴影）
+        :return: pygame.Rect对象
+        """
+        return pygame.Rect(self.x, self.y,
+                           self.width + BRICK_SHADOW_OFFSET_XZH,
+                           self.height + BRICK_SHADOW_OFFSET_XZH)
+
+
+# 背景缓存：(宽度, 高度) -> 渐变背景Surface，只保留当前分辨率
+_background_cache_xzh = {}
+
+
+def get_background_surface_xzh(width, height):
+    """
+    获取渐变背景，同一分辨率只构建一次，分辨率变化时自动重建
+    :param width: 屏幕宽度
+    :param height: 屏幕高度
+    :return: 不透明的背景Surface
+    """
+    key = (width, height)
+    background = _background_cache_xzh.get(key)
+    if background is not None:
+        return background
+
+    background = pygame.Surface((width, height))
+    for i in range(height):
+        ratio = i / height
+        # 从深蓝到黑的渐变
+        r = int(10 * (1 - ratio))
+        g = int(20 * (1 - ratio))
+        b = int(40 * (1 - ratio))
+        pygame.draw.line(background, (r, g, b), (0, i), (width, i))
+
+    if pygame.display.get_surface() is not None:
+        background = background.convert()
+
+    _background_cache_xzh.clear()
+    _background_cache_xzh[key] = background
+    return background
+
+
+def merge_rects_xzh(rects):
+    """
+    合并相互重叠的矩形，保证结果互不重叠（半透明图层不会被重复叠加）
+    :param rects: pygame.Rect列表
+    :return: 互不重叠的pygame.Rect列表
+    """
+    merged = []
+    for rect in rects:
+        rect = pygame.Rect(rect)
+        i = 0
+        while i < len(merged):
+            if merged[i].colliderect(rect):
+                rect.union_ip(merged.pop(i))
+                i = 0
+            else:
+                i += 1
+        merged.append(rect)
+    return merged
+
 
-class Game_xzh:
-    """游戏主类"""
+class Game_xzh(GameCore_xzh):
+    """游戏主类 - 在规则核心之上负责窗口、输入和绘制"""
 
-    def __init__(self, mode=MODE_CLASSIC_XZH):
+    paddle_cls = Paddle_xzh
+    ball_cls = Ball_xzh
+    brick_cls = Brick_xzh
+
+    def __init__(self, mode=MODE_CLASSIC_XZH, dirty_rects=DIRTY_RECT_MODE_XZH, seed=None,
+                 swept=SWEPT_COLLISION_XZH, multiball=MULTIBALL_MODE_XZH, replay=None,
+                 turbo=TURBO_OFF_XZH, autoplay=False):
         """
         初始化游戏
         :param mode: 游戏模式
+        :param dirty_rects: 是否启用脏矩形渲染
+        :param seed: 随机种子（为None时随机生成）
+        :param swept: 是否使用连续碰撞检测
+        :param multiball: 是否启用多球模式
+        :param replay: 要播放的回放（为None时正常游戏并录制回放）
+        :param turbo: 初始加速模式（TURBO_OFF_XZH / TURBO_FRAMES_XZH / TURBO_HEADLESS_XZH）
+        :param autoplay: 是否一开始就由自动玩家控制挡板
         """
         try:
             pygame.init()
@@ -365,244 +597,185 @@ class Game_xzh:
                     self.font_medium = pygame.font.Font(None, FONT_SIZE_MEDIUM_XZH)
                     self.font_small = pygame.font.Font(None, FONT_SIZE_SMALL_XZH)
 
-            self.mode = mode
-            self.running = True
-            self.game_started = False
-            self.game_over = False
-            self.game_won = False
-
-            # 游戏统计数据
-            self.score = 0
-            self.lives = INITIAL_LIVES_XZH if mode == MODE_CLASSIC_XZH else CHALLENGE_LIVES_XZH
-            self.bricks_hit = 0
-            self.bricks_missed = 0
-            self.total_bricks_hit = 0  # 新增：累计击中砖块数（不重置）
-            self.total_bricks_missed = 0  # 新增：累计未击中数（不重置）
-            self.last_check_hit_count = 0  # 新增：上次检查时的击中数
-            self.level = 1  # 新增：关卡数（用于挑战模式）
-            self.particles = []  # 粒子效果列表
-            self.start_time = None
-            self.end_time = None
-
-            # 初始化游戏对象
-            self.init_game_objects_xzh()
+            # 初始化规则核心（游戏状态和游戏对象）
+            GameCore_xzh.__init__(self, mode, seed=seed, verbose=True, realtime=True, swept=swept,
+                                  multiball=multiball)
+
+            # 回放：正常游戏时逐帧录制输入，播放时逐帧读取输入
+            if replay is None:
+                self.replay = Replay_xzh(mode, self.seed, swept, multiball)
+                self.playback = None
+            else:
+                self.replay = replay
+                self.playback = replay.iter_inputs_xzh()
+
+            # 粒子效果使用独立的随机数流，不影响规则核心的随机序列
+            self.particles = ParticleSystem_xzh(rng=random.Random(self.seed + 1))
+            self.text_cache = LRUCache_xzh(TEXT_CACHE_SIZE_XZH)  # 文字渲染缓存
+            self.brick_layer = None  # 砖块合成图层（为None时在绘制前重建）
+            self.brick_layer_rect = None  # 砖块图层在屏幕上的区域
+
+            # 脏矩形渲染状态
+            self.dirty_rects_enabled = dirty_rects
+            self.full_redraw = True  # 下一帧是否需要整屏重绘
+            self.last_frame_rects = []  # 上一帧绘制动态对象和UI的区域
+            self.pending_dirty_rects = []  # 被击碎砖块等待刷新的区域
+            self.last_overlay_state = None  # 上一帧的提示层状态
+            self.show_debug_stats = SHOW_DEBUG_STATS_XZH  # 是否显示调试统计
+
+            # 固定时间步长循环状态
+            self.accumulator = 0.0  # 尚未模拟的累积时间（秒）
+            self.render_alpha = 1.0  # 渲染插值系数（两次模拟帧之间的位置）
+            self.pending_launch = False  # 尚未被模拟帧处理的发射按键
+
+            # 加速模式和自动玩家
+            self.turbo_mode = TURBO_OFF_XZH
+            self.turbo_window_start = 0.0  # 当前统计窗口的开始时间
+            self.turbo_window_ticks = 0  # 当前统计窗口内执行的模拟帧数
+            self.turbo_rate = 0.0  # 最近统计到的模拟速度（帧/秒）
+            self.autoplayer = None  # 接管挡板的自动玩家（为None时由键盘控制）
+            self.autoplay_used = False  # 本局是否用过自动玩家（这样的成绩不计入统计）
+            self.set_turbo_mode_xzh(turbo)
+            self.set_autoplay_xzh(autoplay and replay is None)
 
         except Exception as e:
             print(f"游戏初始化错误: {e}")
             raise
 
-    def init_game_objects_xzh(self):
-        """初始化游戏对象"""
-        # 根据模式设置初始速度
-        initial_speed = BALL_SPEED_DEFAULT_XZH
-        if self.mode == MODE_CHALLENGE_XZH:
-            initial_speed *= CHALLENGE_SPEED_MULTIPLIER_XZH
-
-        # 创建挡板
-        paddle_x = (SCREEN_WIDTH - PADDLE_WIDTH_DEFAULT_XZH) / 2
-        paddle_y = SCREEN_HEIGHT - 50
-        self.paddle = Paddle_xzh(paddle_x, paddle_y, PADDLE_WIDTH_DEFAULT_XZH)
-
-        # 创建球
-        ball_x = paddle_x + PADDLE_WIDTH_DEFAULT_XZH / 2
-        ball_y = paddle_y - BALL_RADIUS_XZH - 5
-        self.ball = Ball_xzh(ball_x, ball_y, initial_speed)
-
-        # 创建砖块
-        self.bricks = []
-        rows = BRICK_ROWS_XZH if self.mode == MODE_CLASSIC_XZH else CHALLENGE_BRICK_ROWS_XZH
-        for row in range(rows):
-            for col in range(BRICK_COLS_XZH):
-                brick_x = BRICK_OFFSET_LEFT_XZH + col * (BRICK_WIDTH_XZH + BRICK_PADDING_XZH)
-                brick_y = BRICK_OFFSET_TOP_XZH + row * (BRICK_HEIGHT_XZH + BRICK_PADDING_XZH)
-                color = BRICK_COLORS_XZH[row % len(BRICK_COLORS_XZH)]
-                brick = Brick_xzh(brick_x, brick_y, BRICK_WIDTH_XZH,
-                                BRICK_HEIGHT_XZH, color, POINTS_PER_BRICK_XZH)
-                self.bricks.append(brick)
-
-    def regenerate_bricks_xzh(self):
-        """重新生成砖块（用于挑战模式的无尽模式）"""
-        self.bricks = []
-        rows = BRICK_ROWS_XZH if self.mode == MODE_CLASSIC_XZH else CHALLENGE_BRICK_ROWS_XZH
-        for row in range(rows):
-            for col in range(BRICK_COLS_XZH):
-                brick_x = BRICK_OFFSET_LEFT_XZH + col * (BRICK_WIDTH_XZH + BRICK_PADDING_XZH)
-                brick_y = BRICK_OFFSET_TOP_XZH + row * (BRICK_HEIGHT_XZH + BRICK_PADDING_XZH)
-                color = BRICK_COLORS_XZH[row % len(BRICK_COLORS_XZH)]
-                brick = Brick_xzh(brick_x, brick_y, BRICK_WIDTH_XZH,
-                                BRICK_HEIGHT_XZH, color, POINTS_PER_BRICK_XZH)
-                self.bricks.append(brick)
-
-        # 关卡提升
-        self.level += 1
-        print(f"挑战模式 - 进入第 {self.level} 关!")
-
     def handle_events_xzh(self):
-        """处理游戏事件"""
+        """
+        处理游戏事件
+        :return: 本帧的输入位掩码
+        """
+        inputs = 0
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 self.running = False
             elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_SPACE and not self.ball.active:
-                    if not self.game_started:
-                        self.game_started = True
-                        self.start_time = time.time()
-                    self.ball.launch_xzh()
+                if self.turbo_mode == TURBO_HEADLESS_XZH and event.key != pygame.K_ESCAPE:
+                    # 不渲染的加速模式下按任意键恢复正常速度
+                    self.set_turbo_mode_xzh(TURBO_OFF_XZH)
+                elif event.key == pygame.K_SPACE:
+                    inputs |= INPUT_LAUNCH_XZH
                 elif event.key == pygame.K_ESCAPE:
                     self.running = False
+                elif event.key == pygame.K_t:
+                    self.set_turbo_mode_xzh((self.turbo_mode + 1) % 3)
+                elif event.key == pygame.K_p and self.playback is None:
+                    self.set_autoplay_xzh(self.autoplayer is None)
+                elif event.key == pygame.K_F3:
+                    self.show_debug_stats = not self.show_debug_stats
+                    self.full_redraw = True
+                elif self.playback is not None and event.key in (pygame.K_LEFT, pygame.K_RIGHT):
+                    # 播放回放时左右方向键快退/快进
+                    direction = -1 if event.key == pygame.K_LEFT else 1
+                    self.seek_xzh(self.tick + direction * REPLAY_SEEK_SECONDS_XZH * FPS)
 
         # 处理键盘持续按键
         keys = pygame.key.get_pressed()
         if keys[pygame.K_LEFT] or keys[pygame.K_a]:
-            self.paddle.move_left_xzh()
-            if not self.ball.active:
-                self.ball.x = self.paddle.x + self.paddle.width / 2
+            inputs |= INPUT_LEFT_XZH
         if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
-            self.paddle.move_right_xzh()
-            if not self.ball.active:
-                self.ball.x = self.paddle.x + self.paddle.width / 2
+            inputs |= INPUT_RIGHT_XZH
+        return inputs
 
-    def update_xzh(self):
-        """更新游戏状态"""
+    def step_xzh(self, inputs=0, dt=1):
+        """
+        推进一个时间步，先记录挡板和球的位置用于渲染插值
+        :param inputs: 输入位掩码
+        :param dt: 时间步长（模拟帧数）
+        :return: 游戏是否已结束
+        """
+        self.paddle.save_position_xzh()
+        for ball in self.balls:
+            ball.save_position_xzh()
+
+        # 游戏结束后的帧不影响结果，不再录制
+        recording = self.playback is None and not (self.game_over or self.game_won)
+        if recording:
+            if self.tick % SNAPSHOT_INTERVAL_TICKS_XZH == 0:
+                self.replay.add_snapshot_xzh(self.tick, self.snapshot_xzh())
+            self.replay.record_xzh(inputs)
+        finished = GameCore_xzh.step_xzh(self, inputs, dt)
+        if recording:
+            self.replay.score = self.score
+        return finished
+
+    def update_xzh(self, dt=1):
+        """
+        更新游戏状态和粒子效果
+        :param dt: 时间步长（模拟帧数）
+        """
         if not self.game_started or self.game_over or self.game_won:
             return
 
-        # 移动球
-        self.ball.move_xzh()
-
-        # 球与墙壁碰撞
-        self.ball.bounce_wall_xzh()
-
-        # 球与挡板碰撞
-        if self.ball.bounce_paddle_xzh(self.paddle):
-            self.bricks_missed += 1  # 记录未击中砖块的次数
-            self.total_bricks_missed += 1  # 累计未击中数
-
-        # 球与砖块碰撞
-        self.check_brick_collision_xzh()
-
-        # 检查球是否掉落
-        if self.ball.check_miss_xzh():
-            self.lives -= 1
-            if self.lives <= 0:
-                self.game_over = True
-                self.end_time = time.time()
-            else:
-                self.ball.reset_xzh(self.paddle)
-
-        # 检查是否获胜或重新生成砖块
-        if all(not brick.visible for brick in self.bricks):
-            if self.mode == MODE_CHALLENGE_XZH:
-                # 挑战模式：重新生成砖块，继续游戏（无尽模式）
-                self.regenerate_bricks_xzh()
-                # 球回到挡板上方，但不重置为未发射状态
-                if self.ball.active:
-                    self.ball.reset_xzh(self.paddle)
-                    self.ball.launch_xzh()  # 自动发射球
-            else:
-                # 经典模式：游戏胜利
-                self.game_won = True
-                self.end_time = time.time()
-
-        # 智能难度调整
-        self.adjust_difficulty_xzh()
+        GameCore_xzh.update_xzh(self, dt)
 
         # 更新粒子效果
-        for particle in self.particles[:]:
-            particle.update()
-            if particle.is_dead():
-                self.particles.remove(particle)
-
-    def check_brick_collision_xzh(self):
-        """检查球与砖块的碰撞"""
-        if not self.ball.active:
-            return
+        self.particles.update_xzh()
 
-        ball_rect = pygame.Rect(self.ball.x - self.ball.radius,
-                               self.ball.y - self.ball.radius,
-                               self.ball.radius * 2, self.ball.radius * 2)
-
-        for brick in self.bricks:
-            if brick.visible:
-                brick_rect = brick.get_rect_xzh()
-                if ball_rect.colliderect(brick_rect):
-                    brick.visible = False
-                    self.score += brick.points
-                    self.bricks_hit += 1
-                    self.total_bricks_hit += 1  # 累计击中数
-
-                    # 生成粒子效果
-                    brick_center_x = brick.x + brick.width / 2
-                    brick_center_y = brick.y + brick.height / 2
-                    for _ in range(15):  # 生成15个粒子
-                        particle = Particle_xzh(brick_center_x, brick_center_y, brick.color)
-                        self.particles.append(particle)
-
-                    # 计算碰撞方向并反弹
-                    self.calculate_bounce_xzh(brick_rect)
-                    break
-
-    def calculate_bounce_xzh(self, brick_rect):
-        """
-        计算球的反弹方向
-        :param brick_rect: 砖块的矩形区域
-        """
-        # 计算球心到砖块各边的距离
-        left_dist = abs(self.ball.x - brick_rect.left)
-        right_dist = abs(self.ball.x - brick_rect.right)
-        top_dist = abs(self.ball.y - brick_rect.top)
-        bottom_dist = abs(self.ball.y - brick_rect.bottom)
-
-        min_dist = min(left_dist, right_dist, top_dist, bottom_dist)
-
-        # 根据最近的边确定反弹方向
-        if min_dist in (left_dist, right_dist):
-            self.ball.dx = -self.ball.dx
-        else:
-            self.ball.dy = -self.ball.dy
-
-    def adjust_difficulty_xzh(self):
-        """智能难度调整系统 - 渐进式难度提升"""
-        # 检查是否达到检查间隔
-        if self.total_bricks_hit - self.last_check_hit_count >= DIFFICULTY_CHECK_INTERVAL_XZH:
-            # 计算当前阶段的命中率（使用短期统计）
-            if self.bricks_hit > 0 or self.bricks_missed > 0:
-                total_attempts = self.bricks_hit + self.bricks_missed
-                hit_rate = self.bricks_hit / total_attempts if total_attempts > 0 else 0
-
-                # 如果命中率高于阈值，增加难度
-                if hit_rate > HIT_RATE_THRESHOLD_HIGH_XZH:
-                    # 缩短挡板宽度
-                    old_width = self.paddle.width
-                    self.paddle.adjust_width_xzh(-PADDLE_WIDTH_ADJUSTMENT_XZH)
-
-                    # 只有当挡板实际缩短时，才增加移动速度（防止达到最小宽度后速度持续增加）
-                    if self.paddle.width < old_width:
-                        self.paddle.adjust_speed_xzh(PADDLE_SPEED_ADJUSTMENT_XZH)
-                        print(f"难度提升! 挡板宽度: {self.paddle.width:.0f}, 移动速度: {self.paddle.speed:.1f}")
-
-            # 更新检查点和重置短期统计
-            self.last_check_hit_count = self.total_bricks_hit
-            self.bricks_hit = 0
-            self.bricks_missed = 0
+    def on_brick_hit_xzh(self, brick):
+        """
+        砖块被击碎：刷新砖块图层并生成粒子效果
+        :param brick: 被击碎的Brick_xzh对象
+        """
+        self.invalidate_brick_xzh(brick)
+
+        brick_center_x = brick.x + brick.width / 2
+        brick_center_y = brick.y + brick.height / 2
+        self.particles.emit_xzh(brick_center_x, brick_center_y, brick.color)
+
+    def on_bricks_regenerated_xzh(self):
+        """砖块墙已重置，在原有图层上重新合成砖块并整屏重绘"""
+        if self.brick_layer is not None:
+            self.build_brick_layer_xzh()
+        self.full_redraw = True
+
+    def on_state_restored_xzh(self):
+        """从快照恢复后清空粒子、取消位置插值并整屏重绘"""
+        self.particles.clear_xzh()
+        self.paddle.save_position_xzh()
+        for ball in self.balls:
+            ball.save_position_xzh()
+        if self.brick_layer is not None:
+            self.build_brick_layer_xzh()
+        self.full_redraw = True
+
+    def seek_xzh(self, tick):
+        """
+        播放回放时跳转到指定帧
+        :param tick: 目标帧数
+        """
+        seek_replay_xzh(self.replay, tick, game=self)
+        self.playback = self.replay.iter_inputs_xzh(self.tick)
 
     def draw_xzh(self):
         """绘制游戏画面"""
+        # 提示层出现或消失时需要整屏重绘
+        overlay_state = (self.game_started, self.game_over, self.game_won)
+        if overlay_state != self.last_overlay_state:
+            self.full_redraw = True
+            self.last_overlay_state = overlay_state
+
+        has_overlay = not self.game_started or self.game_over or self.game_won
+        if self.dirty_rects_enabled and not self.full_redraw and not has_overlay:
+            self.draw_dirty_xzh()
+            return
+
         # 绘制渐变背景
         self.draw_background_xzh()
 
         # 绘制游戏对象
-        self.paddle.draw_xzh(self.screen)
-        self.ball.draw_xzh(self.screen)
-        for brick in self.bricks:
-            brick.draw_xzh(self.screen)
+        self.paddle.draw_xzh(self.screen, self.render_alpha)
+        for ball in self.balls:
+            ball.draw_xzh(self.screen, self.render_alpha)
+        self.draw_bricks_xzh()
 
         # 绘制粒子效果
-        for particle in self.particles:
-            particle.draw(self.screen)
+        self.particles.draw_xzh(self.screen)
 
         # 绘制UI
-        self.draw_ui_xzh()
+        ui_rects = self.draw_ui_xzh()
 
         # 绘制提示信息
         if not self.game_started:
@@ -614,68 +787,192 @@ class Game_xzh:
 
         pygame.display.flip()
 
+        self.last_frame_rects = self.get_dynamic_rects_xzh() + ui_rects
+        self.pending_dirty_rects = []
+        self.full_redraw = False
+
+    def get_dynamic_rects_xzh(self):
+        """
+        获取本帧动态对象（挡板、球、粒子）覆盖的区域
+        :return: pygame.Rect列表
+        """
+        rects = [self.paddle.get_draw_rect_xzh(self.render_alpha)]
+        rects += [ball.get_draw_rect_xzh(self.render_alpha) for ball in self.balls]
+        particle_rect = self.particles.get_draw_rect_xzh()
+        if particle_rect is not None:
+            rects.append(particle_rect)
+        return rects
+
+    def draw_dirty_xzh(self):
+        """脏矩形模式绘制：只恢复并刷新上一帧和本帧发生变化的区域"""
+        screen_rect = self.screen.get_rect()
+        dirty_rects = []
+        for rect in merge_rects_xzh(self.last_frame_rects + self.get_dynamic_rects_xzh() + self.pending_dirty_rects):
+            rect = rect.clip(screen_rect)
+            if rect.width > 0 and rect.height > 0:
+                dirty_rects.append(rect)
+
+        # 用缓存背景擦除脏区域
+        background = get_background_surface_xzh(*screen_rect.size)
+        for rect in dirty_rects:
+            self.screen.blit(background, rect, rect)
+
+        # 按整屏绘制相同的顺序重绘
+        self.paddle.draw_xzh(self.screen, self.render_alpha)
+        for ball in self.balls:
+            ball.draw_xzh(self.screen, self.render_alpha)
+
+        if self.brick_layer is None:
+            self.build_brick_layer_xzh()
+        offset_x, offset_y = self.brick_layer_rect.topleft
+        for rect in dirty_rects:
+            area = rect.clip(self.brick_layer_rect)
+            if area.width > 0 and area.height > 0:
+                self.screen.blit(self.brick_layer, area.topleft, area.move(-offset_x, -offset_y))
+
+        self.particles.draw_xzh(self.screen)
+
+        ui_rects = self.draw_ui_xzh()
+
+        pygame.display.update(dirty_rects + ui_rects)
+
+        self.last_frame_rects = self.get_dynamic_rects_xzh() + ui_rects
+        self.pending_dirty_rects = []
+
+    def build_brick_layer_xzh(self):
+        """重建砖块图层：将所有可见砖块合成到一张透明Surface上（尺寸不变时复用原有Surface）"""
+        rects = [brick.get_sprite_rect_xzh() for brick in self.bricks]
+        if not rects:
+            self.brick_layer_rect = pygame.Rect(0, 0, 0, 0)
+            self.brick_layer = pygame.Surface((0, 0), pygame.SRCALPHA)
+            return
+
+        self.brick_layer_rect = rects[0].unionall(rects[1:])
+        if self.brick_layer is not None and self.brick_layer.get_size() == self.brick_layer_rect.size:
+            self.brick_layer.fill((0, 0, 0, 0))
+        else:
+            self.brick_layer = pygame.Surface(self.brick_layer_rect.size, pygame.SRCALPHA)
+        offset_x, offset_y = self.brick_layer_rect.topleft
+        for brick in self.bricks:
+            if brick.visible:
+                self.brick_layer.blit(get_brick_sprite_xzh(brick.color, brick.width, brick.height),
+                                      (brick.x - offset_x, brick.y - offset_y))
+
+    def invalidate_brick_xzh(self, brick):
+        """
+        砖块被击碎后只清除图层中对应的区域
+        :param brick: 被隐藏的Brick_xzh对象
+        """
+        if self.brick_layer is None:
+            return
+
+        sprite_rect = brick.get_sprite_rect_xzh()
+        self.pending_dirty_rects.append(sprite_rect)
+
+        offset_x, offset_y = self.brick_layer_rect.topleft
+        area = sprite_rect.move(-offset_x, -offset_y)
+        self.brick_layer.fill((0, 0, 0, 0), area)
+
+        # 重绘与该区域重叠的其他可见砖块（阴影可能延伸到相邻区域）
+        self.brick_layer.set_clip(area)
+        for other in self.bricks:
+            if other.visible and other.get_sprite_rect_xzh().move(-offset_x, -offset_y).colliderect(area):
+                self.brick_layer.blit(get_brick_sprite_xzh(other.color, other.width, other.height),
+                                      (other.x - offset_x, other.y - offset_y))
+        self.brick_layer.set_clip(None)
+
+    def draw_bricks_xzh(self):
+        """绘制砖块图层 - 无论砖块数量多少，每帧只需一次blit"""
+        if self.brick_layer is None:
+            self.build_brick_layer_xzh()
+        self.screen.blit(self.brick_layer, self.brick_layer_rect.topleft)
+
     def draw_background_xzh(self):
-        """绘制渐变背景"""
-        for i in range(SCREEN_HEIGHT):
-            ratio = i / SCREEN_HEIGHT
-            # 从深蓝到黑的渐变
-            r = int(10 * (1 - ratio))
-            g = int(20 * (1 - ratio))
-            b = int(40 * (1 - ratio))
-            pygame.draw.line(self.screen, (r, g, b), (0, i), (SCREEN_WIDTH, i))
+        """绘制渐变背景（使用按分辨率缓存的背景Surface）"""
+        width, height = self.screen.get_size()
+        self.screen.blit(get_background_surface_xzh(width, height), (0, 0))
+
+    def render_text_xzh(self, font, text, color):
+        """
+        渲染文字，内容不变时直接复用上次渲染的Surface
+        :param font: pygame字体对象
+        :param text: 文字内容
+        :param color: 文字颜色
+        :return: 文字Surface
+        """
+        key = (font, text, color)
+        surface = self.text_cache.get(key)
+        if surface is None:
+            surface = font.render(text, True, color)
+            self.text_cache.put(key, surface)
+        return surface
 
     def draw_ui_xzh(self):
-        """绘制游戏UI - 带半透明面板"""
+        """
+        绘制游戏UI - 带半透明面板
+        :return: 本次绘制覆盖的区域列表
+        """
         # 绘制左侧信息面板
-        left_panel = pygame.Surface((150, 70), pygame.SRCALPHA)
-        pygame.draw.rect(left_panel, (20, 40, 80, 180), (0, 0, 150, 70), border_radius=10)
-        pygame.draw.rect(left_panel, (100, 150, 255, 100), (0, 0, 150, 70), 2, border_radius=10)
-        self.screen.blit(left_panel, (5, 5))
+        left_panel = get_panel_surface_xzh(150, 70, (20, 40, 80, 180), (100, 150, 255, 100), 2, 10)
+        rects = [self.screen.blit(left_panel, (5, 5))]
 
         # 绘制分数
-        score_text = self.font_small.render(f"分数: {self.score}", True, COLOR_WHITE_XZH)
-        self.screen.blit(score_text, (15, 15))
+        score_text = self.render_text_xzh(self.font_small, f"分数: {self.score}", COLOR_WHITE_XZH)
+        rects.append(self.screen.blit(score_text, (15, 15)))
 
         # 绘制生命值
-        lives_text = self.font_small.render(f"生命: {self.lives}", True, COLOR_WHITE_XZH)
-        self.screen.blit(lives_text, (15, 40))
+        lives_text = self.render_text_xzh(self.font_small, f"生命: {self.lives}", COLOR_WHITE_XZH)
+        rects.append(self.screen.blit(lives_text, (15, 40)))
 
         # 绘制右侧信息面板
         right_panel_width = 220
-        right_panel = pygame.Surface((right_panel_width, 70), pygame.SRCALPHA)
-        pygame.draw.rect(right_panel, (20, 40, 80, 180), (0, 0, right_panel_width, 70), border_radius=10)
-        pygame.draw.rect(right_panel, (100, 150, 255, 100), (0, 0, right_panel_width, 70), 2, border_radius=10)
-        self.screen.blit(right_panel, (SCREEN_WIDTH - right_panel_width - 5, 5))
+        right_panel = get_panel_surface_xzh(right_panel_width, 70, (20, 40, 80, 180), (100, 150, 255, 100), 2, 10)
+        rects.append(self.screen.blit(right_panel, (SCREEN_WIDTH - right_panel_width - 5, 5)))
 
         # 绘制模式和关卡（挑战模式显示关卡）
         if self.mode == MODE_CHALLENGE_XZH:
             mode_text = f"挑战模式 - 第{self.level}关"
         else:
             mode_text = "经典模式"
-        mode_surface = self.font_small.render(mode_text, True, COLOR_YELLOW_XZH)
-        self.screen.blit(mode_surface, (SCREEN_WIDTH - right_panel_width + 5, 15))
+        mode_surface = self.render_text_xzh(self.font_small, mode_text, COLOR_YELLOW_XZH)
+        rects.append(self.screen.blit(mode_surface, (SCREEN_WIDTH - right_panel_width + 5, 15)))
 
         # 绘制命中率
         if self.total_bricks_hit > 0:
             total = self.total_bricks_hit + self.total_bricks_missed
             hit_rate = (self.total_bricks_hit / total) * 100 if total > 0 else 0
-            hit_text = self.font_small.render(f"命中率: {hit_rate:.1f}%", True, COLOR_GREEN_XZH)
-            self.screen.blit(hit_text, (SCREEN_WIDTH - right_panel_width + 5, 40))
+            hit_text = self.render_text_xzh(self.font_small, f"命中率: {hit_rate:.1f}%", COLOR_GREEN_XZH)
+            rects.append(self.screen.blit(hit_text, (SCREEN_WIDTH - right_panel_width + 5, 40)))
+
+        # 加速模式的模拟速度
+        if self.turbo_mode != TURBO_OFF_XZH:
+            turbo_text = f"加速 {self.turbo_rate:,.0f} 帧/秒" + (" [自动]" if self.autoplayer is not None else "")
+            turbo_surface = self.render_text_xzh(self.font_small, turbo_text, COLOR_YELLOW_XZH)
+            rects.append(self.screen.blit(turbo_surface, (SCREEN_WIDTH / 2 - turbo_surface.get_width() / 2, 15)))
+
+        # 调试统计：本关新创建的对象数（对象池生效时换关后保持为0）和存活粒子数
+        if self.show_debug_stats:
+            allocations = self.get_level_allocations_xzh()
+            debug_text = (f"本关分配 砖块墙 {allocations['fields']} 视图 {allocations['brick_views']} "
+                          f"球 {allocations['balls']} | 空闲球 {len(self.spare_balls)} | "
+                          f"粒子 {len(self.particles)}/{self.particles.capacity}")
+            debug_surface = self.render_text_xzh(self.font_small, debug_text, COLOR_WHITE_XZH)
+            rects.append(self.screen.blit(debug_surface, (10, SCREEN_HEIGHT - debug_surface.get_height() - 5)))
+
+        return rects
 
     def draw_start_message_xzh(self):
         """绘制开始提示信息 - 带半透明背景"""
         # 绘制半透明背景板
-        overlay = pygame.Surface((600, 350), pygame.SRCALPHA)
-        pygame.draw.rect(overlay, (10, 20, 40, 220), (0, 0, 600, 350), border_radius=20)
-        pygame.draw.rect(overlay, (100, 200, 255, 150), (0, 0, 600, 350), 3, border_radius=20)
+        overlay = get_panel_surface_xzh(600, 350, (10, 20, 40, 220), (100, 200, 255, 150), 3, 20)
         self.screen.blit(overlay, (SCREEN_WIDTH/2 - 300, SCREEN_HEIGHT/2 - 175))
 
         # 绘制文字（带阴影效果）
-        title = self.font_large.render("打砖块游戏", True, COLOR_CYAN_XZH)
-        title_shadow = self.font_large.render("打砖块游戏", True, (0, 0, 0))
-        hint = self.font_medium.render("按空格键开始游戏", True, COLOR_WHITE_XZH)
-        control1 = self.font_small.render("使用左右方向键或A/D键移动挡板", True, (200, 200, 200))
-        control2 = self.font_small.render("按ESC键退出游戏", True, (200, 200, 200))
+        title = self.render_text_xzh(self.font_large, "打砖块游戏", COLOR_CYAN_XZH)
+        title_shadow = self.render_text_xzh(self.font_large, "打砖块游戏", (0, 0, 0))
+        hint = self.render_text_xzh(self.font_medium, "按空格键开始游戏", COLOR_WHITE_XZH)
+        control1 = self.render_text_xzh(self.font_small, "使用左右方向键或A/D键移动挡板", (200, 200, 200))
+        control2 = self.render_text_xzh(self.font_small, "按ESC键退出游戏", (200, 200, 200))
 
         # 绘制阴影
         self.screen.blit(title_shadow, (SCREEN_WIDTH/2 - title.get_width()/2 + 2, SCREEN_HEIGHT/2 - 98))
@@ -689,20 +986,18 @@ class Game_xzh:
         """绘制游戏结束信息 - 带半透明背景"""
         # 绘制半透明背景板
         panel_height = 300 if self.mode == MODE_CHALLENGE_XZH else 250
-        overlay = pygame.Surface((500, panel_height), pygame.SRCALPHA)
-        pygame.draw.rect(overlay, (40, 10, 10, 220), (0, 0, 500, panel_height), border_radius=20)
-        pygame.draw.rect(overlay, (255, 100, 100, 150), (0, 0, 500, panel_height), 3, border_radius=20)
+        overlay = get_panel_surface_xzh(500, panel_height, (40, 10, 10, 220), (255, 100, 100, 150), 3, 20)
         self.screen.blit(overlay, (SCREEN_WIDTH/2 - 250, SCREEN_HEIGHT/2 - panel_height/2))
 
         # 绘制文字
-        game_over_text = self.font_large.render("游戏结束", True, COLOR_RED_XZH)
-        game_over_shadow = self.font_large.render("游戏结束", True, (0, 0, 0))
-        score_text = self.font_medium.render(f"最终分数: {self.score}", True, COLOR_WHITE_XZH)
+        game_over_text = self.render_text_xzh(self.font_large, "游戏结束", COLOR_RED_XZH)
+        game_over_shadow = self.render_text_xzh(self.font_large, "游戏结束", (0, 0, 0))
+        score_text = self.render_text_xzh(self.font_medium, f"最终分数: {self.score}", COLOR_WHITE_XZH)
 
         # 挑战模式显示关卡信息
         if self.mode == MODE_CHALLENGE_XZH:
-            level_text = self.font_medium.render(f"到达关卡: 第{self.level}关", True, COLOR_YELLOW_XZH)
-            hint_text = self.font_small.render("按ESC键退出", True, (200, 200, 200))
+            level_text = self.render_text_xzh(self.font_medium, f"到达关卡: 第{self.level}关", COLOR_YELLOW_XZH)
+            hint_text = self.render_text_xzh(self.font_small, "按ESC键退出", (200, 200, 200))
 
             self.screen.blit(game_over_shadow, (SCREEN_WIDTH/2 - game_over_text.get_width()/2 + 2, SCREEN_HEIGHT/2 - 78))
             self.screen.blit(game_over_text, (SCREEN_WIDTH/2 - game_over_text.get_width()/2, SCREEN_HEIGHT/2 - 80))
@@ -710,7 +1005,7 @@ class Game_xzh:
             self.screen.blit(level_text, (SCREEN_WIDTH/2 - level_text.get_width()/2, SCREEN_HEIGHT/2 + 20))
             self.screen.blit(hint_text, (SCREEN_WIDTH/2 - hint_text.get_width()/2, SCREEN_HEIGHT/2 + 70))
         else:
-            hint_text = self.font_small.render("按ESC键退出", True, (200, 200, 200))
+            hint_text = self.render_text_xzh(self.font_small, "按ESC键退出", (200, 200, 200))
 
             self.screen.blit(game_over_shadow, (SCREEN_WIDTH/2 - game_over_text.get_width()/2 + 2, SCREEN_HEIGHT/2 - 48))
             self.screen.blit(game_over_text, (SCREEN_WIDTH/2 - game_over_text.get_width()/2, SCREEN_HEIGHT/2 - 50))
@@ -720,16 +1015,14 @@ class Game_xzh:
     def draw_win_message_xzh(self):
         """绘制胜利信息 - 带半透明背景"""
         # 绘制半透明背景板
-        overlay = pygame.Surface((500, 250), pygame.SRCALPHA)
-        pygame.draw.rect(overlay, (10, 40, 10, 220), (0, 0, 500, 250), border_radius=20)
-        pygame.draw.rect(overlay, (100, 255, 100, 150), (0, 0, 500, 250), 3, border_radius=20)
+        overlay = get_panel_surface_xzh(500, 250, (10, 40, 10, 220), (100, 255, 100, 150), 3, 20)
         self.screen.blit(overlay, (SCREEN_WIDTH/2 - 250, SCREEN_HEIGHT/2 - 125))
 
         # 绘制文字（带阴影效果）
-        win_text = self.font_large.render("恭喜获胜!", True, COLOR_GREEN_XZH)
-        win_shadow = self.font_large.render("恭喜获胜!", True, (0, 0, 0))
-        score_text = self.font_medium.render(f"最终分数: {self.score}", True, COLOR_WHITE_XZH)
-        hint_text = self.font_small.render("按ESC键退出", True, (200, 200, 200))
+        win_text = self.render_text_xzh(self.font_large, "恭喜获胜!", COLOR_GREEN_XZH)
+        win_shadow = self.render_text_xzh(self.font_large, "恭喜获胜!", (0, 0, 0))
+        score_text = self.render_text_xzh(self.font_medium, f"最终分数: {self.score}", COLOR_WHITE_XZH)
+        hint_text = self.render_text_xzh(self.font_small, "按ESC键退出", (200, 200, 200))
 
         # 绘制阴影
         self.screen.blit(win_shadow, (SCREEN_WIDTH/2 - win_text.get_width()/2 + 2, SCREEN_HEIGHT/2 - 48))
@@ -738,38 +1031,131 @@ class Game_xzh:
         self.screen.blit(score_text, (SCREEN_WIDTH/2 - score_text.get_width()/2, SCREEN_HEIGHT/2 + 10))
         self.screen.blit(hint_text, (SCREEN_WIDTH/2 - hint_text.get_width()/2, SCREEN_HEIGHT/2 + 60))
 
-    def get_game_data_xzh(self):
+    def set_turbo_mode_xzh(self, mode):
+        """
+        切换加速模式
+        :param mode: TURBO_OFF_XZH / TURBO_FRAMES_XZH / TURBO_HEADLESS_XZH
+        """
+        if self.turbo_mode != TURBO_OFF_XZH and self.turbo_rate > 0:
+            print(f"加速模式结束: 最近模拟速度 {self.turbo_rate:,.0f} 帧/秒 (第{self.level}关, 分数 {self.score})")
+        self.turbo_mode = mode
+        self.turbo_window_start = time.perf_counter()
+        self.turbo_window_ticks = 0
+        self.turbo_rate = 0.0
+        # 恢复正常速度时丢弃加速期间积压的时间，渲染插值从当前位置开始
+        self.accumulator = 0.0
+        self.render_alpha = 1.0
+        self.full_redraw = True
+        captions = {TURBO_OFF_XZH: "", TURBO_FRAMES_XZH: " [加速]", TURBO_HEADLESS_XZH: " [加速 - 不渲染, 按任意键恢复]"}
+        pygame.display.set_caption("智能自适应打砖块游戏" + captions[mode])
+
+    def set_autoplay_xzh(self, enabled):
+        """
+        开启或关闭自动玩家
+        :param enabled: 是否由自动玩家控制挡板
+        """
+        if enabled:
+            self.autoplayer = AutoPlayer_xzh(AUTOPLAY_SKILL_XZH, seed=f"autoplay-{self.seed}")
+            self.autoplay_used = True
+        else:
+            self.autoplayer = None
+
+    def next_tick_inputs_xzh(self, movement):
         """
-        获取游戏数据
-        :return: 游戏数据字典
+        决定下一个模拟帧的输入：回放 > 自动玩家 > 键盘
+        :param movement: 键盘的移动输入位掩码
+        :return: 输入位掩码
         """
-        duration = 0
-        if self.start_time and self.end_time:
-            duration = self.end_time - self.start_time
+        if self.playback is not None:
+            # 播放回放：使用录制的输入，忽略键盘
+            return next(self.playback, 0)
+        if self.autoplayer is not None:
+            return self.autoplayer.get_inputs_xzh(self)
+        tick_inputs = movement
+        if self.pending_launch:
+            tick_inputs |= INPUT_LAUNCH_XZH
+            self.pending_launch = False
+        return tick_inputs
+
+    def advance_turbo_xzh(self, inputs, ticks=TURBO_TICKS_PER_FRAME_XZH):
+        """
+        加速推进：不按真实时间节流，直接执行一批模拟帧，并统计模拟速度
+        :param inputs: 本次轮询到的输入位掩码
+        :param ticks: 本批执行的模拟帧数
+        :return: 本次执行的模拟帧数
+        """
+        if inputs & INPUT_LAUNCH_XZH:
+            self.pending_launch = True
+        movement = inputs & ~INPUT_LAUNCH_XZH
+
+        done = 0
+        while done < ticks:
+            done += 1
+            if self.step_xzh(self.next_tick_inputs_xzh(movement)):
+                # 游戏结束后恢复正常速度，显示结束画面
+                self.set_turbo_mode_xzh(TURBO_OFF_XZH)
+                break
+
+        self.turbo_window_ticks += done
+        now = time.perf_counter()
+        elapsed = now - self.turbo_window_start
+        if elapsed >= TURBO_REPORT_INTERVAL_XZH:
+            self.turbo_rate = self.turbo_window_ticks / elapsed
+            self.turbo_window_start = now
+            self.turbo_window_ticks = 0
+            if self.turbo_mode == TURBO_HEADLESS_XZH:
+                # 不渲染时画面不更新，速度显示在窗口标题和控制台
+                pygame.display.set_caption(f"智能自适应打砖块游戏 [加速 - 不渲染, 按任意键恢复] "
+                                           f"{self.turbo_rate:,.0f} 帧/秒")
+                print(f"加速中: {self.turbo_rate:,.0f} 帧/秒, 第{self.level}关, 分数 {self.score}")
+        return done
+
+    def advance_xzh(self, inputs, elapsed):
+        """
+        固定时间步长推进：累积经过的时间，按FPS的频率执行模拟帧
+        :param inputs: 本次轮询到的输入位掩码
+        :param elapsed: 距上次调用经过的真实时间（秒）
+        :return: 本次执行的模拟帧数
+        """
+        tick_duration = 1.0 / FPS
+        self.accumulator += elapsed
+
+        # 发射按键只作用于一个模拟帧；没有执行模拟帧时留到下一次
+        if inputs & INPUT_LAUNCH_XZH:
+            self.pending_launch = True
+        movement = inputs & ~INPUT_LAUNCH_XZH
+
+        ticks = 0
+        while self.accumulator >= tick_duration and ticks < MAX_CATCHUP_TICKS_XZH:
+            self.step_xzh(self.next_tick_inputs_xzh(movement))
+            self.accumulator -= tick_duration
+            ticks += 1
 
-        total_attempts = self.total_bricks_hit + self.total_bricks_missed
-        hit_rate = (self.total_bricks_hit / total_attempts) if total_attempts > 0 else 0
+        # 追赶次数达到上限时丢弃积压的时间，避免越落越多
+        if ticks == MAX_CATCHUP_TICKS_XZH:
+            self.accumulator = min(self.accumulator, tick_duration)
 
-        return {
-            "mode": self.mode,
-            "score": self.score,
-            "level": self.level,  # 新增：关卡数
-            "duration": duration,
-            "hit_rate": hit_rate,
-            "bricks_hit": self.total_bricks_hit,
-            "lives_remaining": self.lives,
-            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "won": self.game_won
-        }
+        self.render_alpha = min(self.accumulator / tick_duration, 1.0)
+        return ticks
 
     def run_xzh(self):
-        """运行游戏主循环"""
+        """运行游戏主循环（固定时间步长模拟，渲染与模拟频率解耦；加速模式下不限制帧率）"""
         try:
+            last_time = time.perf_counter()
             while self.running:
-                self.handle_events_xzh()
-                self.update_xzh()
+                now = time.perf_counter()
+                inputs = self.handle_events_xzh()
+                if self.turbo_mode != TURBO_OFF_XZH:
+                    self.advance_turbo_xzh(inputs)
+                    last_time = time.perf_counter()
+                    if self.turbo_mode != TURBO_HEADLESS_XZH:
+                        self.draw_xzh()
+                    continue
+
+                self.advance_xzh(inputs, now - last_time)
+                last_time = now
                 self.draw_xzh()
-                self.clock.tick(FPS)
+                self.clock.tick(RENDER_FPS_XZH)
 
             pygame.quit()
             return self.get_game_data_xzh()
@@ -779,45 +1165,3 @@ class Game_xzh:
             pygame.quit()
             raise
 
-
-def save_game_data_xzh(game_data):
-    """
-    保存游戏数据到JSON文件
-    :param game_data: 游戏数据字典
-    """
-    try:
-        # 读取现有数据
-        try:
-            with open(DATA_FILE_PATH_XZH, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-        except FileNotFoundError:
-            data = {"games": []}
-
-        # 添加新数据
-        data["games"].append(game_data)
-
-        # 保存数据
-        with open(DATA_FILE_PATH_XZH, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
-
-        print(f"游戏数据已保存到 {DATA_FILE_PATH_XZH}")
-
-    except Exception as e:
-        print(f"保存游戏数据错误: {e}")
-
-
-def load_game_data_xzh():
-    """
-    从JSON文件加载游戏数据
-    :return: 游戏数据列表
-    """
-    try:
-        with open(DATA_FILE_PATH_XZH, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            return data.get("games", [])
-    except FileNotFoundError:
-        print("数据文件不存在，返回空列表")
-        return []
-    except Exception as e:
-        print(f"加载游戏数据错误: {e}")
-        return []
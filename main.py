@@ -7,7 +7,9 @@
 
 import sys
 from config import *
-from game import Game_xzh, save_game_data_xzh
+from game import Game_xzh
+from storage import save_game_data_async_xzh
+from replay import save_replay_async_xzh
 from analytics import generate_player_report_xzh, print_statistics_xzh
 
 
@@ -51,6 +53,7 @@ def start_game_xzh(mode):
         print("\n游戏操作说明:")
         print("- 使用左右方向键或 A/D 键移动挡板")
         print("- 按空格键发射球")
+        print("- 按 T 键切换加速模式（加速 / 不渲染 / 正常），按 P 键让自动玩家接管")
         print("- 按 ESC 键退出游戏")
         print("\n游戏即将开始...\n")
 
@@ -58,13 +61,17 @@ def start_game_xzh(mode):
         game = Game_xzh(mode)
         game_data = game.run_xzh()
 
-        # 保存游戏数据
-        if game_data and game_data.get('score', 0) > 0:
-            save_game_data_xzh(game_data)
+        # 保存游戏数据（自动玩家参与的对局不计入统计）
+        if game.autoplay_used:
+            print("\n本局使用了自动玩家，不记录游戏数据")
+        elif game_data and game_data.get('score', 0) > 0:
+            game_data["replay"] = save_replay_async_xzh(game.replay)  # 回放和记录都在后台写入，退出程序前会写完
+            save_game_data_async_xzh(game_data)
             print("\n游戏结束!")
             print(f"得分: {game_data['score']}")
             print(f"命中率: {game_data['hit_rate']*100:.2f}%")
             print(f"游戏时长: {game_data['duration']:.1f} 秒")
+            print(f"回放已保存到 {game_data['replay']}")
             if game_data.get('won', False):
                 print("恭喜你获胜！")
             else:
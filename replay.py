@@ -0,0 +1,346 @@
+# -*- coding: utf-8 -*-
+"""
+回放模块
+回放只记录随机种子和每个模拟帧的输入位掩码（游段编码后压缩），
+规则核心是确定性的，重新模拟即可还原整局游戏，用于核对高分和复现问题；
+录制时每隔固定帧数保存一个状态快照，与前一个快照异或后随输入一起压缩（每个只占几十字节），
+跳转时恢复最近的快照再向前模拟不超过一个间隔的帧数；回放文件仍只有几KB
+"""
+
+import argparse
+import bisect
+import os
+import struct
+import time
+import zlib
+from datetime import datetime
+from config import *
+from simulation import GameCore_xzh
+from storage import write_file_atomic_xzh, save_file_async_xzh
+
+REPLAY_MAGIC_XZH = b"BRKR"
+REPLAY_VERSION_XZH = 3  # 版本2在输入游段后附带原样保存的快照；版本3的快照与前一个快照异或保存
+# 文件头：标识、版本、模式、标志位、种子、帧数、记录的得分
+REPLAY_HEADER_XZH = struct.Struct("<4sBBBQII")
+REPLAY_MODES_XZH = (MODE_CLASSIC_XZH, MODE_CHALLENGE_XZH)
+REPLAY_FLAG_SWEPT_XZH = 1  # 使用连续碰撞检测
+REPLAY_FLAG_MULTIBALL_XZH = 2  # 多球模式
+
+
+def write_varint_xzh(buffer, value):
+    """
+    追加一个变长整数（每字节7位，最高位表示后面还有字节）
+    :param buffer: bytearray
+    :param value: 非负整数
+    """
+    while value >= 0x80:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def read_varint_xzh(data, position):
+    """
+    读取一个变长整数
+    :param data: bytes
+    :param position: 起始位置
+    :return: (数值, 下一个位置)
+    """
+    value = shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, position
+        shift += 7
+
+
+def xor_bytes_xzh(data, previous):
+    """
+    与前一个快照逐字节异或（前一个快照较短时不足的部分按0处理）；再异或一次即可还原
+    :param data: bytes
+    :param previous: 前一个快照
+    :return: 与data等长的bytes
+    """
+    if not previous:
+        return bytes(data)
+    other = previous[:len(data)].ljust(len(data), b"\0")
+    return (int.from_bytes(data, "little") ^ int.from_bytes(other, "little")).to_bytes(len(data), "little")
+
+
+class Replay_xzh:
+    """
+    一局游戏的回放
+    输入按游段（输入, 连续帧数）保存，录制时每帧只需比较一次；
+    快照按帧数升序保存，用于跳转
+    """
+
+    def __init__(self, mode=MODE_CLASSIC_XZH, seed=0, swept=SWEPT_COLLISION_XZH, multiball=MULTIBALL_MODE_XZH):
+        """
+        初始化回放
+        :param mode: 游戏模式
+        :param seed: 规则核心的随机种子
+        :param swept: 是否使用连续碰撞检测
+        :param multiball: 是否为多球模式
+        """
+        self.mode = mode
+        self.seed = seed
+        self.swept = swept
+        self.multiball = multiball
+        self.runs = []  # [输入位掩码, 连续帧数] 列表
+        self.ticks = 0
+        self.score = 0  # 录制结束时的得分，用于核对
+        self.snapshot_ticks = []  # 快照对应的帧数（升序）
+        self.snapshots = []  # 该帧执行输入之前的状态快照
+
+    def record_xzh(self, inputs):
+        """
+        记录一个模拟帧的输入
+        :param inputs: 输入位掩码
+        """
+        runs = self.runs
+        if runs and runs[-1][0] == inputs:
+            runs[-1][1] += 1
+        else:
+            runs.append([inputs, 1])
+        self.ticks += 1
+
+    def add_snapshot_xzh(self, tick, snapshot):
+        """
+        添加状态快照（帧数需递增）
+        :param tick: 快照对应的帧数
+        :param snapshot: GameCore_xzh.snapshot_xzh生成的bytes
+        """
+        self.snapshot_ticks.append(tick)
+        self.snapshots.append(snapshot)
+
+    def find_snapshot_xzh(self, tick):
+        """
+        查找不晚于指定帧的最近快照
+        :param tick: 目标帧数
+        :return: (快照帧数, 快照bytes)；没有时返回None
+        """
+        index = bisect.bisect_right(self.snapshot_ticks, tick) - 1
+        if index < 0:
+            return None
+        return self.snapshot_ticks[index], self.snapshots[index]
+
+    def iter_inputs_xzh(self, start=0):
+        """
+        从指定帧开始逐帧产生输入位掩码
+        :param start: 起始帧数
+        :return: 生成器
+        """
+        position = 0
+        for inputs, count in self.runs:
+            if position + count <= start:
+                position += count
+                continue
+            for _ in range(count - max(start - position, 0)):
+                yield inputs
+            position += count
+
+    def to_bytes_xzh(self):
+        """
+        编码为二进制：文件头 + zlib压缩的数据体
+        数据体：游段数、每个游段（变长整数：帧数 << 3 | 输入）、快照数、每个快照（帧数、长度、与前一个快照异或后的内容）
+        相邻快照大部分字节相同，异或后几乎全是0，压缩后每个快照只占几十字节
+        :return: bytes
+        """
+        body = bytearray()
+        write_varint_xzh(body, len(self.runs))
+        for inputs, count in self.runs:
+            write_varint_xzh(body, (count << 3) | inputs)
+        write_varint_xzh(body, len(self.snapshots))
+        previous = b""
+        for tick, snapshot in zip(self.snapshot_ticks, self.snapshots):
+            write_varint_xzh(body, tick)
+            write_varint_xzh(body, len(snapshot))
+            body += xor_bytes_xzh(snapshot, previous)
+            previous = snapshot
+
+        flags = ((REPLAY_FLAG_SWEPT_XZH if self.swept else 0)
+                 | (REPLAY_FLAG_MULTIBALL_XZH if self.multiball else 0))
+        header = REPLAY_HEADER_XZH.pack(REPLAY_MAGIC_XZH, REPLAY_VERSION_XZH, REPLAY_MODES_XZH.index(self.mode),
+                                        flags, self.seed, self.ticks, self.score)
+        return header + zlib.compress(bytes(body), 9)
+
+    @classmethod
+    def from_bytes_xzh(cls, data):
+        """
+        从二进制解码回放
+        :param data: to_bytes_xzh生成的bytes
+        :return: Replay_xzh对象
+        """
+        magic, version, mode, flags, seed, ticks, score = REPLAY_HEADER_XZH.unpack_from(data)
+        if magic != REPLAY_MAGIC_XZH:
+            raise ValueError("不是回放文件")
+        if version not in (1, 2, REPLAY_VERSION_XZH):
+            raise ValueError(f"不支持的回放版本: {version}")
+
+        replay = cls(REPLAY_MODES_XZH[mode], seed, bool(flags & REPLAY_FLAG_SWEPT_XZH),
+                     bool(flags & REPLAY_FLAG_MULTIBALL_XZH))
+        replay.score = score
+        body = zlib.decompress(data[REPLAY_HEADER_XZH.size:])
+        position = 0
+        if version == 1:
+            # 版本1只有游段，没有数量前缀和快照
+            while position < len(body):
+                value, position = read_varint_xzh(body, position)
+                replay.runs.append([value & 0x7, value >> 3])
+        else:
+            count, position = read_varint_xzh(body, position)
+            for _ in range(count):
+                value, position = read_varint_xzh(body, position)
+                replay.runs.append([value & 0x7, value >> 3])
+            count, position = read_varint_xzh(body, position)
+            previous = b""
+            for _ in range(count):
+                tick, position = read_varint_xzh(body, position)
+                length, position = read_varint_xzh(body, position)
+                snapshot = bytes(body[position:position + length])
+                if version >= 3:
+                    snapshot = xor_bytes_xzh(snapshot, previous)
+                replay.add_snapshot_xzh(tick, snapshot)
+                previous = snapshot
+                position += length
+
+        replay.ticks = sum(count for _, count in replay.runs)
+        if replay.ticks != ticks:
+            raise ValueError(f"回放数据损坏: 帧数应为 {ticks}，实际为 {replay.ticks}")
+        return replay
+
+
+def default_replay_path_xzh(replay):
+    """
+    回放文件的默认路径：REPLAY_DIR_XZH下按时间、模式和得分命名（目录不存在时创建）
+    :param replay: Replay_xzh对象
+    :return: 文件路径
+    """
+    os.makedirs(REPLAY_DIR_XZH, exist_ok=True)
+    name = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{replay.mode}_{replay.score}.brr"
+    return os.path.join(REPLAY_DIR_XZH, name)
+
+
+def save_replay_xzh(replay, path=None):
+    """
+    保存回放文件（原子写入，崩溃不会留下截断的回放）
+    :param replay: Replay_xzh对象
+    :param path: 文件路径（默认见default_replay_path_xzh）
+    :return: 保存的文件路径
+    """
+    path = path if path is not None else default_replay_path_xzh(replay)
+    write_file_atomic_xzh(path, replay.to_bytes_xzh())
+    return path
+
+
+def save_replay_async_xzh(replay, path=None):
+    """
+    交给后台保存线程写入回放文件（立即返回，在引用它的游戏记录之前写入）
+    :param replay: Replay_xzh对象
+    :param path: 文件路径（默认见default_replay_path_xzh）
+    :return: 回放文件路径
+    """
+    path = path if path is not None else default_replay_path_xzh(replay)
+    save_file_async_xzh(path, replay.to_bytes_xzh())
+    return path
+
+
+def load_replay_xzh(path):
+    """
+    加载回放文件
+    :param path: 文件路径
+    :return: Replay_xzh对象
+    """
+    with open(path, 'rb') as f:
+        return Replay_xzh.from_bytes_xzh(f.read())
+
+
+def simulate_replay_xzh(replay):
+    """
+    无界面地重新模拟整局回放
+    :param replay: Replay_xzh对象
+    :return: 模拟结束后的GameCore_xzh对象
+    """
+    game = GameCore_xzh(replay.mode, seed=replay.seed, swept=replay.swept, multiball=replay.multiball)
+    step = game.step_xzh
+    for inputs in replay.iter_inputs_xzh():
+        step(inputs)
+    return game
+
+
+def build_snapshots_xzh(replay, interval=SNAPSHOT_INTERVAL_TICKS_XZH):
+    """
+    为没有快照的回放（如版本1文件）重新模拟生成跳转用的快照
+    :param replay: Replay_xzh对象
+    :param interval: 快照间隔（帧）
+    """
+    game = GameCore_xzh(replay.mode, seed=replay.seed, swept=replay.swept, multiball=replay.multiball)
+    replay.snapshot_ticks = []
+    replay.snapshots = []
+    for inputs in replay.iter_inputs_xzh():
+        if game.tick % interval == 0:
+            replay.add_snapshot_xzh(game.tick, game.snapshot_xzh())
+        game.step_xzh(inputs)
+
+
+def seek_replay_xzh(replay, tick, game=None):
+    """
+    跳转到回放的指定帧：恢复最近的快照，再模拟到目标帧（回放没有快照时先生成）
+    :param replay: Replay_xzh对象
+    :param tick: 目标帧数（限制在0到回放总帧数之间）
+    :param game: 要跳转的游戏对象（为None时新建无界面的GameCore_xzh）
+    :return: 处于目标帧（执行该帧输入之前）的游戏对象
+    """
+    tick = min(max(tick, 0), replay.ticks)
+    if game is None:
+        game = GameCore_xzh(replay.mode, seed=replay.seed, swept=replay.swept, multiball=replay.multiball)
+    if not replay.snapshots:
+        build_snapshots_xzh(replay)
+
+    # 当前位置已在最近的快照和目标之间时直接向前模拟
+    nearest = replay.find_snapshot_xzh(tick)
+    if nearest is not None and not nearest[0] <= game.tick <= tick:
+        game.restore_xzh(nearest[1])
+
+    step = game.step_xzh
+    for inputs in replay.iter_inputs_xzh(game.tick):
+        if game.tick >= tick:
+            break
+        step(inputs)
+    return game
+
+
+def verify_replay_xzh(replay):
+    """
+    核对回放：重新模拟后的得分是否与记录的得分一致
+    :param replay: Replay_xzh对象
+    :return: (是否一致, 模拟得到的游戏数据字典)
+    """
+    game = simulate_replay_xzh(replay)
+    game_data = game.get_game_data_xzh()
+    return game.score == replay.score, game_data
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="回放核对与播放")
+    parser.add_argument("path", help="回放文件路径")
+    parser.add_argument("--render", action="store_true", help="以正常速度渲染播放")
+    args = parser.parse_args()
+
+    loaded = load_replay_xzh(args.path)
+    size = os.path.getsize(args.path)
+    print(f"{loaded.mode} 模式, 种子 {loaded.seed}, {loaded.ticks} 帧 ({loaded.ticks / FPS:.1f} 秒), "
+          f"{len(loaded.runs)} 个游段, {len(loaded.snapshots)} 个快照, 文件 {size} 字节")
+
+    if args.render:
+        from game import Game_xzh
+        Game_xzh(loaded.mode, seed=loaded.seed, swept=loaded.swept, multiball=loaded.multiball,
+                 replay=loaded).run_xzh()
+    else:
+        start = time.perf_counter()
+        matched, result = verify_replay_xzh(loaded)
+        elapsed = time.perf_counter() - start
+        print(f"重新模拟用时 {elapsed:.2f} 秒 ({loaded.ticks / max(elapsed, 1e-9):,.0f} 帧/秒)")
+        print(f"记录得分 {loaded.score}, 模拟得分 {result['score']}: {'一致' if matched else '不一致!'}")
@@ -0,0 +1,1315 @@
+# -*- coding: utf-8 -*-
+"""
+游戏规则核心模块
+不依赖pygame的模拟核心：球的运动、墙壁/挡板/砖块碰撞、生命值和智能难度调整
+可以在没有显示设备的CI或批处理服务器上无界面运行，由game.py中的渲染层驱动
+"""
+
+import math
+import random
+import struct
+import time
+from datetime import datetime
+import numpy as np
+from config import *
+
+# 输入位掩码（每个模拟帧一个整数）
+INPUT_LEFT_XZH = 1  # 向左移动挡板
+INPUT_RIGHT_XZH = 2  # 向右移动挡板
+INPUT_LAUNCH_XZH = 4  # 发射球
+
+# 可按局覆盖的难度参数及其默认值（见config.py的智能难度调整设置）
+DIFFICULTY_DEFAULTS_XZH = {
+    "check_interval": DIFFICULTY_CHECK_INTERVAL_XZH,
+    "hit_rate_threshold": HIT_RATE_THRESHOLD_HIGH_XZH,
+    "width_adjustment": PADDLE_WIDTH_ADJUSTMENT_XZH,
+    "speed_adjustment": PADDLE_SPEED_ADJUSTMENT_XZH,
+}
+
+# 状态快照：版本、帧数、种子、随机数抽取次数、球(x, y, dx, dy, 速度)、状态标志位、
+# 挡板(x, 宽度, 速度)、得分、生命值、关卡、难度统计(5项)、开始/结束时间、砖块数；其后为砖块可见性位图
+SNAPSHOT_VERSION_XZH = 1
+SNAPSHOT_STRUCT_XZH = struct.Struct("<BIQI5dB3dIiI5IddH")
+SNAPSHOT_BALL_ACTIVE_XZH = 1
+SNAPSHOT_STARTED_XZH = 2
+SNAPSHOT_OVER_XZH = 4
+SNAPSHOT_WON_XZH = 8
+SNAPSHOT_BALL_STRUCT_XZH = struct.Struct("<5d")  # 位图之后：多球模式下额外的球(x, y, dx, dy, 速度)
+
+
+def make_bounds_xzh(x, y, width, height):
+    """
+    按pygame.Rect的规则把浮点坐标截断为整数矩形
+    :return: (x, y, width, height) 整数元组
+    """
+    return int(x), int(y), int(width), int(height)
+
+
+def bounds_collide_xzh(a, b):
+    """
+    判断两个矩形是否重叠（与pygame.Rect.colliderect规则一致）
+    :param a: (x, y, width, height) 整数元组
+    :param b: (x, y, width, height) 整数元组
+    :return: 是否重叠
+    """
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    if not (aw and ah and bw and bh):
+        return False
+    return ax < bx + bw and ay < by + bh and ax + aw > bx and ay + ah > by
+
+
+def sweep_circle_aabb_xzh(x, y, dx, dy, radius, left, top, right, bottom):
+    """
+    扫掠圆与轴对齐矩形的连续碰撞检测
+    圆心沿(dx, dy)移动，等价于射线与按半径扩展后的圆角矩形求交
+    :param x: 圆心起点X坐标
+    :param y: 圆心起点Y坐标
+    :param dx: 本次位移X分量
+    :param dy: 本次位移Y分量
+    :param radius: 圆半径
+    :param left: 矩形左边
+    :param top: 矩形上边
+    :param right: 矩形右边
+    :param bottom: 矩形下边
+    :return: (t, nx, ny) 碰撞时刻（0到1之间，按位移比例）和碰撞法线；不会碰撞时返回None
+    """
+    # 射线与扩展矩形的slab求交
+    t_enter = -math.inf
+    t_exit = math.inf
+    normal_x = normal_y = 0.0
+    for start, delta, low, high, axis in ((x, dx, left - radius, right + radius, 0),
+                                          (y, dy, top - radius, bottom + radius, 1)):
+        if delta == 0:
+            if start < low or start > high:
+                return None
+            continue
+        t_low = (low - start) / delta
+        t_high = (high - start) / delta
+        if t_low > t_high:
+            t_low, t_high = t_high, t_low
+        if t_low > t_enter:
+            t_enter = t_low
+            if axis == 0:
+                normal_x, normal_y = (-1.0 if delta > 0 else 1.0), 0.0
+            else:
+                normal_x, normal_y = 0.0, (-1.0 if delta > 0 else 1.0)
+        t_exit = min(t_exit, t_high)
+
+    if t_enter > t_exit or t_exit < 0 or t_enter > 1:
+        return None
+
+    # 进入点位于边的范围内：与边相撞
+    t = max(t_enter, 0.0)
+    hit_x = x + dx * t
+    hit_y = y + dy * t
+    if left <= hit_x <= right or top <= hit_y <= bottom:
+        if t_enter < 0:
+            return None  # 起点已与矩形重叠
+        return t_enter, normal_x, normal_y
+
+    # 进入点位于角落区域：与角上的圆弧相撞
+    corner_x = left if hit_x < left else right
+    corner_y = top if hit_y < top else bottom
+    offset_x = x - corner_x
+    offset_y = y - corner_y
+    a = dx * dx + dy * dy
+    b = 2 * (offset_x * dx + offset_y * dy)
+    c = offset_x * offset_x + offset_y * offset_y - radius * radius
+    if c < 0 or b >= 0:
+        return None  # 起点已与角重叠，或正在远离该角
+    discriminant = b * b - 4 * a * c
+    if discriminant < 0:
+        return None
+    t = (-b - math.sqrt(discriminant)) / (2 * a)
+    if t < 0 or t > 1:
+        return None
+    return t, (offset_x + dx * t) / radius, (offset_y + dy * t) / radius
+
+
+class CountingRandom_xzh(random.Random):
+    """
+    记录random()调用次数的随机数生成器
+    快照只需保存种子和调用次数，恢复时重新播种并跳过相同次数（规则核心每次发球只抽取一次）
+    """
+
+    def __init__(self, seed=None):
+        """
+        初始化随机数生成器
+        :param seed: 随机种子
+        """
+        self.initial_seed = seed
+        self.draws = 0
+        super().__init__(seed)
+
+    def random(self):
+        """
+        返回[0, 1)之间的随机浮点数并计数
+        :return: 随机数
+        """
+        self.draws += 1
+        return super().random()
+
+    def skip_to_xzh(self, draws):
+        """
+        把随机数流推进到第draws次调用之后（需要回退时重新播种）
+        :param draws: 调用次数
+        """
+        if draws < self.draws:
+            self.seed(self.initial_seed)
+            self.draws = 0
+        while self.draws < draws:
+            self.random()
+
+
+class PaddleState_xzh:
+    """挡板状态（不含绘制）"""
+
+    __slots__ = ("x", "y", "width", "height", "speed", "color")
+
+    def __init__(self, x, y, width):
+        """
+        初始化挡板
+        :param x: X坐标
+        :param y: Y坐标
+        :param width: 挡板宽度
+        """
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = PADDLE_HEIGHT_XZH
+        self.speed = PADDLE_SPEED_XZH
+        self.color = PADDLE_COLOR_XZH
+
+    def move_left_xzh(self, dt=1):
+        """
+        向左移动挡板
+        :param dt: 时间步长（模拟帧数）
+        """
+        self.x -= self.speed * dt
+        if self.x < 0:
+            self.x = 0
+
+    def move_right_xzh(self, dt=1):
+        """
+        向右移动挡板
+        :param dt: 时间步长（模拟帧数）
+        """
+        self.x += self.speed * dt
+        if self.x + self.width > SCREEN_WIDTH:
+            self.x = SCREEN_WIDTH - self.width
+
+    def get_bounds_xzh(self):
+        """
+        获取挡板的矩形区域
+        :return: (x, y, width, height) 整数元组
+        """
+        return make_bounds_xzh(self.x, self.y, self.width, self.height)
+
+    def adjust_width_xzh(self, delta):
+        """
+        调整挡板宽度
+        :param delta: 宽度变化量
+        """
+        self.width += delta
+        if self.width < PADDLE_WIDTH_MIN_XZH:
+            self.width = PADDLE_WIDTH_MIN_XZH
+        elif self.width > PADDLE_WIDTH_MAX_XZH:
+            self.width = PADDLE_WIDTH_MAX_XZH
+
+    def adjust_speed_xzh(self, delta):
+        """
+        调整挡板速度
+        :param delta: 速度变化量
+        """
+        self.speed += delta
+        if self.speed > PADDLE_SPEED_MAX_XZH:
+            self.speed = PADDLE_SPEED_MAX_XZH
+
+
+class BallState_xzh:
+    """球状态（不含绘制）"""
+
+    __slots__ = ("x", "y", "radius", "speed", "dx", "dy", "active", "color")
+
+    def __init__(self, x, y, speed):
+        """
+        初始化球
+        :param x: X坐标
+        :param y: Y坐标
+        :param speed: 球速
+        """
+        self.x = x
+        self.y = y
+        self.radius = BALL_RADIUS_XZH
+        self.speed = speed
+        self.dx = 0
+        self.dy = 0
+        self.active = False
+        self.color = BALL_COLOR_XZH
+
+    def launch_xzh(self, rng=None):
+        """
+        发射球
+        :param rng: 随机数生成器（默认使用random模块）
+        """
+        if not self.active:
+            rng = rng if rng is not None else random
+            angle = rng.uniform(-60, 60)  # 随机角度（度）
+            angle_rad = math.radians(angle)
+            self.dx = self.speed * math.sin(angle_rad)
+            self.dy = -self.speed * math.cos(angle_rad)
+            self.active = True
+
+    def move_xzh(self):
+        """移动球"""
+        if self.active:
+            self.x += self.dx
+            self.y += self.dy
+
+    def bounce_wall_xzh(self):
+        """处理球与墙壁的碰撞"""
+        # 左右墙壁
+        if self.x - self.radius <= 0 or self.x + self.radius >= SCREEN_WIDTH:
+            self.dx = -self.dx
+            # 修正位置防止穿墙
+            if self.x - self.radius < 0:
+                self.x = self.radius
+            if self.x + self.radius > SCREEN_WIDTH:
+                self.x = SCREEN_WIDTH - self.radius
+
+        # 顶部墙壁
+        if self.y - self.radius <= 0:
+            self.dy = -self.dy
+            self.y = self.radius
+
+    def get_bounds_xzh(self):
+        """
+        获取球的外接矩形
+        :return: (x, y, width, height) 整数元组
+        """
+        return make_bounds_xzh(self.x - self.radius, self.y - self.radius,
+                               self.radius * 2, self.radius * 2)
+
+    def bounce_paddle_xzh(self, paddle):
+        """
+        处理球与挡板的碰撞
+        :param paddle: 挡板对象
+        :return: 是否发生碰撞
+        """
+        if not self.active:
+            return False
+
+        if bounds_collide_xzh(self.get_bounds_xzh(), paddle.get_bounds_xzh()) and self.dy > 0:
+            self.deflect_from_paddle_xzh(paddle)
+
+            # 修正位置防止粘连
+            self.y = paddle.y - self.radius
+            return True
+        return False
+
+    def deflect_from_paddle_xzh(self, paddle, clamp=False):
+        """
+        按击中挡板的位置调整反弹角度，保持速率不变
+        :param paddle: 挡板对象
+        :param clamp: 是否把击中位置限制在挡板范围内（擦到挡板侧边时角度不超过60度）
+        """
+        # 计算球击中挡板的相对位置
+        hit_pos = (self.x - paddle.x) / paddle.width  # 0到1之间
+        if clamp:
+            hit_pos = min(max(hit_pos, 0.0), 1.0)
+        # 根据击中位置调整反弹角度
+        angle = (hit_pos - 0.5) * 120  # -60到60度
+        angle_rad = math.radians(angle)
+
+        speed = math.sqrt(self.dx ** 2 + self.dy ** 2)
+        self.dx = speed * math.sin(angle_rad)
+        self.dy = -speed * math.cos(angle_rad)
+
+    def check_miss_xzh(self):
+        """
+        检查球是否掉落
+        :return: 是否掉落
+        """
+        return self.y - self.radius > SCREEN_HEIGHT
+
+    def reset_xzh(self, paddle):
+        """
+        重置球的位置
+        :param paddle: 挡板对象
+        """
+        self.x = paddle.x + paddle.width / 2
+        self.y = paddle.y - self.radius - 5
+        self.dx = 0
+        self.dy = 0
+        self.active = False
+
+    def adjust_speed_xzh(self, delta):
+        """
+        调整球速
+        :param delta: 速度变化量
+        """
+        current_speed = math.sqrt(self.dx ** 2 + self.dy ** 2)
+        new_speed = current_speed + delta
+
+        if new_speed < BALL_SPEED_MIN_XZH:
+            new_speed = BALL_SPEED_MIN_XZH
+        elif new_speed > BALL_SPEED_MAX_XZH:
+            new_speed = BALL_SPEED_MAX_XZH
+
+        if current_speed > 0:
+            ratio = new_speed / current_speed
+            self.dx *= ratio
+            self.dy *= ratio
+
+        self.speed = new_speed
+
+
+class BrickState_xzh:
+    """
+    砖块视图（不含绘制）
+    数据保存在所属BrickField_xzh的并行数组中，视图只记录索引和位置；
+    尺寸、分数、颜色和可见性从砖块墙读取
+    """
+
+    __slots__ = ("field", "index", "x", "y")
+
+    def __init__(self, field, index):
+        """
+        初始化砖块视图
+        :param field: 所属砖块墙
+        :param index: 砖块在墙中的索引
+        """
+        self.field = field
+        self.index = index
+        self.x, self.y = field.position_xzh(index)
+
+    @property
+    def width(self):
+        """宽度（整面墙共享）"""
+        return self.field.brick_width
+
+    @property
+    def height(self):
+        """高度（整面墙共享）"""
+        return self.field.brick_height
+
+    @property
+    def points(self):
+        """分数（整面墙共享）"""
+        return self.field.points
+
+    @property
+    def color(self):
+        """颜色（按行）"""
+        return self.field.get_color_xzh(self.index)
+
+    @property
+    def visible(self):
+        """是否可见"""
+        return self.field.visible[self.index] == 1
+
+    @visible.setter
+    def visible(self, value):
+        self.field.visible[self.index] = 1 if value else 0
+
+    def get_bounds_xzh(self):
+        """
+        获取砖块的矩形区域
+        :return: (x, y, width, height) 整数元组
+        """
+        field = self.field
+        return make_bounds_xzh(self.x, self.y, field.brick_width, field.brick_height)
+
+
+class BrickField_xzh:
+    """
+    砖块墙 - 结构数组表示
+    整面墙共享砖块尺寸和分数，逐块只保存一个字节的可见性，颜色按行保存为颜色表索引；
+    按索引、切片或迭代访问得到BrickState_xzh视图，可以像砖块列表一样使用（切片返回视图列表）；
+    视图在第一次访问时才创建，碰撞检测等热点路径直接读取数组，无界面模拟时只有被击中的砖块会生成视图
+    """
+
+    def __init__(self, rows, cols, brick_cls=BrickState_xzh, colors=BRICK_COLORS_XZH,
+                 brick_width=BRICK_WIDTH_XZH, brick_height=BRICK_HEIGHT_XZH, padding=BRICK_PADDING_XZH,
+                 offset_left=BRICK_OFFSET_LEFT_XZH, offset_top=BRICK_OFFSET_TOP_XZH, points=POINTS_PER_BRICK_XZH):
+        """
+        创建一面砖块墙（全部可见）
+        :param rows: 行数
+        :param cols: 列数
+        :param brick_cls: 砖块视图类型
+        :param colors: 颜色表，第row行使用colors[row % len(colors)]
+        :param brick_width: 砖块宽度
+        :param brick_height: 砖块高度
+        :param padding: 砖块间距
+        :param offset_left: 左边距
+        :param offset_top: 上边距
+        :param points: 每块砖块的分数
+        """
+        self.rows = rows
+        self.cols = cols
+        self.brick_width = brick_width
+        self.brick_height = brick_height
+        self.padding = padding
+        self.offset_left = offset_left
+        self.offset_top = offset_top
+        self.points = points
+        self.colors = list(colors)
+        self.row_colors = bytearray(row % len(self.colors) for row in range(rows))  # 每行的颜色索引
+        self.visible = bytearray(b"\x01") * (rows * cols)  # 可见性（0/1）
+        self.brick_cls = brick_cls
+        self.views = [None] * (rows * cols)  # 已创建的砖块视图
+        self.views_created = 0  # 累计创建的视图数（调试统计）
+
+    def __len__(self):
+        return len(self.views)
+
+    def __getitem__(self, index):
+        """
+        获取砖块视图
+        :param index: 整数索引（可为负）或切片；其他类型抛出TypeError
+        :return: BrickState_xzh视图；切片时为视图列表
+        """
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self.views)))]
+        view = self.views[index]
+        if view is None:
+            if index < 0:
+                index += len(self.views)
+            view = self.views[index] = self.brick_cls(self, index)
+            self.views_created += 1
+        return view
+
+    def __iter__(self):
+        for index in range(len(self.views)):
+            yield self[index]
+
+    def position_xzh(self, index):
+        """
+        计算砖块左上角坐标
+        :param index: 砖块索引
+        :return: (x, y)
+        """
+        row, col = divmod(index, self.cols)
+        return (self.offset_left + col * (self.brick_width + self.padding),
+                self.offset_top + row * (self.brick_height + self.padding))
+
+    def get_bounds_xzh(self, index):
+        """
+        获取砖块的矩形区域（不创建视图）
+        :param index: 砖块索引
+        :return: (x, y, width, height) 整数元组
+        """
+        row, col = divmod(index, self.cols)
+        return (self.offset_left + col * (self.brick_width + self.padding),
+                self.offset_top + row * (self.brick_height + self.padding),
+                self.brick_width, self.brick_height)
+
+    def get_color_xzh(self, index):
+        """
+        获取砖块颜色
+        :param index: 砖块索引
+        :return: 颜色元组
+        """
+        return self.colors[self.row_colors[index // self.cols]]
+
+    def reset_xzh(self):
+        """重新显示所有砖块（原地修改，已创建的视图继续有效）"""
+        np.frombuffer(self.visible, dtype=np.uint8)[:] = 1
+
+    def count_visible_xzh(self):
+        """
+        统计可见砖块数
+        :return: 可见砖块数
+        """
+        return self.visible.count(1)
+
+
+class BrickGrid_xzh:
+    """
+    砖块均匀网格索引
+    格子间距与砖块布局一致，球的外接矩形直接映射到可能接触的少数格子；
+    同时维护剩余砖块数，判断是否清空时无需遍历所有砖块
+    """
+
+    def __init__(self, bricks,
+                 cell_width=BRICK_WIDTH_XZH + BRICK_PADDING_XZH,
+                 cell_height=BRICK_HEIGHT_XZH + BRICK_PADDING_XZH,
+                 origin_x=BRICK_OFFSET_LEFT_XZH, origin_y=BRICK_OFFSET_TOP_XZH):
+        """
+        建立网格索引
+        :param bricks: 砖块墙BrickField_xzh（索引即砖块在墙中的位置）
+        :param cell_width: 格子宽度
+        :param cell_height: 格子高度
+        :param origin_x: 网格原点X坐标
+        :param origin_y: 网格原点Y坐标
+        """
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        self.origin_x = origin_x
+        self.origin_y = origin_y
+        self.cells = {}  # (行, 列) -> 与该格子重叠的砖块索引列表（升序）
+        self.remaining = 0  # 剩余可见砖块数
+        self.bricks = bricks
+        self.arrays = None  # 批量碰撞检测使用的数组（首次使用时建立）
+
+        for index in range(len(bricks)):
+            x, y, width, height = bricks.get_bounds_xzh(index)
+            if width <= 0 or height <= 0:
+                continue
+            for row in range(self.row_of_xzh(y), self.row_of_xzh(y + height - 1) + 1):
+                for col in range(self.col_of_xzh(x), self.col_of_xzh(x + width - 1) + 1):
+                    self.cells.setdefault((row, col), []).append(index)
+        self.remaining = bricks.count_visible_xzh()
+
+    def col_of_xzh(self, x):
+        """像素X坐标所在的列"""
+        return (x - self.origin_x) // self.cell_width
+
+    def row_of_xzh(self, y):
+        """像素Y坐标所在的行"""
+        return (y - self.origin_y) // self.cell_height
+
+    def query_xzh(self, bounds):
+        """
+        查询与矩形可能重叠的砖块
+        :param bounds: (x, y, width, height) 整数元组
+        :return: 候选砖块索引列表（按砖块列表顺序）
+        """
+        x, y, width, height = bounds
+        row_start = self.row_of_xzh(y)
+        row_end = self.row_of_xzh(y + height - 1)
+        col_start = self.col_of_xzh(x)
+        col_end = self.col_of_xzh(x + width - 1)
+
+        cells = self.cells
+        if row_start == row_end and col_start == col_end:
+            return cells.get((row_start, col_start), ())
+
+        candidates = set()
+        for row in range(row_start, row_end + 1):
+            for col in range(col_start, col_end + 1):
+                indices = cells.get((row, col))
+                if indices:
+                    candidates.update(indices)
+        return sorted(candidates)
+
+    def get_arrays_xzh(self):
+        """
+        获取批量碰撞检测使用的数组
+        格子内有多块砖块时只取索引最小的一块（规则排列的砖块墙每格一块）
+        :return: (行列 -> 砖块索引表（没有砖块为-1）, 砖块矩形数组 (n, 4))
+        """
+        if self.arrays is None:
+            cells = [(row, col) for row, col in self.cells if row >= 0 and col >= 0]
+            rows = max((row for row, _ in cells), default=-1) + 1
+            cols = max((col for _, col in cells), default=-1) + 1
+            table = np.full((max(rows, 1), max(cols, 1)), -1, dtype=np.int64)
+            for row, col in cells:
+                table[row, col] = self.cells[(row, col)][0]
+            bounds = np.array([self.bricks.get_bounds_xzh(index) for index in range(len(self.bricks))],
+                              dtype=np.int64).reshape(-1, 4)
+            self.arrays = (table, bounds)
+        return self.arrays
+
+    def reset_xzh(self):
+        """砖块墙原地重置后重新统计剩余砖块数（布局不变，格子索引无需重建）"""
+        self.remaining = self.bricks.count_visible_xzh()
+
+    def hide_xzh(self, brick):
+        """
+        隐藏砖块并更新剩余计数
+        :param brick: 砖块对象
+        """
+        if brick.visible:
+            brick.visible = False
+            self.remaining -= 1
+
+
+class GameCore_xzh:
+    """
+    游戏规则核心 - 不依赖pygame
+    每调用一次step_xzh(inputs)推进一个模拟帧；渲染层通过继承并重写
+    on_brick_hit_xzh / on_bricks_regenerated_xzh 接收事件
+    """
+
+    # 实体类型，渲染层可替换为带绘制方法的子类
+    paddle_cls = PaddleState_xzh
+    ball_cls = BallState_xzh
+    brick_cls = BrickState_xzh
+
+    def __init__(self, mode=MODE_CLASSIC_XZH, seed=None, verbose=False, realtime=False,
+                 swept=SWEPT_COLLISION_XZH, difficulty=None, multiball=MULTIBALL_MODE_XZH):
+        """
+        初始化游戏核心
+        :param mode: 游戏模式
+        :param seed: 随机种子（为None时随机生成），相同种子和输入得到相同结果
+        :param verbose: 是否打印关卡和难度变化信息
+        :param realtime: 是否用真实时间计算游戏时长（否则按模拟帧数和FPS计算）
+        :param swept: 是否使用连续碰撞检测（支持dt大于1的时间步长）
+        :param difficulty: 覆盖难度参数的字典（键见DIFFICULTY_DEFAULTS_XZH），用于难度调优
+        :param multiball: 是否启用多球模式（不能与连续碰撞检测同时使用）
+        """
+        if swept and multiball:
+            raise ValueError("多球模式不支持连续碰撞检测")
+        self.mode = mode
+        self.swept = swept
+        self.multiball = multiball
+        self.seed = seed if seed is not None else random.getrandbits(32)
+        self.rng = CountingRandom_xzh(self.seed)
+        self.verbose = verbose
+        self.realtime = realtime
+
+        # 难度参数
+        self.difficulty = dict(DIFFICULTY_DEFAULTS_XZH)
+        if difficulty:
+            unknown = set(difficulty) - set(DIFFICULTY_DEFAULTS_XZH)
+            if unknown:
+                raise ValueError(f"未知的难度参数: {', '.join(sorted(unknown))}")
+            self.difficulty.update(difficulty)
+
+        self.running = True
+        self.game_started = False
+        self.game_over = False
+        self.game_won = False
+        self.tick = 0  # 已模拟的帧数
+
+        # 游戏统计数据
+        self.score = 0
+        self.lives = INITIAL_LIVES_XZH if mode == MODE_CLASSIC_XZH else CHALLENGE_LIVES_XZH
+        self.bricks_hit = 0
+        self.bricks_missed = 0
+        self.total_bricks_hit = 0  # 累计击中砖块数（不重置）
+        self.total_bricks_missed = 0  # 累计未击中数（不重置）
+        self.last_check_hit_count = 0  # 上次检查时的击中数
+        self.level = 1  # 关卡数（用于挑战模式）
+        self.start_time = None
+        self.end_time = None
+
+        # 对象池和分配统计：掉落的球放回空闲列表，换关时复用砖块墙
+        self.spare_balls = []  # 空闲的球对象
+        self.fields_created = 0  # 累计创建的砖块墙数
+        self.balls_created = 0  # 累计创建的球对象数
+        self.level_allocations = []  # 已完成关卡的分配统计
+        self.level_start_allocations = {"fields": 0, "brick_views": 0, "balls": 0}  # 当前关卡开始时的累计分配数
+
+        # 初始化游戏对象
+        self.init_game_objects_xzh()
+
+    def get_time_xzh(self):
+        """
+        获取当前游戏时间（秒）
+        :return: 真实时间或模拟时间
+        """
+        if self.realtime:
+            return time.time()
+        return self.tick / FPS
+
+    def init_game_objects_xzh(self):
+        """初始化游戏对象"""
+        # 根据模式设置初始速度
+        initial_speed = BALL_SPEED_DEFAULT_XZH
+        if self.mode == MODE_CHALLENGE_XZH:
+            initial_speed *= CHALLENGE_SPEED_MULTIPLIER_XZH
+
+        # 创建挡板
+        paddle_x = (SCREEN_WIDTH - PADDLE_WIDTH_DEFAULT_XZH) / 2
+        paddle_y = SCREEN_HEIGHT - 50
+        self.paddle = self.paddle_cls(paddle_x, paddle_y, PADDLE_WIDTH_DEFAULT_XZH)
+
+        # 创建球
+        ball_x = paddle_x + PADDLE_WIDTH_DEFAULT_XZH / 2
+        ball_y = paddle_y - BALL_RADIUS_XZH - 5
+        self.ball = self.acquire_ball_xzh(ball_x, ball_y, initial_speed)
+        self.balls = [self.ball]  # 所有球，第一个为主球（未发射时停在挡板上）
+
+        # 创建砖块
+        self.bricks = self.create_bricks_xzh()
+        self.brick_grid = BrickGrid_xzh(self.bricks)
+        self.fields_created += 1
+
+    def create_bricks_xzh(self):
+        """
+        按当前模式创建一面砖块墙
+        :return: 砖块列表
+        """
+        rows = BRICK_ROWS_XZH if self.mode == MODE_CLASSIC_XZH else CHALLENGE_BRICK_ROWS_XZH
+        return BrickField_xzh(rows, BRICK_COLS_XZH, self.brick_cls)
+
+    def regenerate_bricks_xzh(self):
+        """重新生成砖块（用于挑战模式的无尽模式）：复用原有的砖块墙和网格索引，只重置可见性"""
+        self.bricks.reset_xzh()
+        self.brick_grid.reset_xzh()
+
+        # 记录刚结束的关卡的分配数
+        allocations = self.get_level_allocations_xzh()
+        self.level_allocations.append(allocations)
+        self.level_start_allocations = self.count_allocations_xzh()
+
+        # 关卡提升
+        self.level += 1
+        if self.verbose:
+            print(f"挑战模式 - 进入第 {self.level} 关! (上一关分配: 砖块墙 {allocations['fields']}, "
+                  f"砖块视图 {allocations['brick_views']}, 球 {allocations['balls']})")
+
+        self.on_bricks_regenerated_xzh()
+
+    def count_allocations_xzh(self):
+        """
+        统计累计创建的对象数
+        :return: {"fields": 砖块墙数, "brick_views": 砖块视图数, "balls": 球对象数}
+        """
+        return {"fields": self.fields_created, "brick_views": self.bricks.views_created,
+                "balls": self.balls_created}
+
+    def get_level_allocations_xzh(self):
+        """
+        统计当前关卡开始以来创建的对象数（调试用，对象池正常工作时换关后应保持为0）
+        :return: 与count_allocations_xzh格式相同的字典
+        """
+        start = self.level_start_allocations
+        return {kind: count - start[kind] for kind, count in self.count_allocations_xzh().items()}
+
+    def acquire_ball_xzh(self, x, y, speed):
+        """
+        取一个球对象：优先复用空闲列表中的球，没有时才新建
+        :param x: X坐标
+        :param y: Y坐标
+        :param speed: 球速
+        :return: 处于未发射状态的球
+        """
+        if self.spare_balls:
+            ball = self.spare_balls.pop()
+            ball.__init__(x, y, speed)
+            return ball
+        self.balls_created += 1
+        return self.ball_cls(x, y, speed)
+
+    def release_extra_balls_xzh(self):
+        """把主球以外的球放回空闲列表"""
+        self.spare_balls.extend(self.balls[1:])
+        del self.balls[1:]
+
+    def apply_inputs_xzh(self, inputs, dt=1):
+        """
+        应用一帧的玩家输入
+        :param inputs: 输入位掩码（INPUT_LEFT_XZH | INPUT_RIGHT_XZH | INPUT_LAUNCH_XZH）
+        :param dt: 时间步长（模拟帧数）
+        """
+        if inputs & INPUT_LAUNCH_XZH and not self.ball.active:
+            if not self.game_started:
+                self.game_started = True
+                self.start_time = self.get_time_xzh()
+            self.ball.launch_xzh(self.rng)
+
+        if inputs & INPUT_LEFT_XZH:
+            self.paddle.move_left_xzh(dt)
+            if not self.ball.active:
+                self.ball.x = self.paddle.x + self.paddle.width / 2
+        if inputs & INPUT_RIGHT_XZH:
+            self.paddle.move_right_xzh(dt)
+            if not self.ball.active:
+                self.ball.x = self.paddle.x + self.paddle.width / 2
+
+    def step_xzh(self, inputs=0, dt=1):
+        """
+        推进一个时间步
+        :param inputs: 输入位掩码
+        :param dt: 时间步长（模拟帧数），大于1时需要启用连续碰撞检测
+        :return: 游戏是否已结束（失败或经典模式获胜）
+        """
+        if dt != 1 and not self.swept:
+            raise ValueError("时间步长大于1需要启用连续碰撞检测 (swept=True)")
+
+        self.apply_inputs_xzh(inputs, dt)
+        self.update_xzh(dt)
+        self.tick += dt
+        return self.game_over or self.game_won
+
+    def update_xzh(self, dt=1):
+        """
+        更新游戏状态
+        :param dt: 时间步长（模拟帧数，仅连续碰撞模式支持大于1）
+        """
+        if not self.game_started or self.game_over or self.game_won:
+            return
+
+        if self.swept:
+            # 连续碰撞：一次处理本时间步内的所有反弹
+            self.move_ball_swept_xzh(dt)
+        elif self.multiball:
+            # 多球：所有球一次批量处理
+            self.update_balls_batched_xzh()
+        else:
+            # 移动球
+            self.ball.move_xzh()
+
+            # 球与墙壁碰撞
+            self.ball.bounce_wall_xzh()
+
+            # 球与挡板碰撞
+            if self.ball.bounce_paddle_xzh(self.paddle):
+                self.bricks_missed += 1  # 记录未击中砖块的次数
+                self.total_bricks_missed += 1  # 累计未击中数
+
+            # 球与砖块碰撞
+            self.check_brick_collision_xzh()
+
+        # 检查球是否掉落（多球模式下最后一个球掉落才失去生命）
+        if self.remove_missed_balls_xzh():
+            self.lives -= 1
+            if self.lives <= 0:
+                self.game_over = True
+                self.end_time = self.get_time_xzh()
+            else:
+                self.ball.reset_xzh(self.paddle)
+
+        # 检查是否获胜或重新生成砖块
+        if self.brick_grid.remaining == 0:
+            if self.mode == MODE_CHALLENGE_XZH:
+                # 挑战模式：重新生成砖块，继续游戏（无尽模式）
+                self.regenerate_bricks_xzh()
+                # 球回到挡板上方，但不重置为未发射状态
+                self.release_extra_balls_xzh()
+                if self.ball.active:
+                    self.ball.reset_xzh(self.paddle)
+                    self.ball.launch_xzh(self.rng)  # 自动发射球
+            else:
+                # 经典模式：游戏胜利
+                self.game_won = True
+                self.end_time = self.get_time_xzh()
+
+        # 智能难度调整
+        self.adjust_difficulty_xzh()
+
+    def remove_missed_balls_xzh(self):
+        """
+        移除掉出屏幕的球
+        :return: 是否所有球都已掉落（失去一条生命）
+        """
+        if len(self.balls) == 1:
+            return self.ball.check_miss_xzh()
+
+        kept = []
+        missed = []
+        for ball in self.balls:
+            (missed if ball.check_miss_xzh() else kept).append(ball)
+        if not kept:
+            # 主球留下等待重置，其余的球放回空闲列表
+            self.release_extra_balls_xzh()
+            return True
+        self.spare_balls.extend(missed)
+        self.balls = kept
+        self.ball = kept[0]
+        return False
+
+    def update_balls_batched_xzh(self):
+        """
+        多球模式：所有已发射的球一次完成移动、墙壁、挡板和砖块碰撞
+        结果与按球的顺序逐个处理完全一致：同一帧多个球碰到同一块砖块时只有第一个球击中它，
+        后面的球与逐个处理时一样在剩余的可见砖块中重新查找（可能击中另一块，也可能不反弹）
+        """
+        balls = [ball for ball in self.balls if ball.active]
+        if not balls:
+            return
+        radius = balls[0].radius
+        x = np.array([ball.x for ball in balls], dtype=float)
+        y = np.array([ball.y for ball in balls], dtype=float)
+        dx = np.array([ball.dx for ball in balls], dtype=float)
+        dy = np.array([ball.dy for ball in balls], dtype=float)
+
+        # 移动
+        x += dx
+        y += dy
+
+        # 墙壁（与bounce_wall_xzh相同的判断顺序）
+        side = (x - radius <= 0) | (x + radius >= SCREEN_WIDTH)
+        dx[side] = -dx[side]
+        x[side & (x - radius < 0)] = radius
+        x[side & (x + radius > SCREEN_WIDTH)] = SCREEN_WIDTH - radius
+        ceiling = y - radius <= 0
+        dy[ceiling] = -dy[ceiling]
+        y[ceiling] = radius
+
+        # 挡板：外接矩形按pygame.Rect规则截断
+        size = int(radius * 2)
+        paddle_x, paddle_y, paddle_width, paddle_height = self.paddle.get_bounds_xzh()
+        left = np.trunc(x - radius).astype(np.int64)
+        top = np.trunc(y - radius).astype(np.int64)
+        hits = ((dy > 0) & (left < paddle_x + paddle_width) & (top < paddle_y + paddle_height)
+                & (left + size > paddle_x) & (top + size > paddle_y))
+        for i in np.flatnonzero(hits).tolist():
+            # 挡板反弹较少，逐个按标量规则计算以保证与单球路径完全一致
+            ball = balls[i]
+            ball.x, ball.dx, ball.dy = float(x[i]), float(dx[i]), float(dy[i])
+            ball.deflect_from_paddle_xzh(self.paddle)
+            dx[i], dy[i] = ball.dx, ball.dy
+            y[i] = self.paddle.y - radius
+            self.bricks_missed += 1
+            self.total_bricks_missed += 1
+
+        # 砖块：每个球只查外接矩形覆盖的（最多2x2个）格子，取索引最小的重叠砖块
+        grid = self.brick_grid
+        table, bounds = grid.get_arrays_xzh()
+        visible = np.frombuffer(self.bricks.visible, dtype=bool)
+        left = np.trunc(x - radius).astype(np.int64)
+        top = np.trunc(y - radius).astype(np.int64)
+        col_start = (left - grid.origin_x) // grid.cell_width
+        col_end = (left + size - 1 - grid.origin_x) // grid.cell_width
+        row_start = (top - grid.origin_y) // grid.cell_height
+        row_end = (top + size - 1 - grid.origin_y) // grid.cell_height
+        found = np.full(len(balls), len(self.bricks), dtype=np.int64)
+        for rows, cols in ((row_start, col_start), (row_start, col_end), (row_end, col_start), (row_end, col_end)):
+            inside = (rows >= 0) & (rows < table.shape[0]) & (cols >= 0) & (cols < table.shape[1])
+            index = np.where(inside, table[np.where(inside, rows, 0), np.where(inside, cols, 0)], -1)
+            safe = np.maximum(index, 0)
+            brick_x, brick_y, brick_width, brick_height = bounds[safe].T
+            overlap = ((index >= 0) & visible[safe] & (left < brick_x + brick_width) & (top < brick_y + brick_height)
+                       & (left + size > brick_x) & (top + size > brick_y))
+            found = np.where(overlap & (index < found), index, found)
+
+        hit_balls = np.flatnonzero(found < len(self.bricks))
+        if hit_balls.size:
+            hit_total_before = self.total_bricks_hit
+            # 按球的顺序击碎砖块；砖块已被前面的球击碎时，与逐个处理一样重新查找
+            hit = []
+            for i in hit_balls.tolist():
+                index = int(found[i])
+                if not visible[index]:
+                    result = self.find_brick_hit_xzh((int(left[i]), int(top[i]), size, size))
+                    if result is None:
+                        continue
+                    index = found[i] = result[0]
+                self.hit_brick_xzh(self.bricks[index])
+                hit.append(i)
+            hit_balls = np.array(hit, dtype=np.int64)
+
+            # 根据球心到砖块各边的最近距离确定反弹方向（与calculate_bounce_xzh一致）
+            brick_x, brick_y, brick_width, brick_height = bounds[found[hit_balls]].T
+            ball_x = x[hit_balls]
+            ball_y = y[hit_balls]
+            left_dist = np.abs(ball_x - brick_x)
+            right_dist = np.abs(ball_x - (brick_x + brick_width))
+            top_dist = np.abs(ball_y - brick_y)
+            bottom_dist = np.abs(ball_y - (brick_y + brick_height))
+            min_dist = np.minimum(np.minimum(left_dist, right_dist), np.minimum(top_dist, bottom_dist))
+            flip_x = (min_dist == left_dist) | (min_dist == right_dist)
+            dx[hit_balls[flip_x]] *= -1
+            dy[hit_balls[~flip_x]] *= -1
+
+        # 写回球对象
+        for ball, ball_x, ball_y, ball_dx, ball_dy in zip(balls, x.tolist(), y.tolist(), dx.tolist(), dy.tolist()):
+            ball.x, ball.y, ball.dx, ball.dy = ball_x, ball_y, ball_dx, ball_dy
+
+        # 分裂：累计击碎数每跨过一个触发间隔，从主球分裂出新球
+        if hit_balls.size:
+            trigger = MULTIBALL_TRIGGER_HITS_XZH
+            if hit_total_before // trigger != self.total_bricks_hit // trigger:
+                self.spawn_balls_xzh(self.ball if self.ball.active else balls[0])
+
+    def spawn_balls_xzh(self, origin):
+        """
+        从指定球的位置分裂出新球（数量受MULTIBALL_MAX_BALLS_XZH限制）
+        :param origin: 分裂的来源球
+        """
+        for _ in range(MULTIBALL_SPLIT_COUNT_XZH):
+            if len(self.balls) >= MULTIBALL_MAX_BALLS_XZH:
+                break
+            ball = self.acquire_ball_xzh(origin.x, origin.y, origin.speed)
+            ball.launch_xzh(self.rng)
+            self.balls.append(ball)
+
+    def check_brick_collision_xzh(self):
+        """检查球与砖块的碰撞"""
+        if not self.ball.active:
+            return
+
+        result = self.find_brick_hit_xzh(self.ball.get_bounds_xzh())
+        if result is not None:
+            index, brick_bounds = result
+            self.hit_brick_xzh(self.bricks[index])
+
+            # 计算碰撞方向并反弹
+            self.calculate_bounce_xzh(brick_bounds)
+
+    def find_brick_hit_xzh(self, ball_bounds):
+        """
+        查找与球的外接矩形重叠的第一块可见砖块
+        只检查网格索引给出的候选砖块（按原列表顺序，结果与逐个遍历一致）
+        :param ball_bounds: 球的外接矩形 (x, y, width, height)
+        :return: (砖块索引, 砖块矩形)；没有重叠时返回None
+        """
+        bricks = self.bricks
+        visible = bricks.visible
+        for index in self.brick_grid.query_xzh(ball_bounds):
+            if visible[index]:
+                brick_bounds = bricks.get_bounds_xzh(index)
+                if bounds_collide_xzh(ball_bounds, brick_bounds):
+                    return index, brick_bounds
+        return None
+
+    def hit_brick_xzh(self, brick):
+        """
+        击碎砖块：隐藏砖块、计分并通知渲染层
+        :param brick: 被击中的砖块
+        """
+        self.brick_grid.hide_xzh(brick)
+        self.score += brick.points
+        self.bricks_hit += 1
+        self.total_bricks_hit += 1  # 累计击中数
+
+        self.on_brick_hit_xzh(brick)
+
+    def move_ball_swept_xzh(self, dt=1):
+        """
+        连续碰撞模式下移动球：求出最早的碰撞时刻，移动到碰撞点并反弹，
+        再用剩余的时间继续移动，直到本时间步结束或达到最大反弹次数
+        :param dt: 时间步长（模拟帧数）
+        """
+        ball = self.ball
+        if not ball.active:
+            return
+
+        remaining = dt
+        for _ in range(MAX_BOUNCES_PER_STEP_XZH):
+            move_x = ball.dx * remaining
+            move_y = ball.dy * remaining
+            hit = self.find_first_hit_xzh(move_x, move_y)
+            if hit is None:
+                ball.x += move_x
+                ball.y += move_y
+                return
+
+            t, target, normal_x, normal_y = hit
+            ball.x += move_x * t
+            ball.y += move_y * t
+            remaining *= 1 - t
+
+            if target is self.paddle:
+                ball.deflect_from_paddle_xzh(self.paddle, clamp=True)
+                self.bricks_missed += 1  # 记录未击中砖块的次数
+                self.total_bricks_missed += 1  # 累计未击中数
+            else:
+                if target is not None:
+                    self.hit_brick_xzh(target)
+                if abs(normal_x) >= abs(normal_y):
+                    ball.dx = -ball.dx
+                if abs(normal_y) >= abs(normal_x):
+                    ball.dy = -ball.dy
+
+            # 砖块已清空，交给update_xzh处理换关或胜利
+            if self.brick_grid.remaining == 0:
+                return
+
+    def find_first_hit_xzh(self, move_x, move_y):
+        """
+        求球沿位移(move_x, move_y)移动时最早发生的碰撞
+        :param move_x: 位移X分量
+        :param move_y: 位移Y分量
+        :return: (t, 碰撞对象, nx, ny)，碰撞对象为挡板、砖块或None（墙壁）；没有碰撞时返回None
+        """
+        ball = self.ball
+        radius = ball.radius
+        best = None
+
+        # 左、右、上三面墙
+        if move_x < 0:
+            t = max((radius - ball.x) / move_x, 0.0)
+            if t <= 1:
+                best = (t, None, 1.0, 0.0)
+        elif move_x > 0:
+            t = max((SCREEN_WIDTH - radius - ball.x) / move_x, 0.0)
+            if t <= 1:
+                best = (t, None, -1.0, 0.0)
+        if move_y < 0:
+            t = max((radius - ball.y) / move_y, 0.0)
+            if t <= 1 and (best is None or t < best[0]):
+                best = (t, None, 0.0, 1.0)
+
+        # 挡板（只在球向下运动时反弹）
+        if ball.dy > 0:
+            paddle = self.paddle
+            hit = sweep_circle_aabb_xzh(ball.x, ball.y, move_x, move_y, radius,
+                                        paddle.x, paddle.y, paddle.x + paddle.width, paddle.y + paddle.height)
+            if hit is not None and (best is None or hit[0] < best[0]):
+                best = (hit[0], paddle, hit[1], hit[2])
+
+        # 砖块：只检查扫掠范围覆盖的网格格子
+        start_x, end_x = sorted((ball.x, ball.x + move_x))
+        start_y, end_y = sorted((ball.y, ball.y + move_y))
+        left = math.floor(start_x - radius)
+        top = math.floor(start_y - radius)
+        swept_bounds = (left, top,
+                        math.ceil(end_x + radius) - left + 1, math.ceil(end_y + radius) - top + 1)
+        bricks = self.bricks
+        for index in self.brick_grid.query_xzh(swept_bounds):
+            if not bricks.visible[index]:
+                continue
+            left, top, width, height = bricks.get_bounds_xzh(index)
+            hit = sweep_circle_aabb_xzh(ball.x, ball.y, move_x, move_y, radius,
+                                        left, top, left + width, top + height)
+            if hit is not None and (best is None or hit[0] < best[0]):
+                best = (hit[0], bricks[index], hit[1], hit[2])
+
+        return best
+
+    def calculate_bounce_xzh(self, brick_bounds, ball=None):
+        """
+        计算球的反弹方向
+        :param brick_bounds: 砖块的矩形区域 (x, y, width, height)
+        :param ball: 反弹的球（默认为主球）
+        """
+        ball = ball if ball is not None else self.ball
+        left, top, width, height = brick_bounds
+
+        # 计算球心到砖块各边的距离
+        left_dist = abs(ball.x - left)
+        right_dist = abs(ball.x - (left + width))
+        top_dist = abs(ball.y - top)
+        bottom_dist = abs(ball.y - (top + height))
+
+        min_dist = min(left_dist, right_dist, top_dist, bottom_dist)
+
+        # 根据最近的边确定反弹方向
+        if min_dist in (left_dist, right_dist):
+            ball.dx = -ball.dx
+        else:
+            ball.dy = -ball.dy
+
+    def adjust_difficulty_xzh(self):
+        """智能难度调整系统 - 渐进式难度提升"""
+        # 检查是否达到检查间隔
+        difficulty = self.difficulty
+        if self.total_bricks_hit - self.last_check_hit_count >= difficulty["check_interval"]:
+            # 计算当前阶段的命中率（使用短期统计）
+            if self.bricks_hit > 0 or self.bricks_missed > 0:
+                total_attempts = self.bricks_hit + self.bricks_missed
+                hit_rate = self.bricks_hit / total_attempts if total_attempts > 0 else 0
+
+                # 如果命中率高于阈值，增加难度
+                if hit_rate > difficulty["hit_rate_threshold"]:
+                    # 缩短挡板宽度
+                    old_width = self.paddle.width
+                    self.paddle.adjust_width_xzh(-difficulty["width_adjustment"])
+
+                    # 只有当挡板实际缩短时，才增加移动速度（防止达到最小宽度后速度持续增加）
+                    if self.paddle.width < old_width:
+                        self.paddle.adjust_speed_xzh(difficulty["speed_adjustment"])
+                        if self.verbose:
+                            print(f"难度提升! 挡板宽度: {self.paddle.width:.0f}, 移动速度: {self.paddle.speed:.1f}")
+
+            # 更新检查点和重置短期统计
+            self.last_check_hit_count = self.total_bricks_hit
+            self.bricks_hit = 0
+            self.bricks_missed = 0
+
+    def snapshot_xzh(self):
+        """
+        把完整的游戏状态打包为紧凑的二进制快照（132字节的状态头加砖块可见性位图，每个额外的球再加40字节）
+        :return: bytes
+        """
+        ball = self.ball
+        paddle = self.paddle
+        flags = ((SNAPSHOT_BALL_ACTIVE_XZH if ball.active else 0) | (SNAPSHOT_STARTED_XZH if self.game_started else 0)
+                 | (SNAPSHOT_OVER_XZH if self.game_over else 0) | (SNAPSHOT_WON_XZH if self.game_won else 0))
+        visible = np.packbits(np.frombuffer(self.bricks.visible, dtype=np.uint8), bitorder="little")
+        extra_balls = b"".join(SNAPSHOT_BALL_STRUCT_XZH.pack(extra.x, extra.y, extra.dx, extra.dy, extra.speed)
+                               for extra in self.balls[1:])
+        header = SNAPSHOT_STRUCT_XZH.pack(
+            SNAPSHOT_VERSION_XZH, self.tick, self.seed, self.rng.draws,
+            ball.x, ball.y, ball.dx, ball.dy, ball.speed, flags,
+            paddle.x, paddle.width, paddle.speed,
+            self.score, self.lives, self.level,
+            self.bricks_hit, self.bricks_missed, self.total_bricks_hit, self.total_bricks_missed,
+            self.last_check_hit_count,
+            math.nan if self.start_time is None else self.start_time,
+            math.nan if self.end_time is None else self.end_time,
+            len(self.bricks))
+        return header + visible.tobytes() + extra_balls
+
+    def restore_xzh(self, data):
+        """
+        从快照恢复游戏状态（模式和难度参数需与生成快照的游戏一致）
+        :param data: snapshot_xzh生成的bytes
+        """
+        (version, tick, seed, draws, ball_x, ball_y, ball_dx, ball_dy, ball_speed, flags,
+         paddle_x, paddle_width, paddle_speed, score, lives, level,
+         bricks_hit, bricks_missed, total_bricks_hit, total_bricks_missed, last_check_hit_count,
+         start_time, end_time, brick_count) = SNAPSHOT_STRUCT_XZH.unpack_from(data)
+        if version != SNAPSHOT_VERSION_XZH:
+            raise ValueError(f"不支持的快照版本: {version}")
+        if brick_count != len(self.bricks):
+            raise ValueError(f"快照的砖块数 {brick_count} 与当前模式不一致")
+
+        self.tick = tick
+        if seed != self.seed:
+            self.seed = seed
+            self.rng = CountingRandom_xzh(seed)
+        self.rng.skip_to_xzh(draws)
+
+        ball = self.ball
+        ball.x, ball.y, ball.dx, ball.dy, ball.speed = ball_x, ball_y, ball_dx, ball_dy, ball_speed
+        ball.active = bool(flags & SNAPSHOT_BALL_ACTIVE_XZH)
+        self.game_started = bool(flags & SNAPSHOT_STARTED_XZH)
+        self.game_over = bool(flags & SNAPSHOT_OVER_XZH)
+        self.game_won = bool(flags & SNAPSHOT_WON_XZH)
+        self.paddle.x, self.paddle.width, self.paddle.speed = paddle_x, paddle_width, paddle_speed
+        self.score, self.lives, self.level = score, lives, level
+        self.bricks_hit, self.bricks_missed = bricks_hit, bricks_missed
+        self.total_bricks_hit, self.total_bricks_missed = total_bricks_hit, total_bricks_missed
+        self.last_check_hit_count = last_check_hit_count
+        self.start_time = None if math.isnan(start_time) else start_time
+        self.end_time = None if math.isnan(end_time) else end_time
+
+        bitmap_end = SNAPSHOT_STRUCT_XZH.size + (brick_count + 7) // 8
+        visible = np.unpackbits(np.frombuffer(data, dtype=np.uint8, count=bitmap_end - SNAPSHOT_STRUCT_XZH.size,
+                                              offset=SNAPSHOT_STRUCT_XZH.size), count=brick_count, bitorder="little")
+        self.bricks.visible[:] = visible.tobytes()
+        self.brick_grid.remaining = int(visible.sum())
+
+        # 多球模式下额外的球（都处于已发射状态）
+        self.release_extra_balls_xzh()
+        for offset in range(bitmap_end, len(data), SNAPSHOT_BALL_STRUCT_XZH.size):
+            extra_x, extra_y, extra_dx, extra_dy, extra_speed = SNAPSHOT_BALL_STRUCT_XZH.unpack_from(data, offset)
+            extra = self.acquire_ball_xzh(extra_x, extra_y, extra_speed)
+            extra.dx, extra.dy, extra.active = extra_dx, extra_dy, True
+            self.balls.append(extra)
+
+        self.on_state_restored_xzh()
+
+    def on_brick_hit_xzh(self, brick):
+        """
+        砖块被击碎时调用（渲染层重写以生成粒子、刷新砖块图层）
+        :param brick: 被击碎的砖块
+        """
+
+    def on_bricks_regenerated_xzh(self):
+        """砖块墙重新生成后调用（渲染层重写以重建砖块图层）"""
+
+    def on_state_restored_xzh(self):
+        """从快照恢复状态后调用（渲染层重写以刷新整个画面）"""
+
+    def get_game_data_xzh(self):
+        """
+        获取游戏数据
+        :return: 游戏数据字典
+        """
+        duration = 0
+        if self.start_time is not None and self.end_time is not None:
+            duration = self.end_time - self.start_time
+
+        total_attempts = self.total_bricks_hit + self.total_bricks_missed
+        hit_rate = (self.total_bricks_hit / total_attempts) if total_attempts > 0 else 0
+
+        return {
+            "mode": self.mode,
+            "score": self.score,
+            "level": self.level,  # 关卡数
+            "duration": duration,
+            "hit_rate": hit_rate,
+            "bricks_hit": self.total_bricks_hit,
+            "lives_remaining": self.lives,
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "won": self.game_won
+        }
+
@@ -0,0 +1,762 @@
+# -*- coding: utf-8 -*-
+"""
+游戏数据存储模块
+默认后端把历史记录保存为只追加的JSONL文件：每局一行紧凑的JSON，保存时只追加一行并fsync，
+耗时与历史长度无关；写入中途崩溃最多损坏最后一行，读取时跳过即可。
+可选的SQLite后端为模式、时间和得分建立索引，统计和最近记录直接用查询完成，不需要加载全部记录
+"""
+
+import atexit
+import json
+import os
+import queue
+import sqlite3
+import tempfile
+import threading
+import zlib
+from collections import deque
+from contextlib import contextmanager
+from config import *
+
+try:
+    import fcntl  # 多个进程同时追加或迁移时加文件锁（Windows上没有，只依赖追加写入）
+except ImportError:
+    fcntl = None
+
+# SQLite后端的列（其余字段以JSON保存在extra列）
+GAME_COLUMNS_XZH = ("mode", "score", "level", "duration", "hit_rate", "bricks_hit",
+                    "lives_remaining", "timestamp", "won")
+INSERT_GAME_SQL_XZH = (f"INSERT INTO games ({', '.join(GAME_COLUMNS_XZH)}, extra) "
+                       f"VALUES ({', '.join('?' * (len(GAME_COLUMNS_XZH) + 1))})")
+
+
+def write_file_atomic_xzh(path, data, mode=0o644):
+    """
+    原子地写入文件：先写到同目录下独占的临时文件并fsync，再改名覆盖目标
+    中途崩溃只会留下临时文件，目标文件要么是旧内容要么是完整的新内容
+    :param path: 目标文件路径
+    :param data: 文件内容（bytes）
+    :param mode: 文件权限（mkstemp创建的临时文件只允许所有者读写）
+    """
+    directory, name = os.path.split(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=name + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def summarize_records_xzh(records):
+    """
+    遍历一次记录计算汇总统计
+    :param records: 游戏数据字典的可迭代对象
+    :return: 汇总字典（格式见JsonlStore_xzh.summarize_xzh）
+    """
+    summary = {"games": 0, "total_score": 0, "max_score": 0, "wins": 0, "avg_hit_rate": 0.0, "modes": {}}
+    hit_rate_sum = 0.0
+    for record in records:
+        summary["games"] += 1
+        summary["total_score"] += record['score']
+        summary["max_score"] = max(summary["max_score"], record['score'])
+        summary["wins"] += 1 if record.get('won', False) else 0
+        hit_rate_sum += record['hit_rate']
+        mode = summary["modes"].setdefault(record['mode'], {"games": 0, "avg_score": 0.0, "avg_hit_rate": 0.0})
+        mode["games"] += 1
+        mode["avg_score"] += record['score']
+        mode["avg_hit_rate"] += record['hit_rate']
+
+    if summary["games"]:
+        summary["avg_hit_rate"] = hit_rate_sum / summary["games"]
+    for mode in summary["modes"].values():
+        mode["avg_score"] /= mode["games"]
+        mode["avg_hit_rate"] /= mode["games"]
+    return summary
+
+
+class JsonlStore_xzh:
+    """只追加的JSONL游戏记录文件"""
+
+    def __init__(self, path=HISTORY_FILE_PATH_XZH):
+        """
+        初始化存储
+        :param path: JSONL文件路径
+        """
+        self.path = path
+        self.lock_path = path + ".lock"  # 锁文件（数据文件在迁移时会被整体替换，不能直接锁它）
+
+    @contextmanager
+    def lock_xzh(self):
+        """持有文件锁期间其他进程不能追加或迁移（没有fcntl时不加锁）"""
+        with open(self.lock_path, 'ab') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX)  # 关闭文件时自动释放
+            yield
+
+    def append_xzh(self, record):
+        """
+        追加一条记录
+        :param record: 游戏数据字典
+        :return: 同append_many_xzh
+        """
+        return self.append_many_xzh((record,))
+
+    def version_xzh(self):
+        """
+        文件版本（内容变化时一定改变）：(inode, 大小, 修改时间)
+        :return: 元组；文件不存在时为None
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    def append_many_xzh(self, records):
+        """
+        批量追加记录：所有行拼成一次write写入后fsync
+        :param records: 游戏数据字典的可迭代对象
+        :return: (写入前的文件版本, 写入后的文件版本, 写入后的读取位置)，版本都在文件锁内取得；
+                 没有文件锁时其他进程可能同时写入，返回None
+        """
+        data = b"".join(json.dumps(record, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b"\n"
+                        for record in records)
+        with self.lock_xzh(), open(self.path, 'ab+') as f:
+            # 上次写入中途崩溃留下的半行没有换行符，先补上，避免和新记录粘在一起
+            before = self.version_xzh()
+            f.seek(0, os.SEEK_END)
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    data = b"\n" + data
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+            after = self.version_xzh()
+            position = f.tell()
+        return (before, after, position) if fcntl is not None else None
+
+    def fingerprint_xzh(self, position):
+        """
+        文件内容指纹：inode加上开头一段和position之前最后一段内容的CRC32
+        文件被替换或改写（即使大小不变或变大）时改变，只在末尾追加时不变
+        :param position: 已读到的字节位置
+        :return: 列表（可保存为JSON）；文件不存在时为None
+        """
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            return None
+        with f:
+            head = f.read(min(position, FINGERPRINT_BLOCK_XZH))
+            start = max(position - FINGERPRINT_BLOCK_XZH, 0)
+            f.seek(start)
+            tail = f.read(position - start)
+            return [os.fstat(f.fileno()).st_ino, zlib.crc32(head), zlib.crc32(tail)]
+
+    def iter_xzh(self):
+        """
+        逐行读取记录（跳过空行和损坏的行）
+        :return: 游戏数据字典的生成器
+        """
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            return
+        with f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    print(f"跳过损坏的记录: {self.path} 第 {line_number} 行")
+
+    def load_xzh(self):
+        """
+        读取全部记录
+        :return: 游戏数据列表（按保存顺序）
+        """
+        return list(self.iter_xzh())
+
+    def read_from_xzh(self, position=0):
+        """
+        读取指定字节位置之后新增的完整记录（用于增量刷新，末尾没有换行的半行留到下次）
+        :param position: 上次读到的字节位置
+        :return: (记录列表, 新的位置)；文件比position短（被替换或截断）时返回None
+        """
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            size = 0
+        if size < position:
+            return None
+        if size == position:
+            return [], position
+
+        with open(self.path, 'rb') as f:
+            f.seek(position)
+            data = f.read()
+        end = data.rfind(b"\n") + 1
+        records = []
+        for line in data[:end].splitlines():
+            if line.strip():
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    pass
+        return records, position + end
+
+    def summarize_xzh(self):
+        """
+        汇总统计（流式读取一遍文件）
+        :return: {"games", "total_score", "max_score", "wins", "avg_hit_rate",
+                  "modes": 模式 -> {"games", "avg_score", "avg_hit_rate"}}
+        """
+        return summarize_records_xzh(self.iter_xzh())
+
+    def recent_xzh(self, count):
+        """
+        最近的若干局：从文件末尾向前按块读取，只解析最后count行
+        :param count: 局数
+        :return: 游戏数据列表（按保存顺序，最新的在最后）
+        """
+        if count <= 0:
+            return []
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            return []
+        with f:
+            end = f.seek(0, os.SEEK_END)
+            data = b""
+            # 多读一行：第一行可能不完整；损坏的行会被跳过，再多留一些余量
+            while end > 0 and data.count(b"\n") <= count * 2:
+                start = max(end - RECENT_READ_BLOCK_XZH, 0)
+                f.seek(start)
+                data = f.read(end - start) + data
+                end = start
+        lines = data.splitlines()
+        if end > 0:
+            lines = lines[1:]
+        records = deque(maxlen=count)
+        for line in lines:
+            if line.strip():
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    pass
+        return list(records)
+
+
+class SqliteStore_xzh:
+    """
+    SQLite游戏记录库
+    常用字段各占一列，模式、时间和得分带索引；记录中的其他字段（如回放路径）以JSON保存在extra列
+    """
+
+    def __init__(self, path=HISTORY_DB_PATH_XZH):
+        """
+        打开（必要时创建）数据库
+        :param path: 数据库文件路径
+        """
+        self.path = path
+        self.created = not os.path.exists(path)  # 是否是新建的数据库（需要导入已有记录）
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS games ("
+                "id INTEGER PRIMARY KEY, mode TEXT NOT NULL, score INTEGER NOT NULL, level INTEGER, "
+                "duration REAL, hit_rate REAL NOT NULL, bricks_hit INTEGER, lives_remaining INTEGER, "
+                "timestamp TEXT, won INTEGER NOT NULL DEFAULT 0, extra TEXT)")
+            # 按模式的覆盖索引：汇总统计只扫描索引，不读表
+            self.connection.execute("CREATE INDEX IF NOT EXISTS games_mode ON games (mode, score, hit_rate, won)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS games_timestamp ON games (timestamp)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS games_score ON games (score)")
+
+    @staticmethod
+    def to_row_xzh(record):
+        """
+        把游戏数据字典转换为一行
+        :param record: 游戏数据字典
+        :return: 与GAME_COLUMNS_XZH顺序一致的值加extra列
+        """
+        extra = {key: value for key, value in record.items() if key not in GAME_COLUMNS_XZH}
+        values = [record.get(column) for column in GAME_COLUMNS_XZH]
+        values[GAME_COLUMNS_XZH.index("won")] = 1 if record.get('won', False) else 0
+        return (*values, json.dumps(extra, ensure_ascii=False) if extra else None)
+
+    @staticmethod
+    def to_record_xzh(row):
+        """
+        把一行转换回游戏数据字典（没有保存的字段不出现在字典中）
+        :param row: SELECT {GAME_COLUMNS_XZH}, extra 的结果行
+        :return: 游戏数据字典
+        """
+        record = {column: value for column, value in zip(GAME_COLUMNS_XZH, row) if value is not None}
+        record['won'] = bool(record.get('won', 0))
+        if row[-1]:
+            record.update(json.loads(row[-1]))
+        return record
+
+    def append_xzh(self, record):
+        """
+        追加一条记录（单独一个事务）
+        :param record: 游戏数据字典
+        :return: 同append_many_xzh
+        """
+        return self.append_many_xzh((record,))
+
+    def append_many_xzh(self, records):
+        """
+        批量追加记录（一个事务）
+        事务开始时取得写锁，写入前的版本不会被其他连接改变；提交后用data_version确认
+        取得写入后的版本之前没有其他连接提交
+        :param records: 游戏数据字典的可迭代对象
+        :return: (写入前的版本, 写入后的版本, 写入后的最大主键)；无法确定写入后的版本时返回None
+        """
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            before = self.version_xzh()
+            self.connection.executemany(INSERT_GAME_SQL_XZH, (self.to_row_xzh(record) for record in records))
+            position = self.connection.execute("SELECT COALESCE(MAX(id), 0) FROM games").fetchone()[0]
+            data_version = self.connection.execute("PRAGMA data_version").fetchone()[0]
+            self.connection.commit()
+        except BaseException:
+            self.connection.rollback()
+            raise
+        after = self.version_xzh()
+        if self.connection.execute("PRAGMA data_version").fetchone()[0] != data_version:
+            return None  # 其他连接在本次提交之后已经写入
+        return before, after, position
+
+    def import_xzh(self, records):
+        """
+        在一个事务中批量写入记录
+        :param records: 游戏数据字典的可迭代对象
+        """
+        with self.connection:
+            self.connection.executemany(INSERT_GAME_SQL_XZH, (self.to_row_xzh(record) for record in records))
+
+    def iter_xzh(self):
+        """
+        按保存顺序读取全部记录
+        :return: 游戏数据字典的生成器
+        """
+        cursor = self.connection.execute(f"SELECT {', '.join(GAME_COLUMNS_XZH)}, extra FROM games ORDER BY id")
+        for row in cursor:
+            yield self.to_record_xzh(row)
+
+    def version_xzh(self):
+        """
+        数据库版本：数据库文件和WAL文件的大小与修改时间（任何提交都会改变）
+        :return: 元组
+        """
+        version = []
+        for path in (self.path, self.path + "-wal"):
+            try:
+                stat = os.stat(path)
+                version += [stat.st_size, stat.st_mtime_ns]
+            except FileNotFoundError:
+                version += [None, None]
+        return tuple(version)
+
+    def fingerprint_xzh(self, position):
+        """
+        数据库内容指纹：数据库文件的inode加上第一条和主键为position的记录的CRC32
+        数据库被替换或记录被改写时改变
+        :param position: 已读到的最大主键
+        :return: 列表（可保存为JSON）
+        """
+        rows = self.connection.execute(
+            f"SELECT id, {', '.join(GAME_COLUMNS_XZH)}, extra FROM games "
+            f"WHERE id IN ((SELECT MIN(id) FROM games), ?) ORDER BY id", (position,)).fetchall()
+        return [os.stat(self.path).st_ino, zlib.crc32(json.dumps(rows).encode('utf-8'))]
+
+    def load_xzh(self):
+        """
+        读取全部记录（兼容列表接口）
+        :return: 游戏数据列表（按保存顺序）
+        """
+        return list(self.iter_xzh())
+
+    def read_from_xzh(self, position=0):
+        """
+        读取主键大于position的新增记录（用于增量刷新）
+        :param position: 上次读到的最大主键
+        :return: (记录列表, 新的最大主键)；数据库中的最大主键比position小（被替换）时返回None
+        """
+        max_id = self.connection.execute("SELECT COALESCE(MAX(id), 0) FROM games").fetchone()[0]
+        if max_id < position:
+            return None
+        rows = self.connection.execute(
+            f"SELECT {', '.join(GAME_COLUMNS_XZH)}, extra FROM games WHERE id > ? AND id <= ? ORDER BY id",
+            (position, max_id)).fetchall()
+        return [self.to_record_xzh(row) for row in rows], max_id
+
+    def summarize_xzh(self):
+        """
+        用一次按模式分组的聚合查询汇总统计（只扫描覆盖索引），格式与JsonlStore_xzh.summarize_xzh相同
+        :return: 汇总字典
+        """
+        summary = {"games": 0, "total_score": 0, "max_score": 0, "wins": 0, "avg_hit_rate": 0.0, "modes": {}}
+        hit_rate_sum = 0.0
+        for mode, count, score_sum, max_score, wins, mode_hit_rate_sum in self.connection.execute(
+                "SELECT mode, COUNT(*), SUM(score), MAX(score), SUM(won), SUM(hit_rate) FROM games GROUP BY mode"):
+            summary["games"] += count
+            summary["total_score"] += score_sum
+            summary["max_score"] = max(summary["max_score"], max_score)
+            summary["wins"] += wins
+            hit_rate_sum += mode_hit_rate_sum
+            summary["modes"][mode] = {"games": count, "avg_score": score_sum / count,
+                                      "avg_hit_rate": mode_hit_rate_sum / count}
+        if summary["games"]:
+            summary["avg_hit_rate"] = hit_rate_sum / summary["games"]
+        return summary
+
+    def recent_xzh(self, count):
+        """
+        最近的若干局（按主键倒序只取count行）
+        :param count: 局数
+        :return: 游戏数据列表（按保存顺序，最新的在最后）
+        """
+        rows = self.connection.execute(
+            f"SELECT {', '.join(GAME_COLUMNS_XZH)}, extra FROM games ORDER BY id DESC LIMIT ?", (count,)).fetchall()
+        return [self.to_record_xzh(row) for row in reversed(rows)]
+
+
+def migrate_legacy_data_xzh(store, legacy_path=DATA_FILE_PATH_XZH):
+    """
+    一次性把旧版data.json中的记录迁移到JSONL文件
+    JSONL文件已存在时不做任何事；迁移持有与追加相同的文件锁，多个进程同时启动时只有一个会迁移；
+    先写到独占的临时文件再改名，中途失败不会留下半个文件；旧文件保留不动，作为备份
+    :param store: JsonlStore_xzh对象
+    :param legacy_path: 旧版JSON文件路径
+    :return: 迁移的记录数
+    """
+    if os.path.exists(store.path) or not os.path.exists(legacy_path):
+        return 0
+
+    with store.lock_xzh():
+        if os.path.exists(store.path):
+            return 0  # 其他进程已经迁移（或开始追加）
+        with open(legacy_path, 'r', encoding='utf-8') as f:
+            games = json.load(f).get("games", [])
+        data = b"".join(json.dumps(game_data, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b"\n"
+                        for game_data in games)
+        write_file_atomic_xzh(store.path, data, os.stat(legacy_path).st_mode & 0o777)  # 沿用旧文件的权限
+    print(f"已将 {legacy_path} 中的 {len(games)} 局记录迁移到 {store.path}")
+    return len(games)
+
+
+class HistoryCache_xzh:
+    """
+    进程内的游戏历史缓存，菜单中的统计界面和分析报告共用
+    缓存一个列式缓存对象（columnar.HistoryColumns_xzh），以存储的版本（文件大小、修改时间等）判断是否失效：
+    版本未变时直接返回，不读取存储；版本变化时增量刷新，只解析新增的记录；
+    本进程追加记录时，若写入前的版本与缓存一致，直接把新记录追加到列中，下次读取无需解析
+    """
+
+    def __init__(self, directory=COLUMN_CACHE_DIR_XZH):
+        """
+        初始化空缓存
+        :param directory: 列式缓存目录
+        """
+        self.lock = threading.Lock()  # 后台保存线程也会更新缓存
+        self.directory = directory
+        self.path = None  # 缓存对应的存储路径（绝对路径）
+        self.version = None  # 缓存对应的存储版本（None表示需要增量刷新）
+        self.columns = None  # HistoryColumns_xzh对象
+        self.hits = 0  # 命中次数
+        self.misses = 0  # 未命中（增量刷新或重建）次数
+        self.updates = 0  # 保存时原地追加的次数
+        self.parsed = 0  # 刷新时从存储解析的记录数
+
+    def load_columns_xzh(self, store):
+        """
+        读取游戏历史：版本未变时直接返回缓存
+        :param store: 存储对象
+        :return: HistoryColumns_xzh对象（缓存的副本，之后追加的记录不影响它）
+        """
+        path = os.path.abspath(store.path)
+        with self.lock:
+            version = store.version_xzh()  # 在刷新之前取得，刷新期间的写入会在下次读取时发现
+            if self.columns is not None and self.path == path and self.version == version:
+                self.hits += 1
+            else:
+                self.misses += 1
+                if self.columns is None or self.path != path:
+                    from columnar import HistoryColumns_xzh  # columnar依赖本模块，在这里延迟导入
+                    self.columns = HistoryColumns_xzh(self.directory)
+                    self.path = path
+                self.parsed += self.columns.refresh_xzh(store)
+                self.version = version
+            return self.columns.copy_xzh()
+
+    def record_appended_xzh(self, store, records, appended):
+        """
+        本进程追加记录后更新缓存
+        :param store: 存储对象
+        :param records: 追加的记录
+        :param appended: append_many_xzh的返回值（写入前后的版本和写入后的读取位置，无法确定时为None）
+        """
+        with self.lock:
+            if self.columns is None or self.path != os.path.abspath(store.path):
+                return
+            if appended is None or self.version != appended[0]:
+                self.version = None  # 有其他写入，下次读取时增量刷新
+                return
+            before, after, position = appended
+            try:
+                self.columns.append_xzh(list(records), position, store.fingerprint_xzh(position))
+            except Exception as e:
+                print(f"更新历史缓存错误: {e}")
+                self.columns = None  # 下次读取时重新打开
+                return
+            self.version = after
+            self.updates += 1
+
+    def get_stats_xzh(self):
+        """
+        缓存统计
+        :return: {"hits", "misses", "updates", "parsed", "records"}
+        """
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses, "updates": self.updates, "parsed": self.parsed,
+                    "records": 0 if self.columns is None else len(self.columns)}
+
+
+history_cache_xzh = HistoryCache_xzh()  # 全进程共用的历史缓存
+
+
+_stores_xzh = threading.local()  # 每个线程各自的 后端名 -> 已打开的存储对象（SQLite连接不能跨线程使用）
+_save_writer_xzh = None  # 后台保存线程（第一次异步保存时启动）
+
+
+def open_store_xzh(backend=STORAGE_BACKEND_XZH):
+    """
+    新建一个存储对象（首次使用时迁移旧数据：data.json -> JSONL文件 -> SQLite数据库）
+    SQLite连接只能在创建它的线程中使用，后台保存线程用它打开自己的存储
+    :param backend: "jsonl" 或 "sqlite"
+    :return: JsonlStore_xzh或SqliteStore_xzh对象
+    """
+    jsonl_store = JsonlStore_xzh(HISTORY_FILE_PATH_XZH)
+    migrate_legacy_data_xzh(jsonl_store)
+    if backend == "jsonl":
+        store = jsonl_store
+    elif backend == "sqlite":
+        store = SqliteStore_xzh(HISTORY_DB_PATH_XZH)
+        if store.created:
+            store.import_xzh(jsonl_store.iter_xzh())
+    else:
+        raise ValueError(f"未知的存储后端: {backend}")
+    return store
+
+
+def get_store_xzh(backend=STORAGE_BACKEND_XZH):
+    """
+    获取当前线程的游戏记录存储（每个线程各自打开一次，之后复用）
+    不等待后台保存队列；需要读到刚结束的对局时先调用flush_pending_saves_xzh
+    :param backend: "jsonl" 或 "sqlite"
+    :return: JsonlStore_xzh或SqliteStore_xzh对象
+    """
+    stores = getattr(_stores_xzh, "stores", None)
+    if stores is None:
+        stores = _stores_xzh.stores = {}
+    store = stores.get(backend)
+    if store is None:
+        store = stores[backend] = open_store_xzh(backend)
+    return store
+
+
+class SaveWriter_xzh:
+    """
+    后台保存线程
+    保存请求放进有界队列后立即返回；线程把积压的多条记录合并为一次提交
+    （JSONL为一次追加加fsync，SQLite为一个事务），提交要么完整写入要么不写入；
+    文件写入请求（如回放）按顺序原子地写入，先于同一批次中的记录，记录引用的文件一定已经存在
+    """
+
+    def __init__(self, backend=STORAGE_BACKEND_XZH, maxsize=SAVE_QUEUE_SIZE_XZH, batch_size=SAVE_BATCH_SIZE_XZH):
+        """
+        启动后台保存线程
+        :param backend: 存储后端
+        :param maxsize: 队列最大长度
+        :param batch_size: 每次提交的最大记录数
+        """
+        self.backend = backend
+        self.queue = queue.Queue(maxsize)
+        self.batch_size = batch_size
+        self.saved = 0  # 已写入的记录数
+        self.commits = 0  # 提交次数
+        self.failed = 0  # 写入失败的记录数
+        self.files = 0  # 已写入的文件数
+        self.thread = threading.Thread(target=self.run_xzh, name="save-writer", daemon=True)
+        self.thread.start()
+
+    def put_xzh(self, record):
+        """
+        提交一条保存请求（队列满时等待）
+        :param record: 游戏数据字典
+        """
+        self.queue.put(record)
+
+    def put_file_xzh(self, path, data):
+        """
+        提交一个文件写入请求（队列满时等待）
+        :param path: 文件路径
+        :param data: 文件内容（bytes）
+        """
+        self.queue.put((path, data))
+
+    def run_xzh(self):
+        """线程主循环：取出积压的请求，先写文件再批量提交记录；收到None时写完当前批次后退出"""
+        try:
+            store = open_store_xzh(self.backend)
+        except Exception as e:
+            print(f"打开游戏数据存储错误: {e}")
+            store = None
+
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            records = []
+            for item in batch:
+                if isinstance(item, tuple):
+                    try:
+                        write_file_atomic_xzh(*item)
+                        self.files += 1
+                    except Exception as e:
+                        print(f"写入文件错误: {item[0]}: {e}")
+                elif item is not None:
+                    records.append(item)
+
+            if records:
+                try:
+                    if store is None:
+                        raise RuntimeError("存储不可用")
+                    appended = store.append_many_xzh(records)
+                    history_cache_xzh.record_appended_xzh(store, records, appended)
+                    self.saved += len(records)
+                    self.commits += 1
+                except Exception as e:
+                    self.failed += len(records)
+                    print(f"保存游戏数据错误: {e}")
+            for _ in batch:
+                self.queue.task_done()
+            if any(item is None for item in batch):
+                return
+
+    def flush_xzh(self):
+        """等待队列中的记录全部写完（队列已空时直接返回）"""
+        if self.queue.unfinished_tasks:
+            self.queue.join()
+
+    def close_xzh(self):
+        """写完队列中的记录并结束线程"""
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+
+
+def get_save_writer_xzh():
+    """
+    获取后台保存线程（第一次调用时启动，程序退出前写完队列）
+    :return: SaveWriter_xzh对象
+    """
+    global _save_writer_xzh
+    if _save_writer_xzh is None:
+        _save_writer_xzh = SaveWriter_xzh()
+        atexit.register(_save_writer_xzh.close_xzh)
+    return _save_writer_xzh
+
+
+def save_game_data_async_xzh(game_data):
+    """
+    在后台保存一局游戏数据（立即返回，程序退出前会写完）
+    :param game_data: 游戏数据字典
+    """
+    get_save_writer_xzh().put_xzh(game_data)
+
+
+def save_file_async_xzh(path, data):
+    """
+    在后台原子地写入一个文件（立即返回，程序退出前会写完）
+    :param path: 文件路径
+    :param data: 文件内容（bytes）
+    """
+    get_save_writer_xzh().put_file_xzh(path, data)
+
+
+def get_history_cache_stats_xzh():
+    """
+    历史缓存的命中统计
+    :return: {"hits", "misses", "updates", "parsed", "records"}
+    """
+    return history_cache_xzh.get_stats_xzh()
+
+
+def flush_pending_saves_xzh():
+    """等待后台保存队列写完（没有启动后台保存时直接返回）"""
+    if _save_writer_xzh is not None:
+        _save_writer_xzh.flush_xzh()
+
+
+def save_game_data_xzh(game_data):
+    """
+    保存一局游戏数据（追加到历史记录文件）
+    :param game_data: 游戏数据字典
+    """
+    try:
+        store = get_store_xzh()
+        appended = store.append_xzh(game_data)
+        history_cache_xzh.record_appended_xzh(store, (game_data,), appended)
+        print(f"游戏数据已保存到 {store.path}")
+
+    except Exception as e:
+        print(f"保存游戏数据错误: {e}")
+
+
+def load_game_data_xzh():
+    """
+    加载全部游戏数据（完整的记录，直接从存储读取；统计和报告使用load_game_summary_xzh和列式缓存）
+    :return: 游戏数据列表
+    """
+    try:
+        flush_pending_saves_xzh()  # 读到刚结束、仍在后台保存的对局
+        store = get_store_xzh()
+        if not os.path.exists(store.path):
+            print("数据文件不存在，返回空列表")
+            return []
+        return store.load_xzh()
+    except Exception as e:
+        print(f"加载游戏数据错误: {e}")
+        return []
+
+
+def load_game_summary_xzh(recent=5):
+    """
+    加载汇总统计和最近几局，不解析全部记录
+    汇总通过进程内的历史缓存用列数组计算（存储未变时不读取存储，变化时只解析新增的记录）；
+    最近几局从存储末尾读取原始记录，包含回放路径等全部字段
+    :param recent: 最近记录的局数
+    :return: (汇总字典, 最近若干局的列表)
+    """
+    try:
+        flush_pending_saves_xzh()
+        store = get_store_xzh()
+        return history_cache_xzh.load_columns_xzh(store).summarize_xzh(), store.recent_xzh(recent)
+    except Exception as e:
+        print(f"加载游戏数据错误: {e}")
+        return summarize_records_xzh(()), []
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""测试和基准脚本共用的模拟辅助函数"""
+
+from config import *
+from simulation import GameCore_xzh, INPUT_LEFT_XZH, INPUT_RIGHT_XZH, INPUT_LAUNCH_XZH
+
+
+def tracking_inputs_xzh(game, rng):
+    """
+    验证用的简单输入：挡板追随主球，偶尔随机按键
+    :param game: GameCore_xzh对象
+    :param rng: 随机数生成器
+    :return: 输入位掩码
+    """
+    if rng.random() < 0.2:
+        return rng.randrange(8)
+    center = game.paddle.x + game.paddle.width / 2
+    inputs = INPUT_LAUNCH_XZH
+    if game.ball.x < center - 10:
+        inputs |= INPUT_LEFT_XZH
+    elif game.ball.x > center + 10:
+        inputs |= INPUT_RIGHT_XZH
+    return inputs
+
+
+class SingleBallCore_xzh(GameCore_xzh):
+    """不分裂新球的多球模式（走多球的批量碰撞路径，但场上始终只有一个球）"""
+
+    def spawn_balls_xzh(self, origin):
+        pass
+
+
+class SequentialMultiballCore_xzh(GameCore_xzh):
+    """多球模式的逐球参考实现：按球的顺序逐个移动并检测碰撞，用于核对批量路径"""
+
+    def update_balls_batched_xzh(self):
+        balls = [ball for ball in self.balls if ball.active]
+        if not balls:
+            return
+        hit_total_before = self.total_bricks_hit
+        for ball in balls:
+            ball.move_xzh()
+            ball.bounce_wall_xzh()
+            if ball.bounce_paddle_xzh(self.paddle):
+                self.bricks_missed += 1
+                self.total_bricks_missed += 1
+            result = self.find_brick_hit_xzh(ball.get_bounds_xzh())
+            if result is not None:
+                index, brick_bounds = result
+                self.hit_brick_xzh(self.bricks[index])
+                self.calculate_bounce_xzh(brick_bounds, ball)
+
+        trigger = MULTIBALL_TRIGGER_HITS_XZH
+        if hit_total_before // trigger != self.total_bricks_hit // trigger:
+            self.spawn_balls_xzh(self.ball if self.ball.active else balls[0])
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""批量模拟器测试：与标量核心逐帧一致，难度参数可以逐局扫描"""
+
+import numpy as np
+import pytest
+from config import *
+from simulation import GameCore_xzh
+from batch_simulation import BatchSimulator_xzh
+
+
+def verify_against_scalar_xzh(num_games=16, ticks=6000, mode=MODE_CLASSIC_XZH, seed=0, difficulty=None):
+    """
+    一致性检查：批量模拟器与GameCore_xzh在相同种子、难度参数和输入下逐帧比较全部状态
+    :param num_games: 游戏局数
+    :param ticks: 模拟帧数
+    :param mode: 游戏模式
+    :param seed: 起始种子
+    :param difficulty: 难度参数（同BatchSimulator_xzh，每局的标量核心使用对应的一组参数）
+    :return: 一致时返回True，不一致时抛出AssertionError并给出首个差异
+    """
+    seeds = list(range(seed, seed + num_games))
+    batch = BatchSimulator_xzh(num_games, mode, seeds, difficulty)
+    games = [GameCore_xzh(mode, seed=s,
+                          difficulty={name: values[i].item() for name, values in batch.difficulty.items()})
+             for i, s in enumerate(seeds)]
+    noise = np.random.default_rng(seed)
+    # 每局的扰动概率不同，既有通关/换关的局，也有掉球直至失败的局
+    jitter_rate = np.linspace(0.05, 0.7, num_games)
+
+    for tick in range(ticks):
+        # 跟球策略加随机扰动，让掉球、换关和难度调整都被覆盖
+        inputs = batch.tracking_inputs_xzh()
+        jitter = noise.random(num_games) < jitter_rate
+        inputs[jitter] ^= noise.integers(1, 4, size=int(jitter.sum()))
+        batch.step_xzh(inputs)
+        for i, game in enumerate(games):
+            game.step_xzh(int(inputs[i]))
+            expected = (game.ball.x, game.ball.y, game.ball.dx, game.ball.dy, game.ball.active,
+                        game.paddle.x, game.paddle.width, game.paddle.speed,
+                        game.score, game.lives, game.level, game.game_over, game.game_won,
+                        game.bricks_hit, game.bricks_missed, game.brick_grid.remaining)
+            actual = (batch.ball_x[i], batch.ball_y[i], batch.ball_dx[i], batch.ball_dy[i], batch.ball_active[i],
+                      batch.paddle_x[i], batch.paddle_width[i], batch.paddle_speed[i],
+                      batch.score[i], batch.lives[i], batch.level[i], batch.game_over[i], batch.game_won[i],
+                      batch.bricks_hit[i], batch.bricks_missed[i], batch.remaining[i])
+            if expected != tuple(v.item() for v in actual):
+                raise AssertionError(f"第{i}局在第{tick}帧不一致:\n标量: {expected}\n批量: {actual}")
+            visible = [brick.visible for brick in game.bricks]
+            if visible != batch.visible[i].tolist():
+                raise AssertionError(f"第{i}局在第{tick}帧砖块可见性不一致")
+    return True
+
+
+@pytest.mark.parametrize("mode", [MODE_CLASSIC_XZH, MODE_CHALLENGE_XZH])
+def test_batch_matches_scalar_xzh(mode):
+    """默认难度参数下批量模拟与GameCore_xzh逐帧一致"""
+    assert verify_against_scalar_xzh(mode=mode)
+
+
+@pytest.mark.parametrize("mode", [MODE_CLASSIC_XZH, MODE_CHALLENGE_XZH])
+def test_batch_matches_scalar_with_per_game_difficulty_xzh(mode):
+    """每局使用不同难度参数时，批量模拟与使用同一组参数的标量核心逐帧一致"""
+    num_games = 16
+    difficulty = {
+        "check_interval": np.arange(num_games) % 4 + 1,
+        "hit_rate_threshold": np.linspace(0.0, 0.9, num_games),
+        "width_adjustment": 15,
+    }
+    assert verify_against_scalar_xzh(num_games=num_games, mode=mode, difficulty=difficulty)
+
+
+def run_sweep_xzh(difficulty, num_games=256, ticks=6000):
+    """
+    用跟球策略加随机扰动把一批游戏跑完
+    :param difficulty: 难度参数
+    :param num_games: 游戏局数
+    :param ticks: 最多模拟的帧数
+    :return: get_results_xzh的结果
+    """
+    batch = BatchSimulator_xzh(num_games, MODE_CLASSIC_XZH, difficulty=difficulty)
+    noise = np.random.default_rng(0)
+    for _ in range(ticks):
+        inputs = batch.tracking_inputs_xzh()
+        jitter = noise.random(num_games) < 0.3
+        inputs[jitter] ^= noise.integers(1, 4, size=int(jitter.sum()))
+        if batch.step_xzh(inputs).all():
+            break
+    return batch.get_results_xzh()
+
+
+def test_difficulty_sweep_changes_outcomes_xzh():
+    """同样的种子和输入策略下，难度参数不同时对局结果的分布不同"""
+    easy = run_sweep_xzh({"width_adjustment": 0, "speed_adjustment": 0})
+    hard = run_sweep_xzh({"check_interval": 1, "hit_rate_threshold": 0.0, "width_adjustment": 40})
+
+    assert not np.array_equal(easy["score"], hard["score"])
+    assert easy["score"].mean() > hard["score"].mean()
+    assert easy["lives_remaining"].mean() > hard["lives_remaining"].mean()
+
+
+def test_unknown_difficulty_parameter_xzh():
+    """未知参数名和数量不对的数组会被拒绝"""
+    with pytest.raises(ValueError):
+        BatchSimulator_xzh(4, difficulty={"ball_speed": 3})
+    with pytest.raises(ValueError):
+        BatchSimulator_xzh(4, difficulty={"check_interval": [1, 2]})
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""列式缓存测试：汇总统计和最近记录与逐条解析的结果一致，增量刷新与重建一致，数据源被替换时重建"""
+
+import json
+import os
+import random
+from collections import deque
+import numpy as np
+import pytest
+from config import *
+from storage import JsonlStore_xzh, SqliteStore_xzh, summarize_records_xzh
+from columnar import COLUMN_DTYPES_XZH, HistoryColumns_xzh, format_timestamp_xzh, parse_timestamp_xzh
+
+
+@pytest.fixture
+def store_xzh(tmp_path):
+    """写好500局记录（含额外字段和末尾半行）的JSONL存储"""
+    rng = random.Random(0)
+    store = JsonlStore_xzh(str(tmp_path / "games.jsonl"))
+    with open(store.path, 'wb') as f:
+        for index in range(500):
+            record = {"mode": (MODE_CLASSIC_XZH, MODE_CHALLENGE_XZH)[index % 3 == 0], "score": rng.randrange(1000),
+                      "level": 1 + index % 4, "duration": rng.uniform(10, 300), "hit_rate": rng.random(),
+                      "bricks_hit": index % 50, "lives_remaining": index % 3,
+                      "timestamp": f"2025-12-{1 + index % 28:02d} 12:{index % 60:02d}:07", "won": index % 7 == 0,
+                      "replay": f"replays/{index}.brr"}
+            f.write(json.dumps(record).encode('utf-8') + b"\n")
+        f.write(b'{"mode":"cla')
+    return store
+
+
+def test_summary_matches_records_xzh(store_xzh, tmp_path):
+    """列数组计算的汇总统计与逐条遍历记录的结果一致"""
+    history = HistoryColumns_xzh(str(tmp_path / "columns"))
+    history.refresh_xzh(store_xzh)
+    expected = summarize_records_xzh(store_xzh.iter_xzh())
+    summary = history.summarize_xzh()
+
+    assert {key: summary[key] for key in ("games", "total_score", "max_score", "wins")} == \
+           {key: expected[key] for key in ("games", "total_score", "max_score", "wins")}
+    assert summary["avg_hit_rate"] == pytest.approx(expected["avg_hit_rate"])
+    assert summary["modes"].keys() == expected["modes"].keys()
+    for mode, stats in expected["modes"].items():
+        assert summary["modes"][mode]["games"] == stats["games"]
+        assert summary["modes"][mode]["avg_score"] == pytest.approx(stats["avg_score"])
+        assert summary["modes"][mode]["avg_hit_rate"] == pytest.approx(stats["avg_hit_rate"])
+
+
+def test_recent_rows_match_records_xzh(store_xzh, tmp_path):
+    """最近记录从列中还原，字段值与原始记录一致（列中没有的字段除外）"""
+    history = HistoryColumns_xzh(str(tmp_path / "columns"))
+    history.refresh_xzh(store_xzh)
+    expected = list(deque(store_xzh.iter_xzh(), maxlen=5))
+    recent = history.recent_xzh(5)
+    assert [{key: value for key, value in record.items() if key != "replay"} for record in expected] == recent
+    assert history.recent_xzh(0) == []
+
+
+@pytest.mark.parametrize("count", [1, 5, 120, 1000])
+def test_jsonl_recent_reads_tail_xzh(store_xzh, count):
+    """从文件末尾读取的最近记录与完整遍历的结果一致（跳过末尾的半行）"""
+    assert store_xzh.recent_xzh(count) == list(deque(store_xzh.iter_xzh(), maxlen=count))
+
+
+def assert_same_columns_xzh(history, expected):
+    """两个列式缓存的各列和模式表相同"""
+    assert history.modes == expected.modes
+    for name in COLUMN_DTYPES_XZH:
+        assert np.array_equal(history[name], expected[name], equal_nan=True), name
+
+
+def test_incremental_refresh_matches_rebuild_xzh(store_xzh, tmp_path):
+    """追加后重新打开缓存只读取新增的记录，结果与从头重建相同，不留下临时文件"""
+    history = HistoryColumns_xzh(str(tmp_path / "columns"))
+    history.refresh_xzh(store_xzh)
+    for index in range(3):
+        store_xzh.append_xzh({"mode": "新模式", "score": 5000 + index, "hit_rate": 1.0,
+                              "timestamp": "2026-03-29 02:30:00", "won": True})
+
+    reopened = HistoryColumns_xzh(str(tmp_path / "columns"))
+    assert reopened.refresh_xzh(store_xzh) == 3
+    assert len(reopened) == 503
+    rebuilt = HistoryColumns_xzh(str(tmp_path / "rebuilt"))
+    rebuilt.refresh_xzh(store_xzh)
+    assert_same_columns_xzh(reopened, rebuilt)
+    assert [record['score'] for record in store_xzh.iter_xzh()] == reopened["score"].tolist()
+    assert not [name for name in os.listdir(tmp_path / "columns") if name.endswith(".tmp")]
+
+
+@pytest.mark.parametrize("extra_bytes", [0, 200])
+def test_replaced_source_rebuilds_xzh(store_xzh, tmp_path, extra_bytes):
+    """数据源被改写成相同大小或更大的文件时重建缓存，而不是当作追加"""
+    history = HistoryColumns_xzh(str(tmp_path / "columns"))
+    history.refresh_xzh(store_xzh)
+    with open(store_xzh.path, 'rb') as f:
+        data = f.read()
+    # 改写第一条记录的得分（长度不变），需要时在末尾再追加记录
+    data = data.replace(b'"score": ', b'"score": 9', 1).replace(b'"level": ', b'"level":', 1)
+    replaced = str(tmp_path / "replaced.jsonl")
+    with open(replaced, 'wb') as f:
+        f.write(data[:data.rfind(b"\n") + 1])
+        f.write(b'{"mode": "classic", "score": 1, "hit_rate": 0.5}\n' * (extra_bytes // 50))
+    os.replace(replaced, store_xzh.path)
+
+    reopened = HistoryColumns_xzh(str(tmp_path / "columns"))
+    reopened.refresh_xzh(store_xzh)
+    rebuilt = HistoryColumns_xzh(str(tmp_path / "rebuilt"))
+    rebuilt.refresh_xzh(store_xzh)
+    assert_same_columns_xzh(reopened, rebuilt)
+    assert reopened["score"][0] >= 9000
+
+
+def test_sqlite_source_refresh_xzh(store_xzh, tmp_path):
+    """SQLite数据源：增量刷新只读取新增的记录，改写已缓存的记录后重建"""
+    db = SqliteStore_xzh(str(tmp_path / "games.db"))
+    db.import_xzh(store_xzh.iter_xzh())
+    history = HistoryColumns_xzh(str(tmp_path / "columns"))
+    assert history.refresh_xzh(db) == 500
+    db.append_xzh({"mode": MODE_CLASSIC_XZH, "score": 7, "hit_rate": 0.5})
+    assert HistoryColumns_xzh(str(tmp_path / "columns")).refresh_xzh(db) == 1
+
+    with db.connection:
+        db.connection.execute("UPDATE games SET score = 12345 WHERE id = 1")
+    reopened = HistoryColumns_xzh(str(tmp_path / "columns"))
+    reopened.refresh_xzh(db)
+    assert reopened["score"][0] == 12345 and len(reopened) == 501
+
+
+@pytest.mark.parametrize("text", ["2025-12-14 23:42:46", "2026-03-29 02:30:00", "2025-10-26 02:30:00"])
+def test_timestamp_round_trip_xzh(text):
+    """时间字符串换算为秒数后可以原样还原（包括夏令时切换前后不存在或重复的本地时间）"""
+    assert format_timestamp_xzh(parse_timestamp_xzh(text)) == text
+    assert format_timestamp_xzh(parse_timestamp_xzh("未知")) == ""
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""训练环境测试：观测与规则核心一致，进程内和多进程向量化环境结果相同，关闭后释放共享内存"""
+
+import numpy as np
+import pytest
+from multiprocessing.shared_memory import SharedMemory
+from config import *
+from simulation import GameCore_xzh
+from environment import ACTIONS_XZH, OBS_STATE_SIZE_XZH, BreakoutEnv_xzh, VectorEnv_xzh, SubprocVectorEnv_xzh
+
+
+def expected_vector_xzh(game, initial_lives):
+    """
+    按观测的定义直接从规则核心的状态计算状态向量
+    :param game: GameCore_xzh对象
+    :param initial_lives: 初始生命值
+    :return: float32数组
+    """
+    ball, paddle = game.ball, game.paddle
+    state = [ball.x / SCREEN_WIDTH, ball.y / SCREEN_HEIGHT, ball.dx / BALL_SPEED_MAX_XZH,
+             ball.dy / BALL_SPEED_MAX_XZH, ball.active, paddle.x / SCREEN_WIDTH, paddle.width / SCREEN_WIDTH,
+             paddle.speed / PADDLE_SPEED_MAX_XZH, game.lives / initial_lives]
+    bricks = [brick.visible for brick in game.bricks]
+    return np.array(state + bricks, dtype=np.float32)
+
+
+@pytest.mark.parametrize("mode", [MODE_CLASSIC_XZH, MODE_CHALLENGE_XZH])
+def test_env_matches_game_core_xzh(mode):
+    """同一种子下环境的观测、奖励和信息与直接推进GameCore_xzh一致"""
+    env = BreakoutEnv_xzh(mode)
+    observation = env.reset(seed=11)
+    game = GameCore_xzh(mode, seed=11)
+    assert observation.shape == env.observation_shape
+    np.testing.assert_array_equal(observation, expected_vector_xzh(game, env.initial_lives))
+
+    rng = np.random.default_rng(11)
+    done = False
+    while not done:
+        action = int(rng.integers(len(ACTIONS_XZH)))
+        observation, reward, done, info = env.step(action)
+        score, lives = game.score, game.lives
+        for _ in range(env.frame_skip):
+            if game.step_xzh(ACTIONS_XZH[action]):
+                break
+        np.testing.assert_array_equal(observation, expected_vector_xzh(game, env.initial_lives))
+        assert reward == pytest.approx((game.score - score) / POINTS_PER_BRICK_XZH
+                                       - (lives - game.lives) * ENV_LIFE_PENALTY_XZH)
+        assert (info["score"], info["lives"], info["tick"]) == (game.score, game.lives, game.tick)
+    assert game.game_over or info["truncated"]
+
+
+def test_frame_observation_xzh():
+    """画面观测：砖块、挡板和球画在对应的缩小位置上"""
+    env = BreakoutEnv_xzh(obs_type="frame")
+    frame = env.reset(seed=3)
+    scale = ENV_FRAME_SCALE_XZH
+    game = env.game
+    assert frame.shape == env.observation_shape and frame.dtype == np.uint8
+    x, y, width, height = game.bricks[0].get_bounds_xzh()
+    assert frame[y // scale, x // scale] == 128
+    assert frame[int(game.ball.y) // scale, int(game.ball.x) // scale] == 255
+    assert frame[int(game.paddle.y) // scale, int(game.paddle.x + game.paddle.width / 2) // scale] == 255
+
+
+@pytest.mark.parametrize("obs_type", ["vector", "frame"])
+def test_vector_envs_agree_xzh(obs_type):
+    """相同种子和动作下，进程内和多进程向量化环境的观测、奖励、结束标记和信息相同（包括自动重置）"""
+    num_envs = 5
+    # 回合很短，自动重置会发生多次
+    kwargs = {"obs_type": obs_type, "max_ticks": 300}
+    vector = VectorEnv_xzh(num_envs, **kwargs)
+    with SubprocVectorEnv_xzh(num_envs, num_workers=2, **kwargs) as subproc:
+        np.testing.assert_array_equal(vector.reset(seed=100), subproc.reset(seed=100))
+        rng = np.random.default_rng(0)
+        resets = 0
+        for _ in range(200):
+            actions = rng.integers(len(ACTIONS_XZH), size=num_envs)
+            expected = vector.step(actions)
+            actual = subproc.step(actions)
+            np.testing.assert_array_equal(expected[0], actual[0])
+            np.testing.assert_array_equal(expected[1], actual[1])
+            np.testing.assert_array_equal(expected[2], actual[2])
+            for expected_info, actual_info in zip(expected[3], actual[3]):
+                assert expected_info.keys() == actual_info.keys()
+                for key, value in expected_info.items():
+                    np.testing.assert_array_equal(value, actual_info[key])
+            resets += int(expected[2].sum())
+        assert resets >= num_envs
+
+
+def test_subproc_close_releases_shared_memory_xzh():
+    """关闭后工作进程退出，共享内存被删除；重复关闭没有影响"""
+    subproc = SubprocVectorEnv_xzh(4, num_workers=2)
+    subproc.reset(seed=0)
+    name = subproc.shm.name
+    subproc.close()
+    assert not any(process.is_alive() for process in subproc.processes)
+    with pytest.raises(FileNotFoundError):
+        SharedMemory(name=name)
+    subproc.close()
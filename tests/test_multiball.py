@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""多球模式测试：批量碰撞路径与单球路径、逐球参考实现逐帧一致"""
+
+import random
+import pytest
+from config import *
+from simulation import GameCore_xzh, BallState_xzh, INPUT_LAUNCH_XZH
+from sim_helpers import tracking_inputs_xzh, SingleBallCore_xzh, SequentialMultiballCore_xzh
+
+
+@pytest.mark.parametrize("mode", [MODE_CLASSIC_XZH, MODE_CHALLENGE_XZH])
+@pytest.mark.parametrize("seed", range(8))
+def test_multiball_matches_single_ball_xzh(mode, seed):
+    """相同种子和输入下两条路径每帧的状态快照完全相同"""
+    scalar = GameCore_xzh(mode, seed=seed)
+    batched = SingleBallCore_xzh(mode, seed=seed, multiball=True)
+    input_rng = random.Random(seed)
+    for _ in range(10000):
+        inputs = tracking_inputs_xzh(scalar, input_rng)
+        scalar_done = scalar.step_xzh(inputs)
+        batched.step_xzh(inputs)
+        assert scalar.snapshot_xzh() == batched.snapshot_xzh(), f"第 {scalar.tick} 帧不一致"
+        if scalar_done:
+            break
+
+
+@pytest.mark.parametrize("mode", [MODE_CLASSIC_XZH, MODE_CHALLENGE_XZH])
+@pytest.mark.parametrize("seed", range(4))
+def test_multiball_matches_sequential_xzh(mode, seed):
+    """多个球同时在场时，批量路径与逐球处理的结果（含得分）逐帧一致"""
+    batched = GameCore_xzh(mode, seed=seed, multiball=True)
+    sequential = SequentialMultiballCore_xzh(mode, seed=seed, multiball=True)
+    input_rng = random.Random(seed)
+    for _ in range(8000):
+        inputs = tracking_inputs_xzh(batched, input_rng)
+        done = batched.step_xzh(inputs)
+        sequential.step_xzh(inputs)
+        assert batched.snapshot_xzh() == sequential.snapshot_xzh(), f"第 {batched.tick} 帧不一致"
+        if done:
+            break
+
+
+def place_balls_on_brick_xzh(game, offsets):
+    """
+    把若干个球放到第一块砖块正上方，下一帧同时向下撞到它（上方没有其他砖块）
+    :param game: GameCore_xzh对象（多球模式）
+    :param offsets: 每个球相对砖块中心的水平偏移
+    """
+    game.step_xzh(INPUT_LAUNCH_XZH)
+    brick_x, brick_y, brick_width, brick_height = game.bricks[0].get_bounds_xzh()
+    radius = game.ball.radius
+    balls = [game.ball] + [BallState_xzh(0, 0, game.ball.speed) for _ in offsets[1:]]
+    for ball, offset in zip(balls, offsets):
+        ball.active = True
+        ball.x = brick_x + brick_width / 2 + offset
+        ball.y = brick_y - radius - 1
+        ball.dx, ball.dy = 0.0, 2.0
+    game.balls = balls
+
+
+def test_same_brick_hit_by_several_balls_xzh():
+    """两个球同一帧撞到同一块砖块：只有第一个球击中并反弹，得分与逐球处理相同"""
+    batched = GameCore_xzh(MODE_CLASSIC_XZH, seed=0, multiball=True)
+    sequential = SequentialMultiballCore_xzh(MODE_CLASSIC_XZH, seed=0, multiball=True)
+    for game in (batched, sequential):
+        place_balls_on_brick_xzh(game, (-5, 5))
+        game.step_xzh(0)
+    assert batched.snapshot_xzh() == sequential.snapshot_xzh()
+    assert batched.score == POINTS_PER_BRICK_XZH
+    assert [ball.dy for ball in batched.balls] == [-2.0, 2.0]
+
+
+def test_multiball_is_deterministic_xzh():
+    """真正分裂出多个球时，相同种子和输入的两局结果相同"""
+    results = []
+    for _ in range(2):
+        game = GameCore_xzh(MODE_CHALLENGE_XZH, seed=3, multiball=True)
+        input_rng = random.Random(3)
+        game.step_xzh(INPUT_LAUNCH_XZH)
+        for _ in range(5000):
+            if game.step_xzh(tracking_inputs_xzh(game, input_rng)):
+                break
+        results.append(game.snapshot_xzh())
+    assert results[0] == results[1]
+
+
+def test_multiball_rejects_swept_collision_xzh():
+    """多球模式不支持连续碰撞检测"""
+    with pytest.raises(ValueError):
+        GameCore_xzh(MODE_CLASSIC_XZH, swept=True, multiball=True)
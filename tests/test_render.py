@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""渲染层测试：粒子池的交换删除压缩，精灵和文字缓存的LRU淘汰"""
+
+import os
+import random
+from types import SimpleNamespace
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+from config import *
+import game
+from game import Game_xzh, LRUCache_xzh, ParticleSystem_xzh, get_paddle_sprite_xzh, get_particle_sprite_xzh
+
+FIELDS_XZH = ("x", "y", "vx", "vy", "size", "life", "color_index")
+
+
+def live_particles_xzh(particles):
+    """
+    粒子池中存活的粒子（与存放顺序无关）
+    :param particles: ParticleSystem_xzh对象
+    :return: 排好序的粒子元组列表
+    """
+    n = len(particles)
+    return sorted(zip(*(getattr(particles, name)[:n].tolist() for name in FIELDS_XZH)))
+
+
+def test_particle_compaction_matches_reference_xzh():
+    """
+    交错生成的粒子逐帧与逐个更新、删除死亡粒子的参考实现一致：
+    存活数量相同，存活粒子相同（与存放顺序无关），压缩后没有残留的死亡粒子，全部到期后为空
+    """
+    particles = ParticleSystem_xzh(capacity=64, rng=random.Random(0))
+    colors = [(255, 0, 0), (0, 255, 0), (0, 0, 255)]
+    reference = []
+    dropped = 0
+    for frame in range(PARTICLE_LIFE_XZH * 3):
+        if frame % 4 == 0 and frame < PARTICLE_LIFE_XZH * 2:
+            before = len(particles)
+            requested = 5 + frame % 13
+            particles.emit_xzh(100 + frame, 200 - frame, colors[frame % 3], requested)
+            dropped += requested - (len(particles) - before)
+            # 新粒子在数组末尾，按生成时的值加入参考实现
+            reference += [list(values) for values in zip(*(getattr(particles, name)[before:len(particles)].tolist()
+                                                           for name in FIELDS_XZH))]
+
+        particles.update_xzh()
+        for particle in reference:
+            particle[0] += particle[2]
+            particle[1] += particle[3]
+            particle[3] += 0.3
+            particle[5] -= 1
+            particle[4] = max(particle[4] - 0.1, 1)
+        reference = [particle for particle in reference if particle[5] > 0]
+
+        assert len(particles) == len(reference)
+        assert live_particles_xzh(particles) == sorted(map(tuple, reference))
+        assert (particles.life[:len(particles)] > 0).all()
+
+    assert dropped > 0  # 容量用满时丢弃了新粒子
+    assert len(particles) == 0 and particles.get_draw_rect_xzh() is None
+
+
+def test_particle_clear_xzh():
+    """清除后不再绘制或更新旧粒子"""
+    particles = ParticleSystem_xzh(capacity=16, rng=random.Random(1))
+    particles.emit_xzh(10, 10, (1, 2, 3), 10)
+    particles.clear_xzh()
+    particles.update_xzh()
+    assert len(particles) == 0
+    particles.emit_xzh(10, 10, (1, 2, 3), 4)
+    assert len(particles) == 4 and (particles.life[:4] == PARTICLE_LIFE_XZH).all()
+
+
+def test_lru_cache_eviction_xzh():
+    """超出容量时淘汰最久未使用的条目，读取会刷新条目的使用时间"""
+    cache = LRUCache_xzh(3)
+    for key in "abc":
+        cache.put(key, key.upper())
+    assert cache.get("a") == "A"
+    cache.put("d", "D")
+    assert len(cache) == 3 and cache.get("b") is None
+    assert [cache.get(key) for key in "acd"] == ["A", "C", "D"]
+    cache.put("a", "A2")
+    cache.put("e", "E")
+    assert cache.get("c") is None and cache.get("a") == "A2"
+
+
+def test_sprite_caches_stay_bounded_xzh(monkeypatch):
+    """粒子和挡板精灵缓存在大量不同的键下保持在容量以内，最近使用的条目被复用"""
+    monkeypatch.setattr(game, "_particle_sprite_cache_xzh", LRUCache_xzh(PARTICLE_SPRITE_CACHE_SIZE_XZH))
+    monkeypatch.setattr(game, "_paddle_sprite_cache_xzh", LRUCache_xzh(PADDLE_SPRITE_CACHE_SIZE_XZH))
+    for alpha in range(256):
+        for size in range(2, 8):
+            get_particle_sprite_xzh((255, 0, 0), alpha, size)
+    assert len(game._particle_sprite_cache_xzh) == PARTICLE_SPRITE_CACHE_SIZE_XZH
+    latest = get_particle_sprite_xzh((255, 0, 0), 255, 7)
+    assert get_particle_sprite_xzh((255, 0, 0), 255, 7) is latest
+
+    for width in range(40, 200):
+        get_paddle_sprite_xzh(width, PADDLE_HEIGHT_XZH)
+    assert len(game._paddle_sprite_cache_xzh) == PADDLE_SPRITE_CACHE_SIZE_XZH
+    assert get_paddle_sprite_xzh(199, PADDLE_HEIGHT_XZH) is get_paddle_sprite_xzh(199, PADDLE_HEIGHT_XZH)
+
+
+def test_text_cache_stays_bounded_xzh():
+    """不断变化的文字（如计时器）不会让文字缓存无限增长"""
+    pygame.font.init()
+    font = pygame.font.Font(None, 24)
+    view = SimpleNamespace(text_cache=LRUCache_xzh(TEXT_CACHE_SIZE_XZH))
+    for value in range(TEXT_CACHE_SIZE_XZH * 4):
+        Game_xzh.render_text_xzh(view, font, f"时间: {value}", (255, 255, 255))
+    assert len(view.text_cache) == TEXT_CACHE_SIZE_XZH
+    surface = Game_xzh.render_text_xzh(view, font, "得分: 10", (255, 255, 255))
+    assert Game_xzh.render_text_xzh(view, font, "得分: 10", (255, 255, 255)) is surface
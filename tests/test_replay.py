@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""回放测试：编码往返、文件大小、使用保存的快照跳转"""
+
+import random
+import pytest
+import replay as replay_module
+from config import *
+from simulation import GameCore_xzh
+from autoplay import AutoPlayer_xzh
+from replay import Replay_xzh, seek_replay_xzh, simulate_replay_xzh
+from sim_helpers import tracking_inputs_xzh
+
+
+def record_replay_xzh(mode, seed, ticks):
+    """
+    用跟球策略录制一局回放（与游戏录制时一样定期保存快照）
+    :param mode: 游戏模式
+    :param seed: 随机种子
+    :param ticks: 最多录制的帧数
+    :return: (Replay_xzh对象, 录制结束时的GameCore_xzh对象)
+    """
+    game = GameCore_xzh(mode, seed=seed)
+    replay = Replay_xzh(mode, seed, game.swept, game.multiball)
+    input_rng = random.Random(seed)
+    for _ in range(ticks):
+        inputs = tracking_inputs_xzh(game, input_rng)
+        if game.tick % SNAPSHOT_INTERVAL_TICKS_XZH == 0:
+            replay.add_snapshot_xzh(game.tick, game.snapshot_xzh())
+        replay.record_xzh(inputs)
+        if game.step_xzh(inputs):
+            break
+    replay.score = game.score
+    return replay, game
+
+
+def test_replay_round_trip_xzh():
+    """编码后再解码得到相同的输入和快照"""
+    replay, game = record_replay_xzh(MODE_CHALLENGE_XZH, 5, 36000)
+    loaded = Replay_xzh.from_bytes_xzh(replay.to_bytes_xzh())
+    assert loaded.runs == replay.runs and loaded.ticks == replay.ticks
+    assert loaded.snapshot_ticks == replay.snapshot_ticks and loaded.snapshots == replay.snapshots
+    assert simulate_replay_xzh(loaded).snapshot_xzh() == game.snapshot_xzh()
+
+
+def test_replay_file_stays_small_xzh():
+    """十分钟的自动玩家回放连同快照只有几KB"""
+    game = GameCore_xzh(MODE_CHALLENGE_XZH, seed=4)
+    game.lives = 10 ** 6  # 保证录满十分钟
+    replay = Replay_xzh(MODE_CHALLENGE_XZH, 4, game.swept, game.multiball)
+    player = AutoPlayer_xzh(0.7, seed=4)
+    for _ in range(FPS * 600):
+        inputs = player.get_inputs_xzh(game)
+        if game.tick % SNAPSHOT_INTERVAL_TICKS_XZH == 0:
+            replay.add_snapshot_xzh(game.tick, game.snapshot_xzh())
+        replay.record_xzh(inputs)
+        game.step_xzh(inputs)
+    assert len(replay.snapshots) == 60
+    assert len(replay.to_bytes_xzh()) < 8 * 1024
+
+
+def test_seek_uses_saved_snapshots_xzh(monkeypatch):
+    """加载的回放直接使用文件中的快照跳转，不重新模拟整局；结果与从头模拟到目标帧相同"""
+    replay, _ = record_replay_xzh(MODE_CLASSIC_XZH, 2, 6000)
+    loaded = Replay_xzh.from_bytes_xzh(replay.to_bytes_xzh())
+    target = loaded.ticks * 2 // 3
+
+    def fail_xzh(*args, **kwargs):
+        raise AssertionError("不应重新生成快照")
+
+    monkeypatch.setattr(replay_module, "build_snapshots_xzh", fail_xzh)
+
+    expected = GameCore_xzh(loaded.mode, seed=loaded.seed)
+    for inputs in loaded.iter_inputs_xzh():
+        if expected.tick >= target:
+            break
+        expected.step_xzh(inputs)
+
+    game = seek_replay_xzh(loaded, target)
+    assert game.snapshot_xzh() == expected.snapshot_xzh()
+    # 向回跳转同样只恢复快照
+    assert seek_replay_xzh(loaded, target // 2, game).tick == target // 2
+
+
+def test_seek_without_snapshots_builds_them_xzh():
+    """没有快照的回放（版本1文件）第一次跳转时重新模拟生成快照"""
+    replay, game = record_replay_xzh(MODE_CLASSIC_XZH, 3, 3000)
+    replay.snapshot_ticks, replay.snapshots = [], []
+    assert seek_replay_xzh(replay, replay.ticks).snapshot_xzh() == game.snapshot_xzh()
+    assert replay.snapshots
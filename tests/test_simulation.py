@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""规则核心测试：砖块墙的序列接口，扫掠圆与矩形的连续碰撞检测"""
+
+import math
+import pytest
+from config import *
+from simulation import BrickField_xzh, BrickState_xzh, GameCore_xzh, bounds_collide_xzh, sweep_circle_aabb_xzh
+
+BOX_XZH = (0.0, 0.0, 10.0, 10.0)  # 单元测试用的矩形（左、上、右、下）
+
+
+def test_brick_field_indexing_xzh():
+    """整数索引（含负数）返回同一个视图，越界抛出IndexError"""
+    field = BrickField_xzh(3, 4)
+    assert field[5] is field[5]
+    assert field[-1] is field[11]
+    assert field[-1].x == field.get_bounds_xzh(11)[0]
+    with pytest.raises(IndexError):
+        field[12]
+
+
+def test_brick_field_slicing_xzh():
+    """切片与列表语义一致，返回视图列表"""
+    field = BrickField_xzh(3, 4)
+    bricks = list(field)
+    assert field[2:6] == bricks[2:6]
+    assert field[::-3] == bricks[::-3]
+    assert field[100:] == []
+    assert all(isinstance(brick, BrickState_xzh) for brick in field[:])
+
+
+def test_brick_field_rejects_other_keys_xzh():
+    """非整数、非切片的索引抛出TypeError"""
+    field = BrickField_xzh(3, 4)
+    with pytest.raises(TypeError):
+        field[1.0]
+    with pytest.raises(TypeError):
+        field["0"]
+
+
+def test_sweep_hits_edge_xzh():
+    """沿Y轴撞上矩形上边：碰撞时刻为球面刚接触的比例，法线朝上"""
+    assert sweep_circle_aabb_xzh(5, -10, 0, 20, 2, *BOX_XZH) == pytest.approx((0.4, 0.0, -1.0))
+    assert sweep_circle_aabb_xzh(-10, 5, 20, 0, 2, *BOX_XZH) == pytest.approx((0.4, -1.0, 0.0))
+    assert sweep_circle_aabb_xzh(5, -10, 0, 5, 2, *BOX_XZH) is None  # 位移不够，本步内碰不到
+
+
+def test_sweep_catches_tunneling_xzh():
+    """位移比矩形和球都大时，起点和终点都不重叠（离散检测会穿过去），扫掠检测仍然撞上"""
+    x, y, dx, dy, radius = 5.0, -10.0, 0.0, 40.0, 2
+    start = (int(x - radius), int(y - radius), radius * 2, radius * 2)
+    end = (int(x + dx - radius), int(y + dy - radius), radius * 2, radius * 2)
+    box = (0, 0, 10, 10)
+    assert not bounds_collide_xzh(start, box) and not bounds_collide_xzh(end, box)
+    t, normal_x, normal_y = sweep_circle_aabb_xzh(x, y, dx, dy, radius, *BOX_XZH)
+    assert t == pytest.approx(0.2) and (normal_x, normal_y) == (0.0, -1.0)
+
+
+def test_sweep_hits_corner_xzh():
+    """沿对角线撞向角：在球面接触角点时相撞，法线从角点指向球心"""
+    t, normal_x, normal_y = sweep_circle_aabb_xzh(-5, -5, 5, 5, 2, *BOX_XZH)
+    assert t == pytest.approx((5 - math.sqrt(2)) / 5)
+    assert (normal_x, normal_y) == pytest.approx((-math.sqrt(0.5), -math.sqrt(0.5)))
+    # 穿过扩展矩形的角落但离角点比半径远：擦过，不相撞
+    assert sweep_circle_aabb_xzh(-4, 1, 4, -4, 2, *BOX_XZH) is None
+    # 离角点比半径近：撞上角的圆弧
+    hit = sweep_circle_aabb_xzh(-4, 1.5, 4, -4, 2, *BOX_XZH)
+    assert hit is not None and hit[1] < 0 and hit[2] < 0
+
+
+def test_sweep_starting_in_contact_xzh():
+    """起点已与矩形或角重叠时不算碰撞（球不会卡在里面）；刚好接触并向内移动时在t=0相撞"""
+    assert sweep_circle_aabb_xzh(5, -1, 0, 5, 2, *BOX_XZH) is None
+    assert sweep_circle_aabb_xzh(5, -1, 0, -5, 2, *BOX_XZH) is None
+    assert sweep_circle_aabb_xzh(-1, -1, 1, 1, 2, *BOX_XZH) is None
+    assert sweep_circle_aabb_xzh(5, -2, 0, 1, 2, *BOX_XZH) == (0.0, 0.0, -1.0)
+    assert sweep_circle_aabb_xzh(5, -2, 0, -1, 2, *BOX_XZH) is None
+
+
+def test_fast_ball_does_not_tunnel_in_game_xzh():
+    """规则核心：一帧的位移能越过整块砖时，离散检测在终点看不到砖块，连续碰撞仍击中并反弹"""
+    game = GameCore_xzh(MODE_CLASSIC_XZH, seed=0, swept=True)
+    target = len(game.bricks) - 1
+    for index in range(len(game.bricks) - 1):
+        game.brick_grid.hide_xzh(game.bricks[index])
+    left, top, width, height = game.bricks.get_bounds_xzh(target)
+    ball = game.ball
+    ball.active = True
+    ball.x, ball.y = left + width / 2, top + height + ball.radius + 5
+    ball.dx, ball.dy = 0.0, -(height + ball.radius * 2 + 20)
+    end_bounds = (int(ball.x - ball.radius), int(ball.y + ball.dy - ball.radius), ball.radius * 2, ball.radius * 2)
+    assert not bounds_collide_xzh(end_bounds, (left, top, width, height))
+
+    score = game.score
+    game.move_ball_swept_xzh()
+    assert not game.bricks.visible[target]
+    assert game.score == score + POINTS_PER_BRICK_XZH
+    assert ball.dy > 0 and ball.y > top + height
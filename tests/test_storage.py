@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+"""存储测试：旧数据迁移、多进程追加、后台保存、按线程打开的存储和进程内历史缓存"""
+
+import json
+import multiprocessing
+import os
+import threading
+import pytest
+from config import *
+import columnar
+import storage
+from storage import (JsonlStore_xzh, SqliteStore_xzh, SaveWriter_xzh, get_store_xzh, migrate_legacy_data_xzh,
+                     summarize_records_xzh, write_file_atomic_xzh)
+
+SAMPLE_XZH = {"mode": MODE_CLASSIC_XZH, "score": 240, "level": 1, "duration": 49.1, "hit_rate": 0.88,
+              "bricks_hit": 24, "lives_remaining": 1, "timestamp": "2025-12-14 23:42:46", "won": False}
+
+
+def write_legacy_xzh(path, count):
+    """
+    写一个旧版data.json
+    :param path: 文件路径
+    :param count: 记录数
+    """
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"games": [dict(SAMPLE_XZH, score=index) for index in range(count)]}, f)
+
+
+def migrate_worker_xzh(args):
+    """子进程：迁移后追加一条记录"""
+    directory, worker = args
+    store = JsonlStore_xzh(os.path.join(directory, "games.jsonl"))
+    migrated = migrate_legacy_data_xzh(store, os.path.join(directory, "data.json"))
+    store.append_xzh(dict(SAMPLE_XZH, score=-1 - worker))
+    return migrated
+
+
+def test_migrate_legacy_data_xzh(tmp_path):
+    """第一次迁移写入全部旧记录，之后不再迁移，不留下临时文件"""
+    write_legacy_xzh(tmp_path / "data.json", 5)
+    store = JsonlStore_xzh(str(tmp_path / "games.jsonl"))
+    assert migrate_legacy_data_xzh(store, str(tmp_path / "data.json")) == 5
+    assert migrate_legacy_data_xzh(store, str(tmp_path / "data.json")) == 0
+    assert [record['score'] for record in store.load_xzh()] == list(range(5))
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_concurrent_migration_and_append_xzh(tmp_path):
+    """多个进程同时启动：只迁移一次，各自追加的记录都在，行都完整"""
+    write_legacy_xzh(tmp_path / "data.json", 200)
+    workers = 8
+    with multiprocessing.get_context("spawn").Pool(workers) as pool:
+        migrated = pool.map(migrate_worker_xzh, [(str(tmp_path), worker) for worker in range(workers)])
+
+    assert sorted(migrated) == [0] * (workers - 1) + [200]
+    scores = [record['score'] for record in JsonlStore_xzh(str(tmp_path / "games.jsonl")).load_xzh()]
+    assert scores[:200] == list(range(200))
+    assert sorted(scores[200:]) == sorted(-1 - worker for worker in range(workers))
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_write_file_atomic_xzh(tmp_path):
+    """覆盖写入后内容完整，权限正常，不留下临时文件"""
+    path = tmp_path / "replay.brr"
+    write_file_atomic_xzh(str(path), b"old")
+    write_file_atomic_xzh(str(path), b"new" * 1000)
+    assert path.read_bytes() == b"new" * 1000
+    assert path.stat().st_mode & 0o777 == 0o644
+    assert os.listdir(tmp_path) == ["replay.brr"]
+
+
+def test_save_writer_writes_files_and_records_xzh(tmp_path, monkeypatch):
+    """后台保存线程写入文件和记录，关闭前全部写完"""
+    monkeypatch.chdir(tmp_path)
+    writer = SaveWriter_xzh("jsonl")
+    for index in range(10):
+        path = str(tmp_path / f"{index}.brr")
+        writer.put_file_xzh(path, bytes([index]) * 100)
+        writer.put_xzh(dict(SAMPLE_XZH, score=index, replay=path))
+    writer.close_xzh()
+
+    assert (writer.files, writer.saved, writer.failed) == (10, 10, 0)
+    records = JsonlStore_xzh(HISTORY_FILE_PATH_XZH).load_xzh()
+    assert [record['score'] for record in records] == list(range(10))
+    assert all(open(record['replay'], 'rb').read() == bytes([record['score']]) * 100 for record in records)
+
+
+def test_get_store_per_thread_xzh(tmp_path, monkeypatch):
+    """每个线程各自打开一次存储，SQLite连接只在创建它的线程中使用"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(storage._stores_xzh, "stores", {}, raising=False)  # 不影响其他测试打开的存储
+    main_store = get_store_xzh("sqlite")
+    assert get_store_xzh("sqlite") is main_store
+    main_store.append_xzh(SAMPLE_XZH)
+
+    results = []
+
+    def worker_xzh():
+        store = get_store_xzh("sqlite")
+        results.append((store is not main_store, store.summarize_xzh()["games"]))
+
+    thread = threading.Thread(target=worker_xzh)
+    thread.start()
+    thread.join()
+    assert results == [(True, 1)]
+
+
+def test_only_reads_wait_for_pending_saves_xzh(tmp_path, monkeypatch):
+    """获取存储不等待后台保存；读取记录前等待队列写完，读到刚提交的对局"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(storage._stores_xzh, "stores", {}, raising=False)
+    monkeypatch.setattr(storage, "history_cache_xzh", storage.HistoryCache_xzh())
+    release = threading.Event()
+    write_file = storage.write_file_atomic_xzh
+
+    def blocked_write_xzh(path, data, mode=0o644):
+        release.wait()
+        write_file(path, data, mode)
+
+    monkeypatch.setattr(storage, "write_file_atomic_xzh", blocked_write_xzh)
+    writer = SaveWriter_xzh("jsonl")
+    monkeypatch.setattr(storage, "_save_writer_xzh", writer)
+    writer.put_file_xzh(str(tmp_path / "0.brr"), b"replay")
+    writer.put_xzh(SAMPLE_XZH)
+
+    get_store_xzh("jsonl")
+    assert writer.queue.unfinished_tasks  # 后台线程仍被阻塞，获取存储没有等待
+    release.set()
+    assert [record['score'] for record in storage.load_game_data_xzh()] == [SAMPLE_XZH['score']]
+    assert writer.queue.unfinished_tasks == 0
+    writer.close_xzh()
+
+
+@pytest.fixture
+def history_cache_xzh(tmp_path, monkeypatch):
+    """在临时目录中使用新的存储和历史缓存"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(storage._stores_xzh, "stores", {}, raising=False)
+    cache = storage.HistoryCache_xzh(str(tmp_path / "columns"))
+    monkeypatch.setattr(storage, "history_cache_xzh", cache)
+    monkeypatch.setattr(columnar, "history_cache_xzh", cache)
+    return cache
+
+
+@pytest.mark.parametrize("backend", ["jsonl", "sqlite"])
+def test_history_cache_updates_in_place_xzh(history_cache_xzh, backend):
+    """本进程追加的记录直接加到缓存中；其他连接写入后只增量解析新增的记录"""
+    store = get_store_xzh(backend)
+    for index in range(20):
+        store.append_xzh(dict(SAMPLE_XZH, score=index))
+    first = history_cache_xzh.load_columns_xzh(store)
+    assert history_cache_xzh.get_stats_xzh() == {"hits": 0, "misses": 1, "updates": 0, "parsed": 20, "records": 20}
+    history_cache_xzh.load_columns_xzh(store)
+
+    for index in range(20, 22):
+        record = dict(SAMPLE_XZH, score=index, mode=MODE_CHALLENGE_XZH)
+        history_cache_xzh.record_appended_xzh(store, (record,), store.append_xzh(record))
+    history = history_cache_xzh.load_columns_xzh(store)
+    assert history_cache_xzh.get_stats_xzh() == {"hits": 2, "misses": 1, "updates": 2, "parsed": 20, "records": 22}
+    assert history["score"].tolist() == list(range(22)) and len(first) == 20
+
+    other = type(store)(store.path)  # 另一个连接（相当于另一个进程）写入
+    other.append_xzh(dict(SAMPLE_XZH, score=22))
+    record = dict(SAMPLE_XZH, score=23)
+    history_cache_xzh.record_appended_xzh(store, (record,), store.append_xzh(record))
+    history = history_cache_xzh.load_columns_xzh(store)
+    stats = history_cache_xzh.get_stats_xzh()
+    assert (stats["misses"], stats["updates"], stats["parsed"]) == (2, 2, 22)
+    assert history["score"].tolist() == list(range(24))
+    assert history.summarize_xzh()["total_score"] == summarize_records_xzh(store.iter_xzh())["total_score"]
+
+
+def test_menu_reads_after_save_do_not_parse_xzh(history_cache_xzh):
+    """保存一局后再打开统计界面和分析报告：命中缓存，不重新解析历史记录"""
+    for index in range(10):
+        storage.save_game_data_xzh(dict(SAMPLE_XZH, score=index))
+    summary, recent = storage.load_game_summary_xzh(3)
+    assert summary["games"] == 10 and [record['score'] for record in recent] == [7, 8, 9]
+    parsed = history_cache_xzh.get_stats_xzh()["parsed"]
+
+    storage.save_game_data_xzh(dict(SAMPLE_XZH, score=100, replay="replays/1.brr"))
+    summary, recent = storage.load_game_summary_xzh(3)
+    history = columnar.load_history_columns_xzh()
+    stats = history_cache_xzh.get_stats_xzh()
+    assert (stats["hits"], stats["misses"], stats["updates"], stats["parsed"]) == (2, 1, 1, parsed)
+    assert summary["games"] == 11 and summary["max_score"] == 100 and len(history) == 11
+    assert recent[-1]['replay'] == "replays/1.brr"
+
+
+@pytest.mark.parametrize("records", [0, 1, 300])
+def test_backends_agree_xzh(tmp_path, records):
+    """同样的记录保存到SQLite和JSONL后端，读取和汇总统计的结果一致"""
+    modes = (MODE_CLASSIC_XZH, MODE_CHALLENGE_XZH)
+    games = [dict(SAMPLE_XZH, score=index % 97, mode=modes[index % 3 == 0], won=index % 7 == 0,
+                  hit_rate=index % 11 / 10, replay=f"replays/{index}.brr") for index in range(records)]
+    jsonl_store = JsonlStore_xzh(str(tmp_path / "games.jsonl"))
+    sqlite_store = SqliteStore_xzh(str(tmp_path / "games.db"))
+    if games:
+        jsonl_store.append_many_xzh(games)
+        sqlite_store.append_many_xzh(games)
+
+    assert sqlite_store.load_xzh() == jsonl_store.load_xzh() == games
+    assert sqlite_store.recent_xzh(5) == jsonl_store.recent_xzh(5)
+    jsonl_summary, sqlite_summary = jsonl_store.summarize_xzh(), sqlite_store.summarize_xzh()
+    assert sqlite_summary["modes"].keys() == jsonl_summary["modes"].keys()
+    for key in ("games", "total_score", "max_score", "wins"):
+        assert sqlite_summary[key] == jsonl_summary[key]
+    assert sqlite_summary["avg_hit_rate"] == pytest.approx(jsonl_summary["avg_hit_rate"])
+    for mode, stats in jsonl_summary["modes"].items():
+        assert sqlite_summary["modes"][mode] == pytest.approx(stats)
+
+
+def test_append_after_torn_line_xzh(tmp_path):
+    """上次写入中途崩溃留下半行：读取时跳过，新记录不会和它粘在一起"""
+    store = JsonlStore_xzh(str(tmp_path / "games.jsonl"))
+    store.append_xzh(dict(SAMPLE_XZH, score=1))
+    with open(store.path, 'ab') as f:
+        f.write(b'{"mode":"classic","sco')
+    store.append_xzh(dict(SAMPLE_XZH, score=2))
+    assert [record['score'] for record in store.load_xzh()] == [1, 2]
+    assert [record['score'] for record in store.recent_xzh(5)] == [1, 2]
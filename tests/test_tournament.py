@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+"""锦标赛测试：固定种子时结果可复现，与是否使用进程池无关"""
+
+from config import *
+from autoplay import play_game_xzh
+from tournament import build_settings_xzh, run_tournament_xzh
+
+GRID_XZH = {"width_adjustment": [0, 30], "hit_rate_threshold": [0.5]}
+
+
+def test_play_game_is_deterministic_xzh():
+    """同一种子的自动对局结果完全相同（记录时间取自系统时钟，不参与比较）"""
+    results = [play_game_xzh(MODE_CHALLENGE_XZH, 0.6, 7, max_ticks=3000) for _ in range(2)]
+    for result in results:
+        del result["timestamp"]
+    assert results[0] == results[1]
+
+
+def test_tournament_serial_matches_pool_xzh():
+    """固定种子的锦标赛在当前进程中依次运行和用进程池并行运行，结果完全相同"""
+    kwargs = {"grid": GRID_XZH, "skills": [0.3, 0.9], "games_per_cell": 6, "max_ticks": 3000, "seed": 5}
+    serial = run_tournament_xzh(MODE_CLASSIC_XZH, processes=1, **kwargs)
+    pooled = run_tournament_xzh(MODE_CLASSIC_XZH, processes=3, **kwargs)
+    assert serial == pooled
+    assert [result["difficulty"] for result in serial[::2]] == build_settings_xzh(GRID_XZH)
+    assert all(result["games"] == 6 for result in serial)
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+难度调优锦标赛模块
+扫描难度参数网格，用进程池让不同技能的自动玩家在每组参数下无界面地打大量对局，
+汇总得分、时长和关卡的分布
+"""
+
+import argparse
+import contextlib
+import itertools
+import json
+import os
+import time
+from multiprocessing import Pool
+import numpy as np
+from config import *
+from autoplay import play_game_xzh
+
+
+def build_settings_xzh(grid):
+    """
+    展开难度参数网格
+    :param grid: 参数名 -> 取值列表的字典
+    :return: 难度参数字典的列表（网格的笛卡尔积）
+    """
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def run_match_xzh(task):
+    """
+    进程池的工作函数：玩一局并只返回汇总需要的字段
+    :param task: (设置编号, 模式, 技能, 种子, 难度参数, 最大帧数)
+    :return: (设置编号, 技能, 得分, 时长, 关卡, 是否获胜)
+    """
+    setting_index, mode, skill, seed, difficulty, max_ticks = task
+    game_data = play_game_xzh(mode, skill, seed, difficulty, max_ticks)
+    return (setting_index, skill, game_data["score"], game_data["duration"],
+            game_data["level"], game_data["won"])
+
+
+def summarize_xzh(values):
+    """
+    计算一组数值的分布
+    :param values: 数值列表
+    :return: 均值、标准差、最小值、10/50/90分位数和最大值
+    """
+    values = np.asarray(values, dtype=float)
+    p10, p50, p90 = np.percentile(values, [10, 50, 90])
+    return {
+        "mean": float(values.mean()),
+        "std": float(values.std()),
+        "min": float(values.min()),
+        "p10": float(p10),
+        "median": float(p50),
+        "p90": float(p90),
+        "max": float(values.max()),
+    }
+
+
+def run_tournament_xzh(mode=MODE_CLASSIC_XZH, grid=None, skills=None, games_per_cell=100,
+                       processes=None, max_ticks=TOURNAMENT_MAX_TICKS_XZH, seed=0):
+    """
+    运行锦标赛
+    同一技能下每组难度参数使用相同的种子序列，参数之间的差异不受随机波动影响；
+    每局的结果只由种子决定，汇总前先排序，结果与进程数和完成顺序无关
+    :param mode: 游戏模式
+    :param grid: 难度参数网格（默认TOURNAMENT_GRID_XZH）
+    :param skills: 玩家技能列表（默认TOURNAMENT_SKILLS_XZH）
+    :param games_per_cell: 每组（难度参数, 技能）的对局数
+    :param processes: 进程数（默认使用全部CPU核心，为1时在当前进程中依次运行）
+    :param max_ticks: 每局最多模拟的帧数
+    :param seed: 起始种子
+    :return: 结果列表，每项包含难度参数、技能和各指标的分布
+    """
+    settings = build_settings_xzh(grid if grid is not None else TOURNAMENT_GRID_XZH)
+    skills = skills if skills is not None else TOURNAMENT_SKILLS_XZH
+    tasks = [(setting_index, mode, skill, seed + game_index, difficulty, max_ticks)
+             for setting_index, difficulty in enumerate(settings)
+             for skill in skills
+             for game_index in range(games_per_cell)]
+
+    outcomes = {}
+    processes = processes or os.cpu_count() or 1
+    start = time.perf_counter()
+    with contextlib.ExitStack() as stack:
+        if processes == 1:
+            matches = map(run_match_xzh, tasks)
+        else:
+            pool = stack.enter_context(Pool(processes))
+            # 每个任务只有一局，分块提交减少进程间通信
+            chunksize = max(1, len(tasks) // (processes * 16))
+            matches = pool.imap_unordered(run_match_xzh, tasks, chunksize)
+        for done, outcome in enumerate(matches, 1):
+            setting_index, skill = outcome[0], outcome[1]
+            outcomes.setdefault((setting_index, skill), []).append(outcome[2:])
+            if done % 1000 == 0 or done == len(tasks):
+                elapsed = time.perf_counter() - start
+                print(f"已完成 {done}/{len(tasks)} 局 ({elapsed:.1f} 秒)")
+
+    results = []
+    for setting_index, difficulty in enumerate(settings):
+        for skill in skills:
+            scores, durations, levels, wins = zip(*sorted(outcomes[(setting_index, skill)]))
+            results.append({
+                "difficulty": difficulty,
+                "skill": skill,
+                "games": len(scores),
+                "win_rate": sum(wins) / len(wins),
+                "score": summarize_xzh(scores),
+                "duration": summarize_xzh(durations),
+                "level": summarize_xzh(levels),
+            })
+    return results
+
+
+def print_tournament_xzh(results):
+    """
+    打印锦标赛结果表
+    :param results: run_tournament_xzh的返回值
+    """
+    names = list(results[0]["difficulty"]) if results else []
+    header = " ".join(f"{name:>18}" for name in names)
+    print("\n" + "=" * (len(header) + 86))
+    print(f"{header} {'技能':>4} {'胜率':>6} {'得分均值':>8} {'得分P10-P90':>14} "
+          f"{'时长中位':>8} {'时长P10-P90':>14} {'关卡均值':>8}")
+    print("-" * (len(header) + 86))
+    for result in results:
+        values = " ".join(f"{result['difficulty'][name]:>18}" for name in names)
+        score = result["score"]
+        duration = result["duration"]
+        print(f"{values} {result['skill']:>6.1f} {result['win_rate'] * 100:>7.1f}% "
+              f"{score['mean']:>10.1f} {score['p10']:>7.0f}-{score['p90']:<7.0f} "
+              f"{duration['median']:>10.1f} {duration['p10']:>7.1f}-{duration['p90']:<7.1f} "
+              f"{result['level']['mean']:>10.2f}")
+    print("=" * (len(header) + 86))
+
+
+def main_xzh():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="难度参数调优锦标赛")
+    parser.add_argument("--mode", choices=[MODE_CLASSIC_XZH, MODE_CHALLENGE_XZH], default=MODE_CLASSIC_XZH)
+    parser.add_argument("--games", type=int, default=100, help="每组（难度参数, 技能）的对局数")
+    parser.add_argument("--skills", type=float, nargs="+", help="玩家技能列表（0到1）")
+    parser.add_argument("--processes", type=int, help="进程数（默认使用全部CPU核心）")
+    parser.add_argument("--max-ticks", type=int, default=TOURNAMENT_MAX_TICKS_XZH, help="每局最多模拟的帧数")
+    parser.add_argument("--seed", type=int, default=0, help="起始种子")
+    parser.add_argument("--output", default=TOURNAMENT_RESULT_PATH_XZH, help="结果JSON文件路径")
+    args = parser.parse_args()
+
+    results = run_tournament_xzh(args.mode, skills=args.skills, games_per_cell=args.games,
+                                 processes=args.processes, max_ticks=args.max_ticks, seed=args.seed)
+    print_tournament_xzh(results)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({"mode": args.mode, "results": results}, f, ensure_ascii=False, indent=2)
+    print(f"结果已保存到 {args.output}")
+
+
+if __name__ == "__main__":
+    main_xzh()